@@ -1,5 +1,6 @@
 from langgraph.graph import StateGraph, END
 
+from agents.base.graphs import release_session
 from agents.assessment_evaluator.state import EvaluationState
 from agents.assessment_evaluator.nodes import (
     load_context,
@@ -21,7 +22,7 @@ def create_graph():
     workflow = StateGraph(EvaluationState)
 
     # Nodes
-    workflow.add_node("load_context", load_context)
+    workflow.add_node("load_context", release_session(load_context))
     workflow.add_node("evaluate_answer", evaluate_answer)
     workflow.add_node("persist_result", persist_result)
 
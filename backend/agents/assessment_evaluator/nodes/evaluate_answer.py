@@ -32,7 +32,7 @@ DEFAULT_PROMPT = (
 DEFAULT_PASSING_SCORE = 75
 
 
-def evaluate_answer(state: EvaluationState) -> dict:
+async def evaluate_answer(state: EvaluationState) -> dict:
     """Vyhodnotí odpověď studenta pomocí LLM."""
     print("Vyhodnocuji odpověď studenta...")
 
@@ -42,10 +42,8 @@ def evaluate_answer(state: EvaluationState) -> dict:
     learn_content: str = state["learn_content"]
     question: str = state["generated_question"]
     user_response: str = state["user_response"]
-    db = state["db"]
 
-    cfg = get_llm_config(
-        db,
+    cfg = await get_llm_config(
         "assessment_evaluator",
         default_model=DEFAULT_MODEL,
         default_prompt=DEFAULT_PROMPT,
@@ -63,7 +61,7 @@ def evaluate_answer(state: EvaluationState) -> dict:
         ),
     ]
 
-    response = llm.invoke(messages)
+    response = await llm.ainvoke(messages)
     raw = response.content.strip()
 
     # Parsování strukturované odpovědi
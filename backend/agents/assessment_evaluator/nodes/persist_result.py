@@ -3,6 +3,8 @@ from sqlalchemy.orm import Session
 
 from api import models
 from api.enums import AttemptStatus, ModuleTaskSessionStatus
+from api.src.enrollments.activity import record_module_passed
+from api.src.modules.progress import refresh_module_progress
 from agents.assessment_evaluator.state import EvaluationState
 
 
@@ -36,6 +38,7 @@ def persist_result(state: EvaluationState) -> dict:
     session: models.ModuleTaskSession = db.get(models.ModuleTaskSession, session_id)
     if is_passed:
         session.status = ModuleTaskSessionStatus.passed
+        record_module_passed(db, session.user_id, session.module)
     else:
         # Zkontroluj, zda byly vyčerpány všechny pokusy
         max_attempts = session.module.max_task_attempts
@@ -52,6 +55,7 @@ def persist_result(state: EvaluationState) -> dict:
         else:
             session.status = ModuleTaskSessionStatus.in_progress
 
+    refresh_module_progress(db, session.user_id, session.module_id)
     db.commit()
     db.refresh(attempt)
 
@@ -2,6 +2,7 @@ from dataclasses import dataclass
 
 from sqlalchemy.orm import Session
 
+from agents.base.graphs import get_graph
 from agents.assessment_evaluator.graph import create_graph
 
 
@@ -23,8 +24,8 @@ class EvaluationService:
         self.user_response = user_response
 
     async def evaluate(self) -> EvaluationResult:
-        """Sestaví a spustí graf, vrátí výsledek hodnocení."""
-        app = create_graph()
+        """Spustí (jednou zkompilovaný) graf, vrátí výsledek hodnocení."""
+        app = get_graph(create_graph)
 
         result = await app.ainvoke(
             {
@@ -1,5 +1,6 @@
 from langgraph.graph import StateGraph, END
 
+from agents.base.graphs import release_session
 from agents.assessment_generator.state import AssessmentState
 from agents.assessment_generator.nodes import (
     load_context,
@@ -21,7 +22,7 @@ def create_graph():
     workflow = StateGraph(AssessmentState)
 
     # Nodes
-    workflow.add_node("load_context", load_context)
+    workflow.add_node("load_context", release_session(load_context))
     workflow.add_node("generate_question", generate_question)
     workflow.add_node("persist_session", persist_session)
 
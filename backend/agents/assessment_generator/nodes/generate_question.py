@@ -17,7 +17,7 @@ DEFAULT_PROMPT = (
 )
 
 
-def generate_question(state: AssessmentState) -> dict:
+async def generate_question(state: AssessmentState) -> dict:
     """Vygeneruje assessment otázku pomocí LLM na základě learn_content."""
     print("Generuji assessment otázku...")
 
@@ -26,10 +26,8 @@ def generate_question(state: AssessmentState) -> dict:
         return {}
 
     learn_content: str = state["learn_content"]
-    db = state["db"]
 
-    cfg = get_llm_config(
-        db,
+    cfg = await get_llm_config(
         "assessment_generator",
         default_model=DEFAULT_MODEL,
         default_prompt=DEFAULT_PROMPT,
@@ -43,7 +41,7 @@ def generate_question(state: AssessmentState) -> dict:
         ),
     ]
 
-    response = llm.invoke(messages)
+    response = await llm.ainvoke(messages)
     generated_question = response.content.strip()
 
     print(f"Otázka vygenerována: {generated_question[:80]}...")
@@ -3,6 +3,7 @@ from sqlalchemy import select
 
 from api import models
 from api.enums import ModuleTaskSessionStatus
+from api.src.modules.progress import refresh_module_progress
 from agents.assessment_generator.state import AssessmentState
 
 
@@ -37,6 +38,7 @@ def persist_session(state: AssessmentState) -> dict:
         # Aktualizuj generated_task (přegenerování otázky pro nový pokus)
         print(f"Aktualizuji existující session {existing_session.session_id}")
         existing_session.generated_task = generated_question
+        refresh_module_progress(db, user_id, module_id)
         db.commit()
         db.refresh(existing_session)
         return {"session_id": existing_session.session_id}
@@ -49,6 +51,7 @@ def persist_session(state: AssessmentState) -> dict:
         generated_task=generated_question,
     )
     db.add(new_session)
+    refresh_module_progress(db, user_id, module_id)
     db.commit()
     db.refresh(new_session)
 
@@ -2,6 +2,7 @@ from dataclasses import dataclass
 
 from sqlalchemy.orm import Session
 
+from agents.base.graphs import get_graph
 from agents.assessment_generator.graph import create_graph
 
 
@@ -20,8 +21,8 @@ class AssessmentService:
         self.user_id = user_id
 
     async def generate(self) -> AssessmentResult:
-        """Sestaví a spustí graf, vrátí session_id a generated_question."""
-        app = create_graph()
+        """Spustí (jednou zkompilovaný) graf, vrátí session_id a generated_question."""
+        app = get_graph(create_graph)
 
         result = await app.ainvoke(
             {
@@ -0,0 +1,49 @@
+"""
+Registr zkompilovaných LangGraph grafů.
+
+Každý graf se zkompiluje jednou na proces (líně při prvním použití) a dál
+se sdílí mezi requesty. Zkompilovaný graf bez checkpointeru nenese žádný
+stav (ten je ve vstupu `ainvoke`), takže souběžná volání jedné instance
+jsou bezpečná.
+
+Uzly volající LLM jsou `async` a čekají na poskytovatele v event loopu.
+Uzly pracující se sync `Session` zůstávají synchronní — LangGraph je při
+`ainvoke` spouští v executoru, takže smyčku neblokují. Čtecí uzly před
+voláním LLM se obalují `release_session`, aby spojení nezůstalo po dobu
+čekání na poskytovatele vypůjčené z poolu.
+"""
+
+import functools
+import threading
+from collections.abc import Callable
+
+from langgraph.graph.state import CompiledStateGraph
+
+_lock = threading.Lock()
+_graphs: dict[Callable[[], CompiledStateGraph], CompiledStateGraph] = {}
+
+
+def get_graph(factory: Callable[[], CompiledStateGraph]) -> CompiledStateGraph:
+    """Vrátí zkompilovaný graf z `factory` (typicky `create_graph` agenta)."""
+    graph = _graphs.get(factory)
+    if graph is None:
+        with _lock:
+            graph = _graphs.get(factory)
+            if graph is None:
+                graph = _graphs[factory] = factory()
+    return graph
+
+
+def release_session(node: Callable[[dict], dict]) -> Callable[[dict], dict]:
+    """Po doběhnutí sync uzlu zavře `state["db"]` — ukončí transakci a vrátí
+    spojení do poolu. Session zůstává použitelná, další uzel si spojení
+    vypůjčí znovu. Uzel proto nesmí vracet ORM objekty, jen hodnoty."""
+
+    @functools.wraps(node)
+    def wrapper(state: dict) -> dict:
+        try:
+            return node(state)
+        finally:
+            state["db"].close()
+
+    return wrapper
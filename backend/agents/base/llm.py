@@ -1,18 +1,55 @@
 """
 Utility pro načtení LLM konfigurace z SystemSetting a vytvoření
 odpovídající ChatModel instance (OpenAI / Anthropic).
+
+Konfigurace se čte přes cache procesu (`api.cache`, tag `system_setting`)
+— uzly grafů k ní nepotřebují DB session. Po commitu
+`update_system_setting` se zneplatní ve všech workerech přes NOTIFY,
+pojistkou je krátké TTL.
+
+Chat modely se sdílí v rámci procesu a každý poskytovatel má jeden
+keep-alive HTTP pool s limitem spojení (`LLM__*_MAX_CONNECTIONS`).
+Async pool (a modely, které ho drží) je vázaný na event loop, ve kterém
+vznikl — pro každý běžící loop je proto vlastní sada. Pooly zavírá
+`close_http_clients()` (lifespan FastAPI, konec skriptu).
 """
 
-from dataclasses import dataclass
+import asyncio
+import threading
+from dataclasses import dataclass, field
+from functools import cached_property
 
+import anthropic
+import httpx
+import openai
 from langchain_anthropic import ChatAnthropic
 from langchain_openai import ChatOpenAI
 from langchain_core.language_models.chat_models import BaseChatModel
-from sqlalchemy import select, text
-from sqlalchemy.orm import Session
+from pydantic import TypeAdapter
+from sqlalchemy import select
 
+from api import cache
+from api.config import settings
+from api.database import async_engine
 from api.models import SystemSetting
 
+# Max. stáří konfigurace, kdyby se notifikace o změně ztratila (s)
+_CONFIG_TTL = 60
+
+
+@dataclass
+class _LoopPool:
+    """Chat modely a async HTTP pooly jednoho event loopu."""
+
+    models: dict[tuple, BaseChatModel] = field(default_factory=dict)
+    async_clients: dict[str, httpx.AsyncClient] = field(default_factory=dict)
+
+
+# Sync HTTP pooly poskytovatelů jsou na proces, zbytek na event loop
+_pool_lock = threading.RLock()
+_http_clients: dict[str, httpx.Client] = {}
+_loop_pools: dict[asyncio.AbstractEventLoop | None, _LoopPool] = {}
+
 
 @dataclass(frozen=True)
 class LLMConfig:
@@ -22,32 +59,120 @@ class LLMConfig:
     prompt: str
 
 
-def get_llm_config(
-    db: Session,
+_CONFIG_ADAPTER = TypeAdapter(LLMConfig | None)
+
+
+async def _load_llm_config(key: str) -> LLMConfig | None:
+    async with async_engine.connect() as conn:
+        row = (
+            await conn.execute(
+                select(SystemSetting.model, SystemSetting.prompt).where(
+                    SystemSetting.key == key,
+                    SystemSetting.is_active.is_(True),
+                )
+            )
+        ).one_or_none()
+    if row is None:
+        return None
+    return LLMConfig(model=row.model, prompt=row.prompt)
+
+
+async def get_llm_config(
     key: str,
     *,
     default_model: str | None = None,
     default_prompt: str | None = None,
 ) -> LLMConfig:
     """Načte SystemSetting podle klíče. Pokud neexistuje a nejsou defaulty, vyhodí chybu."""
-    row = db.execute(
-        select(SystemSetting).where(
-            SystemSetting.key == key,
-            SystemSetting.is_active == text("true"),
-        )
-    ).scalar_one_or_none()
+    config = await cache.get_or_load_async(
+        cache.key("llm_config", key=key),
+        ("system_setting",),
+        _CONFIG_ADAPTER,
+        lambda: _load_llm_config(key),
+        ttl=_CONFIG_TTL,
+    )
 
-    if row is None:
+    if config is None:
         if default_model is None or default_prompt is None:
             raise ValueError(
                 f"SystemSetting '{key}' nebyl nalezen v databázi a není nastaven výchozí prompt/model."
             )
         return LLMConfig(model=default_model, prompt=default_prompt)
 
-    return LLMConfig(
-        model=row.model,
-        prompt=row.prompt,
-    )
+    return config
+
+
+class _PooledChatAnthropic(ChatAnthropic):
+    """ChatAnthropic nad sdíleným HTTP poolem `_http_client("anthropic")`."""
+
+    @cached_property
+    def _client(self) -> anthropic.Client:
+        return anthropic.Client(
+            **self._client_params, http_client=_http_client("anthropic")
+        )
+
+    @cached_property
+    def _async_client(self) -> anthropic.AsyncClient:
+        return anthropic.AsyncClient(
+            **self._client_params, http_client=_http_client("anthropic", is_async=True)
+        )
+
+
+def _loop_pool() -> _LoopPool:
+    """Modely a async pooly běžícího event loopu (None = sync volající)."""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    pool = _loop_pools.get(loop)
+    if pool is None:
+        with _pool_lock:
+            pool = _loop_pools.get(loop)
+            if pool is None:
+                # pooly uzavřených loopů (např. po asyncio.run) už nejdou použít
+                for closed in [lp for lp in _loop_pools if lp is not None and lp.is_closed()]:
+                    del _loop_pools[closed]
+                pool = _loop_pools[loop] = _LoopPool()
+    return pool
+
+
+def _http_client(provider: str, *, is_async: bool = False):
+    """Sdílený httpx klient (keep-alive pool) pro poskytovatele."""
+    clients = _loop_pool().async_clients if is_async else _http_clients
+    client = clients.get(provider)
+    if client is None:
+        with _pool_lock:
+            client = clients.get(provider)
+            if client is None:
+                sdk = anthropic if provider == "anthropic" else openai
+                factory = sdk.DefaultAsyncHttpxClient if is_async else sdk.DefaultHttpxClient
+                max_connections = getattr(settings.llm, f"{provider}_max_connections")
+                client = clients[provider] = factory(
+                    limits=httpx.Limits(
+                        max_connections=max_connections,
+                        max_keepalive_connections=max_connections,
+                        keepalive_expiry=settings.llm.keepalive_expiry,
+                    )
+                )
+    return client
+
+
+async def close_http_clients() -> None:
+    """Zavře HTTP pooly poskytovatelů a zahodí sdílené modely.
+
+    Async pooly jde zavřít jen ve vlastním loopu — zavřou se ty běžícího
+    loopu, pooly ostatních loopů se jen zahodí.
+    """
+    with _pool_lock:
+        pool = _loop_pools.pop(asyncio.get_running_loop(), None)
+        _loop_pools.clear()
+        sync_clients = list(_http_clients.values())
+        _http_clients.clear()
+    if pool is not None:
+        for client in pool.async_clients.values():
+            await client.aclose()
+    for client in sync_clients:
+        client.close()
 
 
 def create_chat_llm(
@@ -55,12 +180,33 @@ def create_chat_llm(
     *,
     temperature: float | None = None,
 ) -> BaseChatModel:
-    """Vytvoří ChatOpenAI nebo ChatAnthropic podle prefixu názvu modelu."""
+    """Vrátí ChatOpenAI nebo ChatAnthropic podle prefixu názvu modelu.
+
+    Instance se sdílí v rámci event loopu podle (poskytovatel, model,
+    parametry) a posílá požadavky přes keep-alive pool poskytovatele — TLS
+    handshake se neplatí u každého volání. Instance je bezstavová, souběžné
+    použití je bezpečné. Volat v loopu, ve kterém se bude `ainvoke`.
+    """
     kwargs: dict = {}
     if temperature is not None:
         kwargs["temperature"] = temperature
 
-    if model.startswith("claude"):
-        return ChatAnthropic(model_name=model, **kwargs)
-
-    return ChatOpenAI(model=model, **kwargs)
+    provider = "anthropic" if model.startswith("claude") else "openai"
+    key = (provider, model, tuple(sorted(kwargs.items())))
+    models = _loop_pool().models
+    llm = models.get(key)
+    if llm is None:
+        with _pool_lock:
+            llm = models.get(key)
+            if llm is None:
+                if provider == "anthropic":
+                    llm = _PooledChatAnthropic(model_name=model, **kwargs)
+                else:
+                    llm = ChatOpenAI(
+                        model=model,
+                        http_client=_http_client("openai"),
+                        http_async_client=_http_client("openai", is_async=True),
+                        **kwargs,
+                    )
+                models[key] = llm
+    return llm
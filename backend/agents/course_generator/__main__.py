@@ -1,6 +1,9 @@
+import asyncio
+
 from dotenv import load_dotenv
 from langgraph.graph.state import CompiledStateGraph
 
+from agents.base.llm import close_http_clients
 from agents.course_generator.state import AgentState
 
 from agents.course_generator import create_graph
@@ -8,10 +11,21 @@ from agents.course_generator import create_graph
 load_dotenv()
 
 
+async def run(app: CompiledStateGraph, state: dict) -> dict:
+    try:
+        return await app.ainvoke(state)
+    finally:
+        # async HTTP pooly patří k loopu asyncio.run — zavřít před jeho koncem
+        await close_http_clients()
+
+
 if __name__ == "__main__":
     print("Spouštím Course Generator agenta...")
     app: CompiledStateGraph[AgentState, None, AgentState, AgentState] = create_graph()
 
-    result = app.invoke(
-        {"source": "/home/marek/projects/marek/github/praktik-ai/api/kurz_vystup.md"}
+    result = asyncio.run(
+        run(
+            app,
+            {"source": "/home/marek/projects/marek/github/praktik-ai/api/kurz_vystup.md"},
+        )
     )
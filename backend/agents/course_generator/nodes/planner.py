@@ -3,7 +3,7 @@ from agents.course_generator.state import AgentState, CourseGenerated, CourseInp
 from api.src.agents.progress import set_progress
 
 
-def plan_content_node(state: AgentState) -> AgentState:
+async def plan_content_node(state: AgentState) -> AgentState:
     """Node pro vytvoření modulů kurzu."""
     print("Generání modulů kurzu...")
 
@@ -13,12 +13,11 @@ def plan_content_node(state: AgentState) -> AgentState:
 
     course_input: CourseInput | None = state.get("course_input")
     summarize_content: str = state.get("summarize_content", "")
-    db = state["db"]
 
     if course_input is None:
         raise ValueError("course_input is not available in state")
 
-    cfg = get_llm_config(db, "course_planner")
+    cfg = await get_llm_config("course_planner")
     model = create_chat_llm(cfg.model)
     llm_structured = model.with_structured_output(CourseGenerated)
 
@@ -46,7 +45,7 @@ DÉLKA NA MODUL: {module_duration_info}
 OBSAH K ZPRACOVÁNÍ:
 {summarize_content}"""
 
-    output: CourseGenerated = llm_structured.invoke(prompt)
+    output: CourseGenerated = await llm_structured.ainvoke(prompt)
 
     state["course"] = output
 
@@ -2,7 +2,7 @@ from sqlalchemy import Update, update
 from sqlalchemy.orm.session import Session
 
 from agents.course_generator.state import AgentState, CourseGenerated
-from api import models
+from api import cache, models
 from api.src.agents.progress import set_progress
 
 
@@ -98,6 +98,7 @@ def save_to_db_node(state: AgentState) -> AgentState:
                     )
                     db.add(db_keyword)
 
+    cache.invalidate(db, "courses", f"course:{course_id}")
     db.commit()
 
     print(f"   -> Kurz uložen do databáze (course_id: {course_id})")
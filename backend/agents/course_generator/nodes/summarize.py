@@ -6,14 +6,13 @@ from agents.course_generator.state import CourseInput
 from api.src.agents.progress import set_progress
 
 
-def summarize_content_node(state: AgentState) -> AgentState:
+async def summarize_content_node(state: AgentState) -> AgentState:
     """Node pro vytvoření sumarizaci kurzu."""
     print("Generání sumarizace kurzu...")
 
     course_input: CourseInput | None = state.get("course_input")
     source_content = state.get("source_content", "")
     course_id = state.get("course_id")
-    db = state["db"]
 
     if course_id is not None:
         set_progress(course_id, step=3, label="Zpracování podkladů (AI)")
@@ -24,7 +23,7 @@ def summarize_content_node(state: AgentState) -> AgentState:
     if course_id is None:
         raise ValueError("course_id is not available in state")
 
-    cfg = get_llm_config(db, "course_summarizer")
+    cfg = await get_llm_config("course_summarizer")
     model = create_chat_llm(cfg.model)
 
     modules_count = course_input.modules_count_ai_generated
@@ -41,7 +40,7 @@ def summarize_content_node(state: AgentState) -> AgentState:
                 ZDROJOVÝ OBSAH:
                 {source_content}"""
 
-    output: AIMessage = model.invoke(prompt)
+    output: AIMessage = await model.ainvoke(prompt)
 
     if not output.content.strip():
         raise ValueError(
@@ -2,6 +2,7 @@ from dataclasses import dataclass
 
 from sqlalchemy.orm import Session
 
+from agents.base.graphs import get_graph
 from agents.course_generator.graph import create_graph
 from agents.course_generator.state import CourseGenerated
 
@@ -20,8 +21,8 @@ class CourseGeneratorService:
         self.course_id = course_id
 
     async def generate(self) -> CourseGenerationResult:
-        """Sestaví a spustí graf, vrátí vygenerovaný kurz."""
-        app = create_graph()
+        """Spustí (jednou zkompilovaný) graf, vrátí vygenerovaný kurz."""
+        app = get_graph(create_graph)
 
         result = await app.ainvoke(
             {
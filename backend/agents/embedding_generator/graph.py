@@ -2,6 +2,7 @@
 
 from langgraph.graph import StateGraph, END
 
+from agents.base.graphs import release_session
 from agents.embedding_generator.state import AgentState
 from agents.embedding_generator.nodes import (
     load_course_data_node,
@@ -16,7 +17,7 @@ def create_graph():
     workflow = StateGraph(AgentState)
 
     # nodes
-    workflow.add_node("load_course_data", load_course_data_node)
+    workflow.add_node("load_course_data", release_session(load_course_data_node))
     workflow.add_node("generate_embeddings", generate_embeddings_node)
     # workflow.add_node("save_embeddings", save_embeddings_node)
 
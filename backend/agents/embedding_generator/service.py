@@ -2,6 +2,7 @@ from dataclasses import dataclass
 
 from sqlalchemy.orm import Session
 
+from agents.base.graphs import get_graph
 from agents.embedding_generator.graph import create_graph
 
 
@@ -20,8 +21,8 @@ class EmbeddingGeneratorService:
         self.course_id = course_id
 
     async def generate(self) -> EmbeddingGenerationResult:
-        """Sestaví a spustí graf, vrátí statistiky generování."""
-        app = create_graph()
+        """Spustí (jednou zkompilovaný) graf, vrátí statistiky generování."""
+        app = get_graph(create_graph)
 
         result = await app.ainvoke(
             {
@@ -2,6 +2,7 @@
 
 from langgraph.graph import StateGraph, END
 
+from agents.base.graphs import release_session
 from agents.mentor.state import AgentState
 from agents.mentor.nodes import (
     load_learn_block_data,
@@ -17,7 +18,7 @@ def create_graph():
     workflow = StateGraph(AgentState)
 
     # Nodes
-    workflow.add_node("load_learn_block_data", load_learn_block_data)
+    workflow.add_node("load_learn_block_data", release_session(load_learn_block_data))
     workflow.add_node("query_vector_store", query_vector_store)
     workflow.add_node("rerank_documents", rerank_documents)
     workflow.add_node("generate_answer", generate_answer)
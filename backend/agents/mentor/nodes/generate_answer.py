@@ -20,7 +20,7 @@ DEFAULT_PROMPT = (
 )
 
 
-def generate_answer(state: AgentState) -> AgentState:
+async def generate_answer(state: AgentState) -> AgentState:
     """Uzlu pro generování odpovědi."""
     print("Generuji odpověď...")
 
@@ -30,7 +30,6 @@ def generate_answer(state: AgentState) -> AgentState:
     ai_expression_level: str = state.get(
         "ai_expression_level", "standardní srozumitelný jazyk"
     )
-    db = state["db"]
 
     print(f"Uživatelská otázka: {user_message}")
     print(f"Používám {len(context_chunks)} kontextových chunků pro generování odpovědi")
@@ -47,8 +46,7 @@ def generate_answer(state: AgentState) -> AgentState:
         ]
     )
 
-    cfg = get_llm_config(
-        db,
+    cfg = await get_llm_config(
         "mentor_answer",
         default_model=DEFAULT_MODEL,
         default_prompt=DEFAULT_PROMPT,
@@ -81,7 +79,7 @@ def generate_answer(state: AgentState) -> AgentState:
     ]
 
     try:
-        response = llm.invoke(messages)
+        response = await llm.ainvoke(messages)
         answer = response.content
 
         print(f"Odpověď vygenerována ({len(answer)} znaků)")
@@ -1,11 +1,17 @@
+import asyncio
+
 from langchain_core.documents.base import Document
 from agents.vector_store import get_vector_store
 from agents.mentor.state import AgentState, ChunkData
 from agents.mentor.state import LearnBlockQueryAttr
 
 
-def query_vector_store(state: AgentState) -> AgentState:
-    """Uzlu pro dotazování vektorového úložiště."""
+async def query_vector_store(state: AgentState) -> AgentState:
+    """Uzlu pro dotazování vektorového úložiště.
+
+    PGVector je nad sync enginem — embedding dotazu i vyhledání běží
+    ve vlákně, event loop workeru zůstává volný.
+    """
     print("Dotazuji vektorové úložiště...")
 
     query_attr: LearnBlockQueryAttr | None = state.get("learn_block_query_attr")
@@ -18,7 +24,8 @@ def query_vector_store(state: AgentState) -> AgentState:
 
     vector_store = get_vector_store()
 
-    results: list[Document] = vector_store.similarity_search(
+    results: list[Document] = await asyncio.to_thread(
+        vector_store.similarity_search,
         query=state["message"],
         k=10,  # počet nejbližších výsledků
         filter={
@@ -15,20 +15,18 @@ DEFAULT_PROMPT = (
 )
 
 
-def rerank_documents(state: AgentState) -> dict:
+async def rerank_documents(state: AgentState) -> dict:
     """LLM reranking dokumentů podle relevance k otázce."""
     print("Reranking dokumentů pomocí LLM...")
 
     context_chunks = state.get("context_chunks", [])
     user_message = state["message"]
-    db = state["db"]
 
     if len(context_chunks) <= 3:
         print("Málo dokumentů, přeskakuji reranking")
         return {}  # Necháme původní pořadí
 
-    cfg = get_llm_config(
-        db,
+    cfg = await get_llm_config(
         "mentor_reranker",
         default_model=DEFAULT_MODEL,
         default_prompt=DEFAULT_PROMPT,
@@ -51,7 +49,7 @@ def rerank_documents(state: AgentState) -> dict:
             {docs_text}"""
 
     try:
-        response: AIMessage = llm.invoke(rerank_prompt)
+        response: AIMessage = await llm.ainvoke(rerank_prompt)
 
         # Parse odpovědi
         ranked_indices: list[int] = [
@@ -2,6 +2,7 @@ from dataclasses import dataclass
 
 from sqlalchemy.orm import Session
 
+from agents.base.graphs import get_graph
 from agents.mentor.graph import create_graph
 
 
@@ -20,8 +21,8 @@ class MentorService:
         self.message = message
 
     async def chat(self) -> MentorResult:
-        """Sestaví a spustí graf, vrátí odpověď mentora."""
-        app = create_graph()
+        """Spustí (jednou zkompilovaný) graf, vrátí odpověď mentora."""
+        app = get_graph(create_graph)
 
         result = await app.ainvoke(
             {
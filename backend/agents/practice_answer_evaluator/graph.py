@@ -1,5 +1,6 @@
 from langgraph.graph import StateGraph, END
 
+from agents.base.graphs import release_session
 from agents.practice_answer_evaluator.state import EvaluatorState
 from agents.practice_answer_evaluator.nodes import (
     load_context,
@@ -17,7 +18,7 @@ def should_continue(state: EvaluatorState) -> str:
 def create_graph():
     workflow = StateGraph(EvaluatorState)
 
-    workflow.add_node("load_context", load_context)
+    workflow.add_node("load_context", release_session(load_context))
     workflow.add_node("evaluate_answer", evaluate_answer)
     workflow.add_node("persist_result", persist_result)
 
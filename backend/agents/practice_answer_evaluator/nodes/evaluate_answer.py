@@ -25,7 +25,7 @@ DEFAULT_PROMPT = (
 )
 
 
-def evaluate_answer(state: EvaluatorState) -> dict:
+async def evaluate_answer(state: EvaluatorState) -> dict:
     """Vyhodnotí otevřenou odpověď studenta pomocí LLM."""
     print("Vyhodnocuji otevřenou procvičovací odpověď...")
 
@@ -35,10 +35,8 @@ def evaluate_answer(state: EvaluatorState) -> dict:
     learn_content: str = state["learn_content"]
     question: str = state["generated_question"]
     user_input: str = state["user_input"]
-    db = state["db"]
 
-    cfg = get_llm_config(
-        db,
+    cfg = await get_llm_config(
         "practice_answer_evaluator",
         default_model=DEFAULT_MODEL,
         default_prompt=DEFAULT_PROMPT,
@@ -56,7 +54,7 @@ def evaluate_answer(state: EvaluatorState) -> dict:
         ),
     ]
 
-    response = llm.invoke(messages)
+    response = await llm.ainvoke(messages)
     raw = response.content.strip()
 
     is_correct, ai_response = _parse_evaluation(raw)
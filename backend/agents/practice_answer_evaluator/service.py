@@ -2,6 +2,7 @@ from dataclasses import dataclass
 
 from sqlalchemy.orm import Session
 
+from agents.base.graphs import get_graph
 from agents.practice_answer_evaluator.graph import create_graph
 
 
@@ -21,7 +22,7 @@ class PracticeAnswerEvaluator:
         self.user_input = user_input
 
     async def evaluate(self) -> EvaluationResult:
-        app = create_graph()
+        app = get_graph(create_graph)
 
         result = await app.ainvoke(
             {
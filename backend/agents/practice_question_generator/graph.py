@@ -1,5 +1,6 @@
 from langgraph.graph import StateGraph, END
 
+from agents.base.graphs import release_session
 from agents.practice_question_generator.state import GeneratorState
 from agents.practice_question_generator.nodes import (
     load_context,
@@ -17,7 +18,7 @@ def should_continue(state: GeneratorState) -> str:
 def create_graph():
     workflow = StateGraph(GeneratorState)
 
-    workflow.add_node("load_context", load_context)
+    workflow.add_node("load_context", release_session(load_context))
     workflow.add_node("generate_question", generate_question)
     workflow.add_node("persist_question", persist_question)
 
@@ -32,7 +32,7 @@ DEFAULT_PROMPT_CLOSED = (
 )
 
 
-def generate_question(state: GeneratorState) -> dict:
+async def generate_question(state: GeneratorState) -> dict:
     """Vygeneruje procvičovací otázku pomocí LLM."""
     print("Generuji procvičovací otázku...")
 
@@ -41,14 +41,12 @@ def generate_question(state: GeneratorState) -> dict:
 
     learn_content: str = state["learn_content"]
     question_type: QuestionType = state["question_type"]
-    db = state["db"]
 
     is_closed = question_type == QuestionType.closed
     prompt_key = "practice_generator_closed" if is_closed else "practice_generator_open"
     default_prompt = DEFAULT_PROMPT_CLOSED if is_closed else DEFAULT_PROMPT_OPEN
 
-    cfg = get_llm_config(
-        db,
+    cfg = await get_llm_config(
         prompt_key,
         default_model=DEFAULT_MODEL,
         default_prompt=default_prompt,
@@ -60,7 +58,7 @@ def generate_question(state: GeneratorState) -> dict:
         HumanMessage(content=f"VÝUKOVÝ TEXT:\n{learn_content}"),
     ]
 
-    response = llm.invoke(messages)
+    response = await llm.ainvoke(messages)
     raw = response.content.strip()
 
     if is_closed:
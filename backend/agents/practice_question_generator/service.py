@@ -2,6 +2,7 @@ from dataclasses import dataclass
 
 from sqlalchemy.orm import Session
 
+from agents.base.graphs import get_graph
 from agents.practice_question_generator.graph import create_graph
 from api.enums import QuestionType
 
@@ -23,7 +24,7 @@ class PracticeQuestionGenerator:
         self.question_type = question_type
 
     async def generate(self) -> GeneratedQuestion:
-        app = create_graph()
+        app = get_graph(create_graph)
 
         result = await app.ainvoke(
             {
@@ -4,6 +4,7 @@ from langchain_core.messages import HumanMessage, SystemMessage
 from langgraph.graph import StateGraph, END
 from sqlalchemy import text
 
+from agents.base.graphs import release_session
 from agents.base.llm import create_chat_llm, get_llm_config
 from agents.sql_agent.state import AgentState
 
@@ -67,10 +68,9 @@ def get_schema(state: AgentState) -> dict:
     return {"schema": "\n\n".join(parts)}
 
 
-def generate_query(state: AgentState) -> dict:
+async def generate_query(state: AgentState) -> dict:
     """Vygeneruje SQL dotaz na základě schématu a otázky uživatele."""
-    cfg = get_llm_config(
-        state["db"],
+    cfg = await get_llm_config(
         "sql_agent_generate_query",
         default_model=DEFAULT_MODEL,
         default_prompt=DEFAULT_PROMPT,
@@ -82,7 +82,7 @@ def generate_query(state: AgentState) -> dict:
         HumanMessage(content=state["user_input"]),
     ]
 
-    response = llm.invoke(messages)
+    response = await llm.ainvoke(messages)
     return {"query": str(response.content).strip()}
 
 
@@ -113,10 +113,9 @@ Odpověz přirozeně a stručně na základě výsledku dotazu. Nepoužívej tec
 Pokud výsledek obsahuje chybu, sděl ji uživateli srozumitelně. Vracej pouze odpoveď, bez formátování."""
 
 
-def format_answer(state: AgentState) -> dict:
+async def format_answer(state: AgentState) -> dict:
     """Přeloží surový výsledek SQL dotazu do přirozené češtiny."""
-    cfg = get_llm_config(
-        state["db"],
+    cfg = await get_llm_config(
         "sql_agent_format_answer",
         default_model=DEFAULT_MODEL,
         default_prompt=FORMAT_PROMPT,
@@ -130,7 +129,7 @@ def format_answer(state: AgentState) -> dict:
         ),
     ]
 
-    response = llm.invoke(messages)
+    response = await llm.ainvoke(messages)
     return {"answer": str(response.content).strip()}
 
 
@@ -139,9 +138,9 @@ def create_graph():
     workflow = StateGraph(AgentState)
 
     workflow.add_node("list_tables", list_tables)
-    workflow.add_node("get_schema", get_schema)
+    workflow.add_node("get_schema", release_session(get_schema))
     workflow.add_node("generate_query", generate_query)
-    workflow.add_node("run_query", run_query)
+    workflow.add_node("run_query", release_session(run_query))
     workflow.add_node("format_answer", format_answer)
 
     workflow.set_entry_point("list_tables")
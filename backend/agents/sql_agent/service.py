@@ -2,6 +2,7 @@ from dataclasses import dataclass
 
 from sqlalchemy.orm import Session
 
+from agents.base.graphs import get_graph
 from agents.sql_agent.graph import create_graph
 
 
@@ -18,8 +19,8 @@ class SQLAgentService:
         self.user_input = user_input
 
     async def chat(self) -> SQLAgentResult:
-        """Sestaví a spustí graf, vrátí odpověď SQL agenta."""
-        app = create_graph()
+        """Spustí (jednou zkompilovaný) graf, vrátí odpověď SQL agenta."""
+        app = get_graph(create_graph)
 
         result = await app.ainvoke(
             {
@@ -6,7 +6,7 @@ SQLAlchemy MetaData registration of langchain_pg_collection.
 from langchain_openai import OpenAIEmbeddings
 from langchain_postgres import PGVector
 
-from api.config import settings
+from api.database import engine
 
 _embeddings = OpenAIEmbeddings(model="text-embedding-3-large")
 _vector_store: PGVector | None = None
@@ -21,7 +21,8 @@ def get_vector_store() -> PGVector:
         _vector_store = PGVector(
             embeddings=_embeddings,
             collection_name=COLLECTION_NAME,
-            connection=settings.postgres.get_connection_string(),
+            # Sdílený engine (a pool) s ORM — žádný druhý pool na proces
+            connection=engine,
             use_jsonb=True,
         )
     return _vector_store
@@ -0,0 +1,291 @@
+"""
+Plnění `audit_log` z ORM flush hooku.
+
+Zachytí insert / update / soft_delete / restore / delete všech auditovaných
+modelů (PK řádku, akce, diff sloupců; u delete snapshot smazaného řádku). Zápis nikdy není INSERT na řádek:
+
+  - `sync`  — jeden vícehodnotový INSERT na flush, ve stejné transakci,
+  - `async` — záznamy se po commitu předají vláknu, které je zapisuje
+              v dávkách mimo request (rollback je zahodí),
+  - `off`   — audit vypnut.
+
+Actor se bere ze `session.info["actor_id"]` (nastavuje `auth.get_current_user`).
+Hromadné `UPDATE` mimo flush se auditují explicitně přes `record_updates`.
+"""
+
+from __future__ import annotations
+
+import enum
+import functools
+import logging
+import queue
+import threading
+import time
+from datetime import date, datetime
+from decimal import Decimal
+
+from sqlalchemy import Engine, event, insert, inspect
+from sqlalchemy.orm import Mapper, Session, UOWTransaction, object_session
+
+from api.config import settings
+from api.enums import AuditAction
+from api.models import AuditLog
+
+log = logging.getLogger(__name__)
+
+# Tabulky, které se neaudituje (samotný audit a čistě logovací tabulky)
+_NOT_AUDITED: set[str] = {"audit_log", "mentor_interaction_log"}
+
+# Technické sloupce — jejich změna sama o sobě audit nevytváří
+_IGNORED_COLUMNS: set[str] = {"created_at", "updated_at", "last_synced_at"}
+
+_PENDING_KEY = "audit_pending"
+_DELETED_KEY = "audit_deleted"
+
+
+def _jsonable(value):
+    if value is None or isinstance(value, bool | int | float | str):
+        return value
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime | date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, dict | list):
+        return value
+    # SQL výrazy (např. func.now()) a ostatní typy
+    return str(value)
+
+
+def _row_pk(state) -> dict:
+    values = state.mapper.primary_key_from_instance(state.obj())
+    return {
+        col.key: _jsonable(value)
+        for col, value in zip(state.mapper.primary_key, values, strict=True)
+    }
+
+
+@functools.cache
+def _audited_attrs(mapper: Mapper) -> list:
+    """Sloupce, které se zapisují do diffu — bez technických, deferred
+    a generovaných (`search_vector`)."""
+    return [
+        attr
+        for attr in mapper.column_attrs
+        if attr.key not in _IGNORED_COLUMNS
+        and not attr.deferred
+        and all(col.computed is None for col in attr.columns)
+    ]
+
+
+def _entry(obj, is_new: bool, actor_id: str | None) -> dict | None:
+    state = inspect(obj)
+    table_name = state.mapper.persist_selectable.name
+    if table_name in _NOT_AUDITED:
+        return None
+
+    diff: dict[str, dict] = {}
+    for attr in _audited_attrs(state.mapper):
+        if is_new:
+            value = state.dict.get(attr.key)
+            if value is not None:
+                diff[attr.key] = {"old": None, "new": _jsonable(value)}
+            continue
+        history = state.attrs[attr.key].history
+        if history.has_changes():
+            diff[attr.key] = {
+                "old": _jsonable(history.deleted[0]) if history.deleted else None,
+                "new": _jsonable(history.added[0]) if history.added else None,
+            }
+
+    if is_new:
+        action = AuditAction.insert
+    elif not diff:
+        return None
+    elif "is_active" in diff and diff["is_active"]["new"] is False:
+        action = AuditAction.soft_delete
+    elif "is_active" in diff and diff["is_active"]["new"] is True:
+        action = AuditAction.restore
+    else:
+        action = AuditAction.update
+
+    return {
+        "table_name": table_name,
+        "row_pk": _row_pk(state),
+        "action": action,
+        "actor_id": actor_id,
+        "diff": diff,
+    }
+
+
+def _before_delete(mapper: Mapper, connection, target) -> None:
+    # Snapshot se bere těsně před DELETE (i u kaskádových mazání) jen
+    # z načtených hodnot — žádné dočítání expirovaných sloupců uvnitř flushe.
+    if mapper.persist_selectable.name in _NOT_AUDITED:
+        return
+    session = object_session(target)
+    if session is None:
+        return
+    state = inspect(target)
+    diff = {
+        attr.key: {"old": _jsonable(state.dict[attr.key]), "new": None}
+        for attr in _audited_attrs(mapper)
+        if attr.key in state.dict
+    }
+    session.info.setdefault(_DELETED_KEY, []).append(
+        {
+            "table_name": mapper.persist_selectable.name,
+            "row_pk": _row_pk(state),
+            "action": AuditAction.delete,
+            "actor_id": session.info.get("actor_id"),
+            "diff": diff,
+        }
+    )
+
+
+def _after_flush(session: Session, flush_context: UOWTransaction) -> None:
+    # after_flush: nové řádky už mají PK, history atributů ještě platí
+    actor_id = session.info.get("actor_id")
+    rows = session.info.pop(_DELETED_KEY, [])
+    for obj, is_new in [(o, True) for o in session.new] + [
+        (o, False) for o in session.dirty
+    ]:
+        entry = _entry(obj, is_new, actor_id)
+        if entry is not None:
+            rows.append(entry)
+    _store(session, rows)
+
+
+def _store(session: Session, rows: list[dict]) -> None:
+    if not rows:
+        return
+    if settings.audit.mode == "sync":
+        # executemany → insertmanyvalues = vícehodnotový INSERT
+        session.connection().execute(insert(AuditLog), rows)
+    else:
+        session.info.setdefault(_PENDING_KEY, []).extend(rows)
+
+
+def record_updates(
+    session: Session, model: type, updates: list[tuple[dict, dict[str, tuple]]]
+) -> None:
+    """Audit hromadného UPDATE mimo ORM flush (`session.execute(update(Model),
+    rows)`), který flush hook nevidí.
+
+    `updates` jsou dvojice (PK řádku, `{sloupec: (old, new)}`); zapíší se
+    stejnou cestou jako záznamy z flushe (sync / async po commitu).
+    """
+    table_name = model.__table__.name
+    if settings.audit.mode == "off" or table_name in _NOT_AUDITED:
+        return
+    actor_id = session.info.get("actor_id")
+    _store(
+        session,
+        [
+            {
+                "table_name": table_name,
+                "row_pk": {key: _jsonable(value) for key, value in row_pk.items()},
+                "action": AuditAction.update,
+                "actor_id": actor_id,
+                "diff": {
+                    key: {"old": _jsonable(old), "new": _jsonable(new)}
+                    for key, (old, new) in diff.items()
+                },
+            }
+            for row_pk, diff in updates
+        ],
+    )
+
+
+def _after_commit(session: Session) -> None:
+    rows = session.info.pop(_PENDING_KEY, None)
+    if rows:
+        _writer.submit(rows)
+
+
+def _after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+    # snapshoty z flushe, který selhal
+    session.info.pop(_DELETED_KEY, None)
+
+
+class AuditWriter:
+    """Vlákno, které zapisuje audit záznamy v dávkách (`async` režim)."""
+
+    def __init__(self):
+        self._queue: queue.Queue[dict | None] = queue.Queue()
+        self._engine: Engine | None = None
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def configure(self, engine: Engine) -> None:
+        self._engine = engine
+
+    def _ensure_started(self) -> None:
+        # Vlákno se startuje líně až v procesu, který zapisuje (ne před forkem)
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="audit-writer", daemon=True
+                )
+                self._thread.start()
+
+    def stop(self) -> None:
+        """Dopíše frontu a ukončí vlákno."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._queue.put(None)
+        thread.join(timeout=30)
+
+    def submit(self, rows: list[dict]) -> None:
+        self._ensure_started()
+        for row in rows:
+            self._queue.put(row)
+
+    def _run(self) -> None:
+        while True:
+            # Po prvním záznamu čeká max. flush_interval na naplnění dávky
+            items = [self._queue.get()]
+            deadline = time.monotonic() + settings.audit.flush_interval
+            while items[-1] is not None and len(items) < settings.audit.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    items.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            batch = [item for item in items if item is not None]
+            if batch:
+                self._write(batch)
+            if items[-1] is None:
+                return
+
+    def _write(self, batch: list[dict]) -> None:
+        try:
+            with self._engine.begin() as conn:
+                conn.execute(insert(AuditLog), batch)
+        except Exception:
+            log.exception("Failed to write %d audit log entries", len(batch))
+
+
+_writer = AuditWriter()
+
+
+def install(engine: Engine) -> None:
+    """Zaregistruje flush hooky (pro všechny Session, vč. AsyncSession)."""
+    if settings.audit.mode == "off":
+        return
+    event.listen(Mapper, "before_delete", _before_delete)
+    event.listen(Session, "after_flush", _after_flush)
+    event.listen(Session, "after_rollback", _after_rollback)
+    if settings.audit.mode == "async":
+        event.listen(Session, "after_commit", _after_commit)
+        _writer.configure(engine)
+
+
+def shutdown() -> None:
+    _writer.stop()
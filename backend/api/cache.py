@@ -0,0 +1,341 @@
+"""
+Read-through cache katalogových dat s invalidací podle tagů.
+
+Dvě vrstvy:
+  - lokální LRU v procesu (gunicorn worker),
+  - volitelně sdílená UNLOGGED tabulka `cache_entry` pro všechny workery
+    (`CACHE__SHARED=true`; nepíše se do WAL, po pádu DB je prázdná).
+
+Záznamy nesou tagy (`catalog`, `courses`, `course:42`, …). Write controllery
+volají `invalidate(db, *tags)`; zneplatnění proběhne až po commitu
+(rollback nic nezneplatní) — smaže záznamy ze sdílené tabulky a přes
+`NOTIFY cache_invalidate` i z lokálních LRU ostatních workerů. Pojistkou
+proti ztraceným notifikacím je TTL.
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass
+
+import psycopg
+from pydantic import TypeAdapter
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from api.config import settings
+from api.database import async_engine, engine
+
+log = logging.getLogger(__name__)
+
+_CHANNEL = "cache_invalidate"
+_PENDING_KEY = "cache_invalidate_tags"
+# Jak často listener maže expirované řádky sdílené vrstvy (s)
+_PURGE_INTERVAL = 300.0
+
+_SHARED_GET = text(
+    "SELECT value FROM cache_entry WHERE key = :key AND expires_at > now()"
+)
+_SHARED_SET = text(
+    """
+    INSERT INTO cache_entry (key, value, tags, expires_at)
+    VALUES (:key, :value, :tags, now() + make_interval(secs => :ttl))
+    ON CONFLICT (key) DO UPDATE
+    SET value = excluded.value, tags = excluded.tags, expires_at = excluded.expires_at
+    """
+)
+_SHARED_INVALIDATE = text(
+    """
+    WITH deleted AS (DELETE FROM cache_entry WHERE tags && CAST(:tags AS text[]))
+    SELECT pg_notify(:channel, :payload)
+    """
+)
+_NOTIFY = text("SELECT pg_notify(:channel, :payload)")
+
+
+@dataclass
+class _Entry:
+    value: object
+    expires_at: float
+    tags: frozenset[str]
+
+
+class TaggedLRU:
+    """LRU s expirací a indexem tag → klíče (thread-safe)."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._by_tag: dict[str, set[str]] = defaultdict(set)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, key: str) -> _Entry | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, value: object, tags: Iterable[str], ttl: float) -> None:
+        entry = _Entry(value, time.monotonic() + ttl, frozenset(tags))
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = entry
+            for tag in entry.tags:
+                self._by_tag[tag].add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, tags: Iterable[str]) -> int:
+        with self._lock:
+            keys = set().union(*(self._by_tag.get(tag, ()) for tag in tags))
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_tag.clear()
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry.tags:
+            keys = self._by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_tag[tag]
+
+
+_local = TaggedLRU(settings.cache.max_entries)
+
+_stats_lock = threading.Lock()
+_stats = {"local_hits": 0, "shared_hits": 0, "misses": 0, "invalidations": 0}
+
+
+def _count(name: str) -> None:
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def key(namespace: str, **params) -> str:
+    """Klíč záznamu z namespace a parametrů dotazu (nezávislý na pořadí)."""
+    return f"{namespace}:{json.dumps(params, sort_keys=True, default=str)}"
+
+
+def get_or_load[T](
+    cache_key: str,
+    tags: Iterable[str],
+    adapter: TypeAdapter[T],
+    loader: Callable[[], T],
+    ttl: float | None = None,
+) -> T:
+    """Vrátí hodnotu z cache, jinak ji načte `loader` a uloží.
+
+    `ttl` přepíše výchozí `CACHE__TTL_SECONDS` (pojistka proti ztracené
+    notifikaci).
+    """
+    if not settings.cache.enabled:
+        return loader()
+    if ttl is None:
+        ttl = settings.cache.ttl_seconds
+    entry = _local.get(cache_key)
+    if entry is not None:
+        _count("local_hits")
+        return entry.value  # type: ignore[return-value]
+
+    if settings.cache.shared:
+        try:
+            with engine.connect() as conn:
+                raw = conn.scalar(_SHARED_GET, {"key": cache_key})
+        except Exception:
+            log.exception("Shared cache read failed")
+            raw = None
+        if raw is not None:
+            _count("shared_hits")
+            value = adapter.validate_json(raw)
+            _local.set(cache_key, value, tags, ttl)
+            return value
+
+    _count("misses")
+    value = loader()
+    _local.set(cache_key, value, tags, ttl)
+    if settings.cache.shared:
+        try:
+            with engine.begin() as conn:
+                conn.execute(_SHARED_SET, _shared_row(cache_key, tags, adapter, value, ttl))
+        except Exception:
+            log.exception("Shared cache write failed")
+    return value
+
+
+async def get_or_load_async[T](
+    cache_key: str,
+    tags: Iterable[str],
+    adapter: TypeAdapter[T],
+    loader: Callable[[], Awaitable[T]],
+    ttl: float | None = None,
+) -> T:
+    """Async varianta `get_or_load` (sdílená vrstva přes async engine)."""
+    if not settings.cache.enabled:
+        return await loader()
+    if ttl is None:
+        ttl = settings.cache.ttl_seconds
+    entry = _local.get(cache_key)
+    if entry is not None:
+        _count("local_hits")
+        return entry.value  # type: ignore[return-value]
+
+    if settings.cache.shared:
+        try:
+            async with async_engine.connect() as conn:
+                raw = await conn.scalar(_SHARED_GET, {"key": cache_key})
+        except Exception:
+            log.exception("Shared cache read failed")
+            raw = None
+        if raw is not None:
+            _count("shared_hits")
+            value = adapter.validate_json(raw)
+            _local.set(cache_key, value, tags, ttl)
+            return value
+
+    _count("misses")
+    value = await loader()
+    _local.set(cache_key, value, tags, ttl)
+    if settings.cache.shared:
+        try:
+            async with async_engine.begin() as conn:
+                await conn.execute(
+                    _SHARED_SET,
+                    _shared_row(cache_key, tags, adapter, value, ttl),
+                )
+        except Exception:
+            log.exception("Shared cache write failed")
+    return value
+
+
+def _shared_row(
+    cache_key: str, tags: Iterable[str], adapter: TypeAdapter, value, ttl: float
+) -> dict:
+    return {
+        "key": cache_key,
+        "value": adapter.dump_json(value),
+        "tags": list(tags),
+        "ttl": ttl,
+    }
+
+
+def invalidate(db: Session, *tags: str) -> None:
+    """Zneplatní záznamy s danými tagy po commitu `db`."""
+    db.info.setdefault(_PENDING_KEY, set()).update(tags)
+
+
+def invalidate_now(tags: Iterable[str]) -> None:
+    """Zneplatní hned (mimo transakci — skripty, agenti)."""
+    tags = sorted(set(tags))
+    if not tags:
+        return
+    _count("invalidations")
+    _local.invalidate(tags)
+    if not settings.cache.enabled:
+        return
+    params = {"channel": _CHANNEL, "payload": ",".join(tags), "tags": tags}
+    try:
+        with engine.begin() as conn:
+            conn.execute(_SHARED_INVALIDATE if settings.cache.shared else _NOTIFY, params)
+    except Exception:
+        log.exception("Cache invalidation of %s failed", tags)
+
+
+def _after_commit(session: Session) -> None:
+    tags = session.info.pop(_PENDING_KEY, None)
+    if tags:
+        invalidate_now(tags)
+
+
+def _after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+event.listen(Session, "after_commit", _after_commit)
+event.listen(Session, "after_rollback", _after_rollback)
+
+
+def stats() -> dict:
+    with _stats_lock:
+        counters = dict(_stats)
+    lookups = counters["local_hits"] + counters["shared_hits"] + counters["misses"]
+    hits = counters["local_hits"] + counters["shared_hits"]
+    return {
+        **counters,
+        "size": len(_local),
+        "max_entries": _local.max_entries,
+        "shared": settings.cache.shared,
+        "hit_rate": hits / lookups if lookups else 0.0,
+    }
+
+
+class InvalidationListener:
+    """Vlákno s LISTEN spojením — zahazuje lokální záznamy podle NOTIFY
+    z ostatních workerů a periodicky čistí expirované řádky sdílené vrstvy."""
+
+    def __init__(self):
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if not settings.cache.enabled or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="cache-invalidation", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._stop.set()
+        thread.join(timeout=5)
+
+    def _run(self) -> None:
+        dsn = engine.url.set(drivername="postgresql").render_as_string(
+            hide_password=False
+        )
+        while not self._stop.is_set():
+            try:
+                with psycopg.connect(dsn, autocommit=True) as conn:
+                    conn.execute(f"LISTEN {_CHANNEL}")
+                    # Během výpadku spojení mohly notifikace chybět
+                    _local.clear()
+                    purged_at = time.monotonic()
+                    while not self._stop.is_set():
+                        for notify in conn.notifies(timeout=1.0):
+                            _local.invalidate(notify.payload.split(","))
+                        if (
+                            settings.cache.shared
+                            and time.monotonic() - purged_at > _PURGE_INTERVAL
+                        ):
+                            conn.execute("DELETE FROM cache_entry WHERE expires_at < now()")
+                            purged_at = time.monotonic()
+            except Exception:
+                log.exception("Cache invalidation listener failed, reconnecting")
+                self._stop.wait(5)
+
+
+listener = InvalidationListener()
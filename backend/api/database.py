@@ -1,21 +1,92 @@
+import logging
+from collections.abc import AsyncGenerator, AsyncIterator, Generator
+from contextlib import asynccontextmanager, contextmanager
 from typing import Annotated
-from fastapi import Depends
-from psycopg import ProgrammingError
+from fastapi import Depends, Request
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy import Engine, create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.orm.session import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
-from api.models import Base
+from api import audit, pool_metrics, query_stats, replica
 from api.config import settings
 
+log = logging.getLogger(__name__)
 
-engine: Engine = create_engine(settings.postgres.get_connection_string(), echo=False)
+# Jediný sync engine procesu — sdílí ho ORM i PGVector (agents/vector_store.py)
+engine: Engine = create_engine(
+    settings.postgres.get_connection_string(),
+    echo=False,
+    poolclass=pool_metrics.instrumented_pool_class(QueuePool, "sync"),
+    **settings.postgres.get_pool_options(),
+)
+pool_metrics.register_engine(engine)
+query_stats.register_engine(engine)
+audit.install(engine)
 
 SessionLocal: sessionmaker[Session] = sessionmaker(
     autocommit=False, autoflush=False, bind=engine
 )
 
 
+# Async varianta (psycopg3 async) pro endpointy, které nesmí blokovat event loop.
+# Objekty se po commitu neexpirují — lazy load v async session nejde, vše
+# potřebné se musí načíst explicitně (selectinload/joinedload).
+async_engine: AsyncEngine = create_async_engine(
+    settings.postgres.get_connection_string(),
+    echo=False,
+    poolclass=pool_metrics.instrumented_pool_class(AsyncAdaptedQueuePool, "async"),
+    **settings.postgres.get_pool_options(),
+)
+pool_metrics.register_engine(async_engine.sync_engine)
+query_stats.register_engine(async_engine.sync_engine)
+
+AsyncSessionLocal: async_sessionmaker[AsyncSession] = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False
+)
+
+
+# Volitelná read replika — jen pro endpointy s `ReadSqlSessionDependency`
+replica_engine: Engine | None = None
+async_replica_engine: AsyncEngine | None = None
+ReplicaSessionLocal: sessionmaker[Session] | None = None
+AsyncReplicaSessionLocal: async_sessionmaker[AsyncSession] | None = None
+
+if settings.postgres.replica_dsn:
+    replica_engine = create_engine(
+        settings.postgres.replica_dsn,
+        echo=False,
+        poolclass=pool_metrics.instrumented_pool_class(QueuePool, "replica"),
+        **settings.postgres.get_pool_options(),
+    )
+    pool_metrics.register_engine(replica_engine)
+    query_stats.register_engine(replica_engine)
+    async_replica_engine = create_async_engine(
+        settings.postgres.replica_dsn,
+        echo=False,
+        poolclass=pool_metrics.instrumented_pool_class(
+            AsyncAdaptedQueuePool, "replica_async"
+        ),
+        **settings.postgres.get_pool_options(),
+    )
+    pool_metrics.register_engine(async_replica_engine.sync_engine)
+    query_stats.register_engine(async_replica_engine.sync_engine)
+    ReplicaSessionLocal = sessionmaker(
+        autocommit=False, autoflush=False, bind=replica_engine
+    )
+    AsyncReplicaSessionLocal = async_sessionmaker(
+        async_replica_engine, autoflush=False, expire_on_commit=False
+    )
+
+
 def get_sql():
     """funkce vytváří, poskytuje a následně uzavírá databázovou relaci (session) pro každý HTTP požadavek."""
     db: Session = SessionLocal()
@@ -26,25 +97,93 @@ def get_sql():
         db.close()
 
 
-def init_db(create_extensions: bool = True) -> None:
-    """
-    Inicializuje databázi:
-      - volitelně vytvoří rozšíření (pg_trgm pro GIN trigram indexy),
-      - vytvoří všechny tabulky dle Base.metadata.
+async def get_async_sql() -> AsyncIterator[AsyncSession]:
+    """Async obdoba `get_sql` — jedna AsyncSession na HTTP požadavek."""
+    async with AsyncSessionLocal() as db:
+        yield db
 
-    Spouštěj jednorázově (např. při startu aplikace nebo lokálně).
-    """
-    with engine.begin() as conn:
-        if create_extensions:
+
+def _replica_allowed(request: Request) -> bool:
+    """Replika jen pro GET/HEAD a jen pokud klient nedávno sám nezapisoval."""
+    if replica_engine is None or request.method not in ("GET", "HEAD"):
+        return False
+    if request.cookies.get(replica.STICKY_COOKIE):
+        return False
+    key = replica.client_key(request.headers.get("authorization"))
+    return not replica.is_sticky(key)
+
+
+def get_read_sql(request: Request):
+    """Jako `get_sql`, ale čtení směruje na repliku, pokud je k dispozici
+    a dostatečně aktuální (jinak primary)."""
+    use_replica = _replica_allowed(request)
+    if use_replica and replica.needs_check():
+        replica.check(replica_engine)
+    db: Session | None = None
+    if use_replica and replica.is_healthy():
+        db = ReplicaSessionLocal()
+        try:
+            # spojení hned — při výpadku repliky request dojede na primary
+            db.connection()
+        except OperationalError:
+            log.warning("Read replica connection failed, using primary")
+            replica.mark_unhealthy()
+            db.close()
+            db = None
+    if db is None:
+        db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_sql(request: Request) -> AsyncIterator[AsyncSession]:
+    """Async obdoba `get_read_sql`."""
+    use_replica = _replica_allowed(request)
+    if use_replica and replica.needs_check():
+        await run_in_threadpool(replica.check, replica_engine)
+    if use_replica and replica.is_healthy():
+        async with AsyncReplicaSessionLocal() as db:
             try:
-                # Pro trigram indexy (používá se u ix_course_title_trgm)
-                conn.exec_driver_sql("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
-            except ProgrammingError as e:
-                print(e)
-                pass
+                await db.connection()
+            except OperationalError:
+                log.warning("Read replica connection failed, using primary")
+                replica.mark_unhealthy()
+            else:
+                yield db
+                return
+    async with AsyncSessionLocal() as db:
+        yield db
 
-        # Vytvoření všech tabulek a enum typů
-        Base.metadata.create_all(bind=conn)
+
+@contextmanager
+def primary_session(db: Session) -> Generator[Session]:
+    """Vrátí `db`, pokud míří na primary, jinak krátkou session na primary.
+
+    Loadery pro `api.cache` musí číst z primary — zpožděná replika by po
+    invalidaci znovu naplnila cache starými daty.
+    """
+    if replica_engine is None or db.bind is not replica_engine:
+        yield db
+        return
+    with SessionLocal() as primary:
+        yield primary
+
+
+@asynccontextmanager
+async def async_primary_session(
+    db: AsyncSession,
+) -> AsyncGenerator[AsyncSession]:
+    """Async obdoba `primary_session`."""
+    if async_replica_engine is None or db.bind is not async_replica_engine:
+        yield db
+        return
+    async with AsyncSessionLocal() as primary:
+        yield primary
 
 
 SessionSqlSessionDependency = Annotated[Session, Depends(get_sql)]
+AsyncSqlSessionDependency = Annotated[AsyncSession, Depends(get_async_sql)]
+ReadSqlSessionDependency = Annotated[Session, Depends(get_read_sql)]
+AsyncReadSqlSessionDependency = Annotated[AsyncSession, Depends(get_async_read_sql)]
@@ -1,15 +1,23 @@
 from __future__ import annotations
 
+import hashlib
+import json
 import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
 from datetime import datetime, timedelta, UTC
 from typing import Annotated
 
+from jwcrypto import jwk, jwt
+from jwcrypto.common import JWException
 from keycloak import (
-    KeycloakAdmin,
     KeycloakAuthenticationError,
     KeycloakConnectionError,
+    KeycloakError,
     KeycloakOpenID,
-    KeycloakOpenIDConnection,
 )
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
@@ -18,68 +26,173 @@ from sqlalchemy.orm import Session
 
 from .config import settings
 from api.database import get_sql
-from api.models import User
+from api.models import Course, User
 from api.enums import UserRole
+from api.role_sync import fetch_user_role, role_sync_worker
+from api.src.courses.controllers.snapshot import refresh_course_snapshots
 
 log = logging.getLogger(__name__)
 
 oauth2_bearer = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/token", auto_error=False)
 
-# Keycloak realm role names → DB enum
-_KC_ROLE_MAP: dict[str, UserRole] = {
-    "superadmin": UserRole.superadmin,
-    "guarantor": UserRole.guarantor,
-    "lector": UserRole.lector,
-    "user": UserRole.user,
-}
+# Minimal interval between forced JWKS refreshes (unknown `kid`), so that
+# a flood of forged tokens cannot hammer Keycloak.
+_JWKS_MIN_REFRESH = timedelta(seconds=30)
 
-# Priority order (index = weight, higher wins)
-_ROLE_PRIORITY: list[str] = ["user", "lector", "guarantor", "superadmin"]
 
-_ROLE_SYNC_TTL = timedelta(minutes=5)
+class JwksCache:
+    """Realm signing keys (JWKS) cached in-process.
 
+    Keys are fetched once and re-fetched in a background thread after
+    `refresh_seconds`; requests keep using the current key set meanwhile.
+    A token signed by an unknown `kid` (key rotation) forces a synchronous
+    refresh, rate-limited by `_JWKS_MIN_REFRESH`.
+    """
 
-def _resolve_highest_role(role_names: list[str]) -> UserRole:
-    """Pick the highest application role from a list of realm role names."""
-    best = UserRole.user
-    best_idx = 0
-    for name in role_names:
-        if name in _KC_ROLE_MAP:
-            idx = _ROLE_PRIORITY.index(name)
-            if idx > best_idx:
-                best_idx = idx
-                best = _KC_ROLE_MAP[name]
-    return best
+    def __init__(self, keycloak_openid: KeycloakOpenID, refresh_seconds: int):
+        self._keycloak_openid = keycloak_openid
+        self._refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._keys: jwk.JWKSet | None = None
+        self._fetched_at = 0.0
+        self._refreshing = False
+
+    def _fetch(self) -> jwk.JWKSet:
+        keys = jwk.JWKSet.from_json(json.dumps(self._keycloak_openid.certs()))
+        with self._lock:
+            self._keys = keys
+            self._fetched_at = time.monotonic()
+        log.info("JWKS refreshed (%d keys)", len(keys))
+        return keys
+
+    def _refresh_in_background(self) -> None:
+        try:
+            self._fetch()
+        except Exception:
+            log.exception("Background JWKS refresh failed")
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def get(self) -> jwk.JWKSet:
+        """Return the cached key set, fetching it on first use."""
+        with self._lock:
+            keys = self._keys
+            stale = time.monotonic() - self._fetched_at > self._refresh_seconds
+            spawn = keys is not None and stale and not self._refreshing
+            if spawn:
+                self._refreshing = True
+        if keys is None:
+            return self._fetch()
+        if spawn:
+            threading.Thread(
+                target=self._refresh_in_background, name="jwks-refresh", daemon=True
+            ).start()
+        return keys
+
+    def refresh_for_unknown_key(self) -> jwk.JWKSet:
+        """Force a refresh after a `kid` miss (unless refreshed very recently)."""
+        with self._lock:
+            recent = time.monotonic() - self._fetched_at < (
+                _JWKS_MIN_REFRESH.total_seconds()
+            )
+            keys = self._keys
+        if recent and keys is not None:
+            return keys
+        return self._fetch()
 
 
-def _get_admin_client() -> KeycloakAdmin:
-    """Create a KeycloakAdmin authenticated via client credentials.
+@dataclass
+class _IntrospectionEntry:
+    user_info: dict
+    expires_at: float  # time.monotonic()
 
-    Both authentication and queries happen in the same realm (praktikai-dev).
-    The 'app' client must have Service Accounts Enabled + realm-management roles.
-    """
-    connection = KeycloakOpenIDConnection(
-        server_url=settings.keycloak.server_url,
-        client_id=settings.keycloak.client_id,
-        client_secret_key=settings.keycloak.client_secret,
-        realm_name=settings.keycloak.realm_name,
-    )
-    return KeycloakAdmin(connection=connection)
 
+class IntrospectionCache:
+    """Bounded LRU of introspect+userinfo results keyed by a token hash.
 
-def _fetch_roles_from_admin_api(user_sub: str) -> UserRole:
-    """Fetch realm roles for a user via Keycloak Admin REST API.
-
-    Falls back to UserRole.user if the Admin API is unreachable.
+    Each entry expires at the token's `exp` or after `max_age` seconds,
+    whichever comes first. Concurrent misses for the same token wait for
+    a single upstream call instead of each calling Keycloak; they give up
+    with `TimeoutError` after `wait_timeout` seconds.
     """
-    try:
-        admin = _get_admin_client()
-        realm_roles = admin.get_realm_roles_of_user(user_id=user_sub)
-        role_names = [r["name"] for r in realm_roles]
-        return _resolve_highest_role(role_names)
-    except Exception:
-        log.exception("Failed to fetch roles from Admin API for user %s", user_sub)
-        return UserRole.user
+
+    def __init__(self, max_size: int, max_age: int, wait_timeout: float):
+        self._max_size = max_size
+        self._max_age = max_age
+        self._wait_timeout = wait_timeout
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, _IntrospectionEntry] = OrderedDict()
+        self._inflight: dict[str, threading.Event] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get_or_load(
+        self, token: str, loader: Callable[[str], tuple[dict, int | None]]
+    ) -> dict:
+        """Return cached user info, calling `loader(token)` on a miss.
+
+        `loader` returns `(user_info, exp)` with `exp` as a Unix timestamp.
+        Errors raised by the loader are not cached.
+        """
+        key = hashlib.sha256(token.encode()).hexdigest()
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    if entry.expires_at > time.monotonic():
+                        self._entries.move_to_end(key)
+                        self.hits += 1
+                        return entry.user_info
+                    del self._entries[key]
+                event = self._inflight.get(key)
+                if event is None:
+                    event = self._inflight[key] = threading.Event()
+                    self.misses += 1
+                    break
+                self.coalesced += 1
+            # Another request is already asking Keycloak about this token;
+            # if Keycloak hangs, do not block this worker thread indefinitely
+            if not event.wait(self._wait_timeout):
+                raise TimeoutError("Concurrent token introspection timed out")
+
+        try:
+            user_info, exp = loader(token)
+            ttl = float(self._max_age)
+            if exp is not None:
+                ttl = min(ttl, exp - time.time())
+            with self._lock:
+                if ttl > 0:
+                    self._entries[key] = _IntrospectionEntry(
+                        user_info, time.monotonic() + ttl
+                    )
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self._max_size:
+                        self._entries.popitem(last=False)
+            return user_info
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            event.set()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self._max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+            }
+
+
+def _keycloak_unavailable() -> HTTPException:
+    return HTTPException(
+        status_code=500,
+        detail="Autentizace selhala nebo Keycloak není dostupný",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
 
 
 class Auth:
@@ -90,10 +203,21 @@ class Auth:
                 client_id=settings.keycloak.client_id,
                 realm_name=settings.keycloak.realm_name,
                 client_secret_key=settings.keycloak.client_secret,
+                timeout=settings.keycloak.timeout,
             )
         except Exception as e:
             print(f"Warning: Failed to initialize Keycloak: {e}")
             self.keycloak_openid = None
+        self.jwks = (
+            JwksCache(self.keycloak_openid, settings.keycloak.jwks_refresh_seconds)
+            if self.keycloak_openid is not None
+            else None
+        )
+        self.introspection_cache = IntrospectionCache(
+            settings.keycloak.introspect_cache_size,
+            settings.keycloak.introspect_cache_max_age,
+            settings.keycloak.timeout,
+        )
 
     def get_token(self, username: str, password: str) -> dict:
         try:
@@ -114,24 +238,41 @@ class Auth:
                 detail="Chyba při získávání tokenu z Keycloak",
             ) from e
 
-    def get_current_user(
-        self,
-        token: Annotated[str, Depends(oauth2_bearer)],
-        db: Annotated[Session, Depends(get_sql)],
-    ) -> User:
-        """Validate token and return the DB user.
-
-        Token is used ONLY for authentication (identity via sub).
-        Roles are NEVER read from the JWT — they come from the DB
-        (synced via Admin API on login).
-        """
-        if not token:
+    def _decode_jwt(self, token: str) -> dict:
+        """Verify signature, `exp`, `aud` and `iss` locally against cached JWKS."""
+        check_claims = {
+            "exp": None,
+            "iss": settings.keycloak.get_issuer(),
+            "aud": settings.keycloak.audience,
+        }
+        if self.jwks is None:
+            # Keycloak client failed to initialise, there are no keys to check
+            raise _keycloak_unavailable()
+        try:
+            keys = self.jwks.get()
+            try:
+                verified = jwt.JWT(jwt=token, key=keys, check_claims=check_claims)
+            except jwt.JWTMissingKey:
+                keys = self.jwks.refresh_for_unknown_key()
+                verified = jwt.JWT(jwt=token, key=keys, check_claims=check_claims)
+            return jwt.json_decode(verified.claims)
+        except (JWException, ValueError) as e:
             raise HTTPException(
                 status_code=401,
-                detail="Neplatné přihlašovací údaje",
+                detail="Token je neplatný nebo expiroval",
                 headers={"WWW-Authenticate": "Bearer"},
-            )
+            ) from e
+        except KeycloakError as e:
+            # certs() failed (connection, HTTP error from the JWKS endpoint)
+            raise _keycloak_unavailable() from e
 
+    def _introspect(self, token: str) -> tuple[dict, int | None]:
+        """Ask Keycloak about the token (catches revoked sessions too).
+
+        Returns the userinfo claims and the token `exp`.
+        """
+        if self.keycloak_openid is None:
+            raise _keycloak_unavailable()
         try:
             token_info: dict = self.keycloak_openid.introspect(token)
             if not token_info.get("active", False):
@@ -144,55 +285,87 @@ class Auth:
             user_info: dict = self.keycloak_openid.userinfo(token)
 
         except (KeycloakAuthenticationError, KeycloakConnectionError) as e:
-            raise HTTPException(
-                status_code=500,
-                detail="Autentizace selhala nebo Keycloak není dostupný",
-                headers={"WWW-Authenticate": "Bearer"},
-            ) from e
+            raise _keycloak_unavailable() from e
+        return user_info, token_info.get("exp")
 
-        sub: str = user_info["sub"]
-        email: str = user_info.get("email", "")
-        name: str | None = user_info.get("name")
+    def _resolve_user(self, claims: dict, db: Session) -> User:
+        """Return the DB user for verified claims, creating it on first request."""
+        sub: str = claims["sub"]
+        email: str = claims.get("email", "")
+        name: str | None = claims.get("name")
 
         user: User | None = db.scalar(select(User).where(User.sub == sub))
 
-        now = datetime.now(UTC)
-
         if user is None:
-            # First request — sync role from Admin API
-            resolved_role = _fetch_roles_from_admin_api(sub)
-            user = User(
-                sub=sub,
-                email=email,
-                display_name=name,
-                role=resolved_role,
-                last_synced_at=now,
-            )
+            # First request without a prior /auth/sync — the role is filled
+            # in by the background sync, the request never waits on Keycloak.
+            user = User(sub=sub, email=email, display_name=name, role=UserRole.user)
             db.add(user)
             db.commit()
-        else:
-            last_synced = user.last_synced_at
-            if last_synced is not None and last_synced.tzinfo is None:
-                # Older rows may have been stored as naive UTC; treat them as UTC.
-                last_synced = last_synced.replace(tzinfo=UTC)
-            if last_synced is None or now - last_synced > _ROLE_SYNC_TTL:
-                resolved_role = _fetch_roles_from_admin_api(sub)
-                if resolved_role != user.role:
-                    log.info(
-                        "Refreshing user role: %s %s -> %s",
-                        sub,
-                        user.role,
-                        resolved_role,
-                    )
-                    user.role = resolved_role
-                user.last_synced_at = now
-                db.commit()
+            role_sync_worker.request_sync()
 
         if not user.is_active:
             raise HTTPException(status_code=403, detail="Account deactivated")
 
+        # Actor pro audit log (api/audit.py) — get_sql session je per request sdílená
+        db.info["actor_id"] = sub
         return user
 
+    def get_current_user(
+        self,
+        token: Annotated[str, Depends(oauth2_bearer)],
+        db: Annotated[Session, Depends(get_sql)],
+    ) -> User:
+        """Validate token and return the DB user.
+
+        Token is used ONLY for authentication (identity via sub).
+        Roles are NEVER read from the JWT — they come from the DB
+        (synced via Admin API on login and by the background role sync).
+
+        By default (`KEYCLOAK__AUTH_MODE=jwt`) the token is verified locally
+        without any round-trip to Keycloak; with `introspect` every request
+        asks Keycloak instead.
+        """
+        if not token:
+            raise HTTPException(
+                status_code=401,
+                detail="Neplatné přihlašovací údaje",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+
+        if settings.keycloak.auth_mode == "introspect":
+            try:
+                claims = self.introspection_cache.get_or_load(token, self._introspect)
+            except TimeoutError as e:
+                raise HTTPException(
+                    status_code=503,
+                    detail="Keycloak neodpovídá, zkuste to prosím znovu",
+                    headers={"Retry-After": "1"},
+                ) from e
+        else:
+            claims = self._decode_jwt(token)
+        return self._resolve_user(claims, db)
+
+    def get_current_user_introspected(
+        self,
+        token: Annotated[str, Depends(oauth2_bearer)],
+        db: Annotated[Session, Depends(get_sql)],
+    ) -> User:
+        """Like `get_current_user`, but always introspects the token.
+
+        For revocation-sensitive routes: a locally verified JWT stays valid
+        until `exp` even after logout, introspection does not. The result is
+        never taken from the introspection cache.
+        """
+        if not token:
+            raise HTTPException(
+                status_code=401,
+                detail="Neplatné přihlašovací údaje",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        user_info, _ = self._introspect(token)
+        return self._resolve_user(user_info, db)
+
     def sync_user_from_token(self, token_str: str, db: Session) -> User:
         """Create or update a user from a Keycloak access token.
 
@@ -208,7 +381,7 @@ class Auth:
         sub: str = user_info["sub"]
         email: str = user_info.get("email", "")
         name: str | None = user_info.get("name")
-        resolved_role: UserRole = _fetch_roles_from_admin_api(sub)
+        resolved_role: UserRole = fetch_user_role(sub)
         now = datetime.now(UTC)
 
         user: User | None = db.scalar(select(User).where(User.sub == sub))
@@ -225,6 +398,9 @@ class Auth:
             user.email = email
             if not user.display_name and name:
                 user.display_name = name
+                # jméno autora je součástí snapshotů jeho schválených kurzů
+                db.flush()
+                refresh_course_snapshots(db, Course.owner_id == user.user_id)
             user.role = resolved_role
             user.last_synced_at = now
         db.commit()
@@ -240,10 +416,21 @@ ROLE_HIERARCHY: dict[str, int] = {
 }
 
 
-def require_role(min_role: str):
+def require_role(min_role: str, *, introspect: bool = False):
+    """Route dependency checking the DB role of the current user.
+
+    `introspect=True` verifies the token with Keycloak on every request
+    (`get_current_user_introspected`), so a logout or revoked session
+    takes effect immediately — used for admin routes.
+    """
     min_level: int = ROLE_HIERARCHY.get(min_role, 0)
+    get_user = (
+        auth.get_current_user_introspected if introspect else auth.get_current_user
+    )
 
-    def checker(user: Annotated[User, Depends(auth.get_current_user)]):
+    # Default form: with postponed annotations a closure-local name inside
+    # Annotated[...] cannot be resolved by FastAPI
+    def checker(user: User = Depends(get_user)):  # noqa: B008
         user_level = ROLE_HIERARCHY.get(user.role, 0)
         if user_level < min_level:
             raise HTTPException(status_code=403, detail="Nedostatečná oprávnění")
@@ -253,3 +440,4 @@ def require_role(min_role: str):
 
 auth = Auth()
 CurrentUser = Annotated[User, Depends(auth.get_current_user)]
+IntrospectedUser = Annotated[User, Depends(auth.get_current_user_introspected)]
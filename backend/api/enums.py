@@ -32,6 +32,7 @@ class AuditAction(enum.StrEnum):
     update = "update"
     soft_delete = "soft_delete"
     restore = "restore"
+    delete = "delete"
 
 
 class UserRole(enum.StrEnum):
@@ -1,4 +1,5 @@
 import logging
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
@@ -6,13 +7,33 @@ from fastapi.responses import JSONResponse
 from sqlalchemy.exc import IntegrityError
 
 
-from api.database import SessionSqlSessionDependency, init_db
-from api.seed import seed_db
+from api import replica
+from api.config import settings
+from api import audit, cache, migrations, query_stats
+from api.database import SessionSqlSessionDependency, engine
+from api.role_sync import role_sync_worker
+from agents.base.llm import close_http_clients
+from api.src.enrollments import visits
 from api.src.routers import router as api_router
 
 logger = logging.getLogger(__name__)
 
-app = FastAPI(docs_url="/")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Schéma zakládá/migruje `python -m api.manage migrate`, ne každý worker
+    migrations.verify_schema(engine)
+    role_sync_worker.start()
+    cache.listener.start()
+    yield
+    cache.listener.stop()
+    role_sync_worker.stop()
+    visits.buffer.stop()
+    audit.shutdown()
+    await close_http_clients()
+
+
+app = FastAPI(docs_url="/", lifespan=lifespan)
 
 # Configure CORS
 app.add_middleware(
@@ -24,6 +45,39 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def count_queries(request: Request, call_next):
+    """Počet SQL dotazů a čas v DB per request — do logu, v debug i do hlaviček."""
+    with query_stats.track() as stats:
+        response = await call_next(request)
+    query_stats.log_request(request.method, request.url.path, stats)
+    if settings.debug:
+        response.headers["X-DB-Query-Count"] = str(stats.count)
+        response.headers["X-DB-Time-Ms"] = f"{stats.duration_ms:.1f}"
+    return response
+
+
+@app.middleware("http")
+async def read_your_writes(request: Request, call_next):
+    """Po úspěšném zápisu čte klient chvíli z primary (viz api/replica.py)."""
+    response = await call_next(request)
+    if (
+        settings.postgres.replica_dsn
+        and request.method not in ("GET", "HEAD", "OPTIONS")
+        and response.status_code < 400
+    ):
+        replica.mark_write(replica.client_key(request.headers.get("authorization")))
+        # cookie platí i pro další requesty směrované na jiný worker
+        response.set_cookie(
+            replica.STICKY_COOKIE,
+            "1",
+            max_age=settings.postgres.replica_sticky_seconds,
+            httponly=True,
+            samesite="lax",
+        )
+    return response
+
+
 @app.exception_handler(IntegrityError)
 async def integrity_error_handler(request: Request, exc: IntegrityError) -> JSONResponse:
     logger.error("Integrity error: %s", exc)
@@ -42,10 +96,6 @@ async def unhandled_exception_handler(request: Request, exc: Exception) -> JSONR
     )
 
 
-init_db(create_extensions=True)
-seed_db()
-
-
 @app.get("/health")
 async def root(db: SessionSqlSessionDependency):
     return {"message": "ok"}
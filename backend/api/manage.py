@@ -0,0 +1,80 @@
+"""
+Jednorázové správcovské příkazy (spouští se mimo workery aplikace).
+
+    python -m api.manage migrate   # aplikuje chybějící migrace schématu
+    python -m api.manage seed      # naplní číselníky a systémová nastavení
+    python -m api.manage version   # vypíše verzi schématu v DB a v kódu
+    python -m api.manage reconcile # opraví denormalizované čítače (cron)
+    python -m api.manage snapshots # přestaví snapshoty schválených kurzů
+    python -m api.manage progress  # přestaví user_module_progress (--check jen ověří)
+"""
+
+import argparse
+import logging
+
+from api import migrations
+from api.database import SessionLocal, engine
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m api.manage")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("migrate", help="aplikuje chybějící migrace")
+    commands.add_parser("seed", help="naplní výchozí data (jen prázdné tabulky)")
+    commands.add_parser("version", help="verze schématu v DB a v kódu")
+    commands.add_parser("reconcile", help="opraví drift denormalizovaných čítačů")
+    commands.add_parser("snapshots", help="přestaví snapshoty schválených kurzů")
+    progress = commands.add_parser(
+        "progress", help="přestaví materializovaný postup v modulech"
+    )
+    progress.add_argument(
+        "--check", action="store_true", help="jen spočítá odchylky (exit 1 při driftu)"
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+
+    if args.command == "migrate":
+        applied = migrations.migrate(engine)
+        print(f"Aplikováno migrací: {len(applied)}", *applied, sep="\n  ")
+    elif args.command == "seed":
+        from api.seed import seed_db
+
+        migrations.verify_schema(engine)
+        seed_db()
+        print("Seed dokončen")
+    elif args.command == "version":
+        with engine.connect() as conn:
+            current = migrations.current_version(conn)
+        print(f"DB: {current}, kód: {migrations.latest_version()}")
+    elif args.command == "reconcile":
+        from api.src.enrollments.controllers import reconcile_enrollments_count
+
+        with SessionLocal() as db:
+            fixed = reconcile_enrollments_count(db)
+        print(f"Opraveno enrollments_count u kurzů: {fixed}")
+    elif args.command == "snapshots":
+        from api.src.courses.controllers import rebuild_course_snapshots
+
+        with SessionLocal() as db:
+            built = rebuild_course_snapshots(db)
+        print(f"Přestavěno snapshotů kurzů: {built}")
+    elif args.command == "progress":
+        from api.src.modules.progress import (
+            check_module_progress,
+            rebuild_module_progress,
+        )
+
+        with SessionLocal() as db:
+            if args.check:
+                drift = check_module_progress(db)
+                print(f"Odchylky user_module_progress: {drift}")
+                if drift:
+                    raise SystemExit(1)
+            else:
+                rows = rebuild_module_progress(db)
+                print(f"Přestavěno řádků user_module_progress: {rows}")
+
+
+if __name__ == "__main__":
+    main()
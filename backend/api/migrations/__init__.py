@@ -0,0 +1,178 @@
+"""
+Verzované migrace databázového schématu.
+
+Každá migrace je modul `mNNNN_<popis>.py` v tomto balíčku s funkcí
+`upgrade(conn: Connection) -> None`. Aplikované verze se evidují v tabulce
+`schema_migrations`. Migrace spouští jednorázově `python -m api.manage migrate`
+(před startem workerů); aplikace při startu jen ověří, že je DB aktuální.
+
+Migrace s `TRANSACTIONAL = False` běží v autocommit režimu — nutné pro
+`CREATE INDEX CONCURRENTLY` (viz `create_index_concurrently`).
+
+m0001 zakládá tabulky podle aktuálních modelů (`Base.metadata.create_all`),
+proto musí být všechny další migrace idempotentní (`IF NOT EXISTS`, …) —
+na čisté DB je jejich změna už hotová.
+"""
+
+import importlib
+import logging
+import pkgutil
+import re
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from sqlalchemy import Connection, Engine, text
+
+log = logging.getLogger(__name__)
+
+# pg advisory lock — migrace nespustí dva procesy současně
+_MIGRATION_LOCK_KEY = 0x6D696772
+
+_MODULE_RE = re.compile(r"^m(\d{4})_\w+$")
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    upgrade: Callable[[Connection], None]
+    transactional: bool = True
+
+
+def discover() -> list[Migration]:
+    """Najde všechny migrace v balíčku, seřazené podle verze."""
+    migrations: list[Migration] = []
+    for info in pkgutil.iter_modules(__path__):
+        match = _MODULE_RE.match(info.name)
+        if match is None:
+            continue
+        module = importlib.import_module(f"{__name__}.{info.name}")
+        migrations.append(
+            Migration(
+                version=int(match.group(1)),
+                name=info.name,
+                upgrade=module.upgrade,
+                transactional=getattr(module, "TRANSACTIONAL", True),
+            )
+        )
+    migrations.sort(key=lambda m: m.version)
+    versions = [m.version for m in migrations]
+    if len(versions) != len(set(versions)):
+        raise RuntimeError(f"Duplicitní verze migrací: {versions}")
+    return migrations
+
+
+def latest_version() -> int:
+    migrations = discover()
+    return migrations[-1].version if migrations else 0
+
+
+def current_version(conn: Connection) -> int:
+    """Nejvyšší aplikovaná verze (0 = prázdná / nezmigrovaná DB)."""
+    exists = conn.scalar(text("SELECT to_regclass('public.schema_migrations')"))
+    if exists is None:
+        return 0
+    return conn.scalar(text("SELECT COALESCE(MAX(version), 0) FROM schema_migrations"))
+
+
+def migrate(engine: Engine) -> list[str]:
+    """Aplikuje všechny chybějící migrace; vrací názvy aplikovaných."""
+    applied: list[str] = []
+    # Autocommit — otevřená transakce držící zámek by jinak blokovala
+    # `CREATE INDEX CONCURRENTLY` (čeká na všechny starší transakce)
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as lock_conn:
+        lock_conn.execute(
+            text("SELECT pg_advisory_lock(:key)"), {"key": _MIGRATION_LOCK_KEY}
+        )
+        try:
+            with engine.begin() as conn:
+                conn.execute(
+                    text(
+                        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+                        " version integer PRIMARY KEY,"
+                        " name text NOT NULL,"
+                        " applied_at timestamptz NOT NULL DEFAULT now())"
+                    )
+                )
+                done = set(conn.scalars(text("SELECT version FROM schema_migrations")))
+
+            for migration in discover():
+                if migration.version in done:
+                    continue
+                log.info("Applying migration %s", migration.name)
+                if migration.transactional:
+                    with engine.begin() as conn:
+                        migration.upgrade(conn)
+                        _record(conn, migration)
+                else:
+                    with engine.connect() as conn:
+                        conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+                        migration.upgrade(conn)
+                        _record(conn, migration)
+                applied.append(migration.name)
+        finally:
+            lock_conn.execute(
+                text("SELECT pg_advisory_unlock(:key)"), {"key": _MIGRATION_LOCK_KEY}
+            )
+    return applied
+
+
+def verify_schema(engine: Engine) -> None:
+    """Vyhodí RuntimeError, pokud DB nemá všechny migrace, které kód zná."""
+    expected = latest_version()
+    with engine.connect() as conn:
+        current = current_version(conn)
+    if current < expected:
+        raise RuntimeError(
+            f"Schéma databáze je ve verzi {current}, kód očekává {expected}. "
+            "Spusť `python -m api.manage migrate`."
+        )
+
+
+def create_index_concurrently(conn: Connection, name: str, definition: str) -> None:
+    """`CREATE INDEX CONCURRENTLY` bez zamčení tabulky pro zápis.
+
+    Volat jen z migrace s `TRANSACTIONAL = False`. Index, který zůstal
+    nevalidní po přerušeném běhu, se nejdřív zahodí.
+
+    Args:
+        name: název indexu
+        definition: zbytek příkazu, např. `ON course (title)`
+    """
+    invalid = conn.scalar(
+        text(
+            "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE c.relname = :name AND NOT i.indisvalid"
+        ),
+        {"name": name},
+    )
+    if invalid:
+        conn.exec_driver_sql(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
+    conn.exec_driver_sql(
+        f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{name}" {definition}'
+    )
+
+
+def create_search_config(conn: Connection, name: str) -> None:
+    """Konfigurace fulltextu `name`: `simple` + slovník `unaccent` (idempotentní).
+
+    Vyžaduje rozšíření `unaccent`.
+    """
+    exists = conn.scalar(
+        text("SELECT 1 FROM pg_ts_config WHERE cfgname = :name"), {"name": name}
+    )
+    if exists:
+        return
+    conn.exec_driver_sql(f"CREATE TEXT SEARCH CONFIGURATION {name} (COPY = simple)")
+    conn.exec_driver_sql(
+        f"ALTER TEXT SEARCH CONFIGURATION {name} "
+        "ALTER MAPPING FOR asciiword, asciihword, hword_asciipart, "
+        "word, hword, hword_part WITH unaccent, simple"
+    )
+
+
+def _record(conn: Connection, migration: Migration) -> None:
+    conn.execute(
+        text("INSERT INTO schema_migrations (version, name) VALUES (:v, :n)"),
+        {"v": migration.version, "n": migration.name},
+    )
@@ -0,0 +1,28 @@
+"""Výchozí schéma: rozšíření + tabulky podle aktuálních modelů.
+
+Na existující DB (dříve zakládané přes `init_db`) je no-op — `create_all`
+přeskočí existující tabulky.
+"""
+
+from sqlalchemy import Connection
+from sqlalchemy.exc import DBAPIError
+
+from api.migrations import create_search_config
+from api.models import SEARCH_CONFIG, Base
+
+
+def upgrade(conn: Connection) -> None:
+    for extension in ("pg_trgm", "unaccent", "vector"):
+        try:
+            # Savepoint — chybějící rozšíření nesmí shodit celou migraci
+            with conn.begin_nested():
+                conn.exec_driver_sql(f"CREATE EXTENSION IF NOT EXISTS {extension}")
+        except DBAPIError as e:
+            print(e)
+
+    conn.exec_driver_sql("CREATE SCHEMA IF NOT EXISTS keycloak")
+
+    # Generované `search_vector` sloupce ji potřebují už při create_all
+    create_search_config(conn, SEARCH_CONFIG)
+
+    Base.metadata.create_all(bind=conn)
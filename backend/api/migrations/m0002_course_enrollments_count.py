@@ -0,0 +1,34 @@
+"""Denormalizovaný čítač `course.enrollments_count` + index pro řazení katalogu.
+
+Sloupec se přidá s DEFAULT 0 (bez přepisu tabulky), jednorázově se
+dopočítá z `enrollment` a index se staví CONCURRENTLY.
+"""
+
+from sqlalchemy import Connection
+
+from api.migrations import create_index_concurrently
+
+TRANSACTIONAL = False
+
+
+def upgrade(conn: Connection) -> None:
+    conn.exec_driver_sql(
+        "ALTER TABLE course "
+        "ADD COLUMN IF NOT EXISTS enrollments_count integer NOT NULL DEFAULT 0"
+    )
+    conn.exec_driver_sql(
+        """
+        UPDATE course c SET enrollments_count = e.cnt
+        FROM (
+            SELECT course_id, count(*) AS cnt FROM enrollment
+            WHERE is_active AND left_at IS NULL
+            GROUP BY course_id
+        ) e
+        WHERE e.course_id = c.course_id AND c.enrollments_count <> e.cnt
+        """
+    )
+    create_index_concurrently(
+        conn,
+        "ix_course_enrollments_count",
+        "ON course (enrollments_count DESC, course_id)",
+    )
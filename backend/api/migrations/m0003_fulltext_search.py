@@ -0,0 +1,41 @@
+"""Fulltext: generované `search_vector` sloupce + GIN indexy.
+
+Konfigurace `cs_unaccent` = parser `simple` + `unaccent` (hledání bez ohledu
+na diakritiku). Přidání generovaného sloupce přepíše tabulku (krátký
+ACCESS EXCLUSIVE zámek); indexy se stavějí CONCURRENTLY.
+"""
+
+from sqlalchemy import Connection
+
+from api.migrations import create_index_concurrently, create_search_config
+
+TRANSACTIONAL = False
+
+_CONFIG = "cs_unaccent"
+
+# tabulka → (index, [(sloupec, váha)])
+_TABLES: dict[str, tuple[str, list[tuple[str, str]]]] = {
+    "course": ("ix_course_search_vector", [("title", "A"), ("description", "B")]),
+    "module": ("ix_module_search_vector", [("title", "A")]),
+    "learn_block": ("ix_learnblock_search_vector", [("title", "A"), ("content", "B")]),
+    "pub_resource": (
+        "ix_pub_resource_search_vector",
+        [("title", "A"), ("description", "B")],
+    ),
+}
+
+
+def upgrade(conn: Connection) -> None:
+    conn.exec_driver_sql("CREATE EXTENSION IF NOT EXISTS unaccent")
+    create_search_config(conn, _CONFIG)
+
+    for table, (index, weighted) in _TABLES.items():
+        expression = " || ".join(
+            f"setweight(to_tsvector('{_CONFIG}', coalesce({column}, '')), '{weight}')"
+            for column, weight in weighted
+        )
+        conn.exec_driver_sql(
+            f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+            f"GENERATED ALWAYS AS ({expression}) STORED"
+        )
+        create_index_concurrently(conn, index, f"ON {table} USING gin (search_vector)")
@@ -0,0 +1,19 @@
+"""Sdílená vrstva read-through cache — UNLOGGED tabulka `cache_entry`."""
+
+from sqlalchemy import Connection
+
+
+def upgrade(conn: Connection) -> None:
+    conn.exec_driver_sql(
+        """
+        CREATE UNLOGGED TABLE IF NOT EXISTS cache_entry (
+            key text PRIMARY KEY,
+            value bytea NOT NULL,
+            tags text[] NOT NULL,
+            expires_at timestamptz NOT NULL
+        )
+        """
+    )
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_cache_entry_tags ON cache_entry USING gin (tags)"
+    )
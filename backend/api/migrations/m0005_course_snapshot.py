@@ -0,0 +1,20 @@
+"""Snapshoty schválených kurzů pro studenty (`course_snapshot`).
+
+Snapshoty už schválených kurzů doplní `python -m api.manage snapshots`.
+"""
+
+from sqlalchemy import Connection
+
+
+def upgrade(conn: Connection) -> None:
+    conn.exec_driver_sql(
+        """
+        CREATE TABLE IF NOT EXISTS course_snapshot (
+            course_id bigint PRIMARY KEY
+                REFERENCES course (course_id) ON DELETE CASCADE,
+            version varchar(64) NOT NULL,
+            content bytea NOT NULL,
+            built_at timestamptz NOT NULL DEFAULT now()
+        )
+        """
+    )
@@ -0,0 +1,55 @@
+"""Materializovaný postup uživatelů v modulech (`user_module_progress`).
+
+Tabulka se založí a jednorázově naplní ze `module_task_session`
+a `task_attempt` (stejný výpočet jako `api/src/modules/progress.py`).
+"""
+
+from sqlalchemy import Connection
+
+
+def upgrade(conn: Connection) -> None:
+    conn.exec_driver_sql(
+        """
+        CREATE TABLE IF NOT EXISTS user_module_progress (
+            user_id bigint NOT NULL REFERENCES "user" (user_id),
+            module_id bigint NOT NULL REFERENCES module (module_id),
+            course_id bigint NOT NULL REFERENCES course (course_id),
+            session_id bigint NOT NULL REFERENCES module_task_session (session_id),
+            status module_task_session_status NOT NULL,
+            attempts_used integer NOT NULL,
+            last_activity_at timestamptz NOT NULL,
+            PRIMARY KEY (user_id, module_id)
+        )
+        """
+    )
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_user_module_progress_user_course "
+        "ON user_module_progress (user_id, course_id)"
+    )
+    conn.exec_driver_sql(
+        """
+        INSERT INTO user_module_progress
+        SELECT r.user_id, r.module_id, m.course_id, r.session_id, r.status,
+               (SELECT count(*) FROM task_attempt a
+                WHERE a.session_id = r.session_id AND a.status = 'evaluated'),
+               greatest(
+                   r.session_activity_at,
+                   (SELECT max(a.updated_at) FROM task_attempt a
+                    JOIN module_task_session s ON s.session_id = a.session_id
+                    WHERE s.user_id = r.user_id AND s.module_id = r.module_id)
+               )
+        FROM (
+            SELECT user_id, module_id, session_id, status,
+                   row_number() OVER (
+                       PARTITION BY user_id, module_id
+                       ORDER BY (status = 'failed'), session_id DESC
+                   ) AS priority,
+                   max(updated_at) OVER (PARTITION BY user_id, module_id)
+                       AS session_activity_at
+            FROM module_task_session
+        ) r
+        JOIN module m ON m.module_id = r.module_id
+        WHERE r.priority = 1
+        ON CONFLICT (user_id, module_id) DO NOTHING
+        """
+    )
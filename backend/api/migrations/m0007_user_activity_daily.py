@@ -0,0 +1,47 @@
+"""Denní rollup aktivity uživatelů (`user_activity_daily`).
+
+Tabulka se založí a jednorázově naplní z passed task sessions, zápisů
+a dokončených kurzů (stejné popisky jako `api/src/enrollments/activity.py`).
+"""
+
+from sqlalchemy import Connection
+
+
+def upgrade(conn: Connection) -> None:
+    conn.exec_driver_sql(
+        """
+        CREATE TABLE IF NOT EXISTS user_activity_daily (
+            user_id bigint NOT NULL REFERENCES "user" (user_id),
+            day date NOT NULL,
+            count integer NOT NULL,
+            top_titles text[] NOT NULL,
+            PRIMARY KEY (user_id, day)
+        )
+        """
+    )
+    conn.exec_driver_sql(
+        """
+        INSERT INTO user_activity_daily (user_id, day, count, top_titles)
+        SELECT user_id, CAST(timezone('UTC', at) AS date) AS day, count(*),
+               (array_agg(title ORDER BY at))[1:3]
+        FROM (
+            SELECT s.user_id, s.updated_at AS at,
+                   '✅ ' || c.title || ': ' || m.title AS title
+            FROM module_task_session s
+            JOIN module m ON m.module_id = s.module_id
+            JOIN course c ON c.course_id = m.course_id
+            WHERE s.status = 'passed'
+            UNION ALL
+            SELECT e.user_id, e.created_at, '📚 Zápis: ' || c.title
+            FROM enrollment e
+            JOIN course c ON c.course_id = e.course_id
+            UNION ALL
+            SELECT e.user_id, e.completed_at, '🏆 Dokončen: ' || c.title
+            FROM enrollment e
+            JOIN course c ON c.course_id = e.course_id
+            WHERE e.completed_at IS NOT NULL
+        ) events
+        GROUP BY user_id, day
+        ON CONFLICT (user_id, day) DO NOTHING
+        """
+    )
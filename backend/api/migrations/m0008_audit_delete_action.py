@@ -0,0 +1,7 @@
+"""Akce `delete` v enumu `audit_action` (audit tvrdých mazání přes ORM)."""
+
+from sqlalchemy import Connection
+
+
+def upgrade(conn: Connection) -> None:
+    conn.exec_driver_sql("ALTER TYPE audit_action ADD VALUE IF NOT EXISTS 'delete'")
@@ -0,0 +1,16 @@
+"""Sdílený čas posledního syncu rolí (`role_sync_state`, jediný řádek)."""
+
+from sqlalchemy import Connection
+
+
+def upgrade(conn: Connection) -> None:
+    conn.exec_driver_sql(
+        """
+        CREATE TABLE IF NOT EXISTS role_sync_state (
+            state_id integer PRIMARY KEY
+                CONSTRAINT ck_role_sync_state_single CHECK (state_id = 1),
+            synced_at timestamptz NOT NULL,
+            users_changed integer NOT NULL
+        )
+        """
+    )
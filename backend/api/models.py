@@ -1,23 +1,26 @@
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import date, datetime
 
 from sqlalchemy import (
     BigInteger,
     Boolean,
     CheckConstraint,
+    Computed,
+    Date,
     DateTime,
     Enum,
     ForeignKey,
     Identity,
     Index,
     Integer,
+    LargeBinary,
     String,
     Text,
     func,
     text,
 )
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship, DeclarativeBase
 
 from api.enums import (
@@ -81,6 +84,25 @@ class SoftDeleteMixin:
                 related_obj.soft_delete()
 
 
+# ---------- Fulltext ----------
+
+# Konfigurace fulltextu: parser `simple` + slovník `unaccent` (bez diakritiky,
+# bez stemmingu — Postgres nemá vestavěný český slovník). Zakládá ji migrace.
+SEARCH_CONFIG = "cs_unaccent"
+
+
+def search_vector_column(*weighted: tuple[str, str]) -> Mapped[str]:
+    """Generovaný `tsvector` sloupec z (sloupec, váha A–D) dvojic.
+
+    Deferred — do běžných SELECTů se nenačítá, slouží jen pro `@@` a ranking.
+    """
+    expression = " || ".join(
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce({column}, '')), '{weight}')"
+        for column, weight in weighted
+    )
+    return mapped_column(TSVECTOR, Computed(expression, persisted=True), deferred=True)
+
+
 # ---------- System ----------
 
 
@@ -164,7 +186,7 @@ class User(TimestampMixin, SoftDeleteMixin, Base):
 class AuditLog(Base):
     """
     Jedna audit tabulka pro celý systém.
-    Plní se v aplikaci (SQLAlchemy before_flush) => máš actor_id.
+    Plní se v aplikaci (SQLAlchemy flush hook, api/audit.py) => máš actor_id.
     """
 
     __tablename__ = "audit_log"
@@ -189,6 +211,42 @@ class AuditLog(Base):
     diff: Mapped[dict] = mapped_column(JSONB, nullable=False, default=dict)
 
 
+# ---------- Cache ----------
+
+
+class CacheEntry(Base):
+    """
+    Sdílená vrstva read-through cache (api/cache.py).
+    UNLOGGED — nepíše se do WAL, nereplikuje se, po pádu DB je prázdná.
+    """
+
+    __tablename__ = "cache_entry"
+    __table_args__ = (
+        Index("ix_cache_entry_tags", "tags", postgresql_using="gin"),
+        {"prefixes": ["UNLOGGED"]},
+    )
+
+    key: Mapped[str] = mapped_column(Text, primary_key=True)
+    value: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    tags: Mapped[list[str]] = mapped_column(ARRAY(Text), nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+class RoleSyncState(Base):
+    """
+    Stav synchronizace rolí z Keycloaku (api/role_sync.py) — jediný řádek.
+    Čas posledního běhu sdílený všemi workery, takže plný sync běží
+    jednou za interval, ne jednou za interval v každém procesu.
+    """
+
+    __tablename__ = "role_sync_state"
+    __table_args__ = (CheckConstraint("state_id = 1", name="ck_role_sync_state_single"),)
+
+    state_id: Mapped[int] = mapped_column(Integer, primary_key=True, default=1)
+    synced_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    users_changed: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
 # ---------- Číselníky ----------
 
 
@@ -348,6 +406,13 @@ class Course(TimestampMixin, SoftDeleteMixin, Base):
             postgresql_where=text("is_active"),
         ),
         Index("ix_course_owner_id", "owner_id"),
+        Index("ix_course_search_vector", "search_vector", postgresql_using="gin"),
+        # Řazení katalogu „nejoblíbenější první" (keyset stránkování)
+        Index(
+            "ix_course_enrollments_count",
+            text("enrollments_count DESC"),
+            "course_id",
+        ),
         CheckConstraint(
             "approved_by_id IS NULL OR approved_by_id <> owner_id",
             name="ck_course_owner_not_approver",
@@ -360,6 +425,7 @@ class Course(TimestampMixin, SoftDeleteMixin, Base):
     title: Mapped[str] = mapped_column(String(200), nullable=False)
     description: Mapped[str | None] = mapped_column(Text)
     summary: Mapped[str | None] = mapped_column(Text)
+    search_vector: Mapped[str] = search_vector_column(("title", "A"), ("description", "B"))
 
     owner_id: Mapped[int] = mapped_column(ForeignKey("user.user_id"), nullable=False)
 
@@ -381,6 +447,13 @@ class Course(TimestampMixin, SoftDeleteMixin, Base):
     )
     is_published: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
 
+    # Počet aktivních zápisů (is_active a bez left_at) — denormalizovaný
+    # čítač, udržují ho controllery zápisů ve stejné transakci,
+    # `reconcile_enrollments_count` opravuje případný drift.
+    enrollments_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+
     # Doporučená obtížnost kurzu — zobrazuje se na kartě v katalogu.
     # Default = mírně pokročilý dle požadavku produktu.
     difficulty: Mapped[Difficulty] = mapped_column(
@@ -440,6 +513,26 @@ class Course(TimestampMixin, SoftDeleteMixin, Base):
         return self.owner_id
 
 
+class CourseSnapshot(Base):
+    """
+    Předpočítaný strom schváleného kurzu pro studenty (gzip JSON).
+    Staví se při schválení / publikování, maže při archivaci a návratu
+    do editace (api/src/courses/controllers/snapshot.py).
+    """
+
+    __tablename__ = "course_snapshot"
+
+    course_id: Mapped[int] = mapped_column(
+        ForeignKey("course.course_id", ondelete="CASCADE"), primary_key=True
+    )
+    # hash obsahu — zároveň ETag odpovědi
+    version: Mapped[str] = mapped_column(String(64), nullable=False)
+    content: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    built_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+
+
 class CourseFeedback(TimestampMixin, SoftDeleteMixin, Base):
     """
     Komentář garanta ke kurzu + případná odpověď autora kurzu.
@@ -486,6 +579,7 @@ class Module(TimestampMixin, SoftDeleteMixin, Base):
         ),
         Index("ix_module_title", "title"),
         Index("ix_module_course_id", "course_id"),
+        Index("ix_module_search_vector", "search_vector", postgresql_using="gin"),
     )
 
     module_id: Mapped[int] = mapped_column(
@@ -497,6 +591,7 @@ class Module(TimestampMixin, SoftDeleteMixin, Base):
     title: Mapped[str] = mapped_column(String(200), nullable=False)
     max_task_attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=3)
     passing_score: Mapped[int] = mapped_column(Integer, nullable=False, default=75)
+    search_vector: Mapped[str] = search_vector_column(("title", "A"))
 
     course: Mapped[Course] = relationship(back_populates="modules")
 
@@ -596,6 +691,7 @@ class LearnBlock(TimestampMixin, SoftDeleteMixin, Base):
             postgresql_where=text("is_active"),
         ),
         Index("ix_learnblock_module_id", "module_id"),
+        Index("ix_learnblock_search_vector", "search_vector", postgresql_using="gin"),
     )
 
     learn_id: Mapped[int] = mapped_column(
@@ -606,6 +702,7 @@ class LearnBlock(TimestampMixin, SoftDeleteMixin, Base):
     )
     title: Mapped[str] = mapped_column(String(200), nullable=False)
     content: Mapped[str] = mapped_column(Text, nullable=False)
+    search_vector: Mapped[str] = search_vector_column(("title", "A"), ("content", "B"))
 
     module: Mapped[Module] = relationship(back_populates="learn_blocks")
 
@@ -912,6 +1009,56 @@ class TaskAttempt(TimestampMixin, SoftDeleteMixin, Base):
     session: Mapped[ModuleTaskSession] = relationship(back_populates="attempts")
 
 
+class UserModuleProgress(Base):
+    """
+    Materializovaný postup uživatele v modulu — jeden řádek na (user, modul)
+    s aspoň jednou task session. Přepočítává se při každé změně session
+    nebo pokusu (api/src/modules/progress.py).
+    """
+
+    __tablename__ = "user_module_progress"
+    __table_args__ = (
+        Index("ix_user_module_progress_user_course", "user_id", "course_id"),
+    )
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("user.user_id"), primary_key=True)
+    module_id: Mapped[int] = mapped_column(
+        ForeignKey("module.module_id"), primary_key=True
+    )
+    course_id: Mapped[int] = mapped_column(
+        ForeignKey("course.course_id"), nullable=False
+    )
+    # Rozhodující session: passed / in_progress, jinak nejnovější failed
+    session_id: Mapped[int] = mapped_column(
+        BigInteger, ForeignKey("module_task_session.session_id"), nullable=False
+    )
+    status: Mapped[ModuleTaskSessionStatus] = mapped_column(
+        Enum(ModuleTaskSessionStatus, name="module_task_session_status"),
+        nullable=False,
+    )
+    # Vyhodnocené pokusy rozhodující session
+    attempts_used: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_activity_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
+
+
+class UserActivityDaily(Base):
+    """
+    Denní rollup aktivity uživatele pro heat mapu — passed moduly, zápisy
+    a dokončené kurzy. Zapisuje se inkrementálně při každé události
+    (api/src/enrollments/activity.py), den je v UTC.
+    """
+
+    __tablename__ = "user_activity_daily"
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("user.user_id"), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, nullable=False)
+    # Popisky prvních (max. 3) událostí dne pro tooltip
+    top_titles: Mapped[list[str]] = mapped_column(ARRAY(Text), nullable=False)
+
+
 # ---------- Ticket ----------
 
 
@@ -1014,6 +1161,7 @@ class PubResource(TimestampMixin, SoftDeleteMixin, Base):
         Index("ix_pub_resource_subject_id", "subject_id"),
         Index("ix_pub_resource_target_id", "target_id"),
         Index("ix_pub_resource_status", "status"),
+        Index("ix_pub_resource_search_vector", "search_vector", postgresql_using="gin"),
     )
 
     resource_id: Mapped[int] = mapped_column(
@@ -1045,6 +1193,7 @@ class PubResource(TimestampMixin, SoftDeleteMixin, Base):
     allow_forks: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
     is_public: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
     is_fork: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    search_vector: Mapped[str] = search_vector_column(("title", "A"), ("description", "B"))
 
     author: Mapped[User] = relationship(foreign_keys=[author_id])
     subject: Mapped[CourseSubject | None] = relationship(foreign_keys=[subject_id])
@@ -0,0 +1,116 @@
+"""
+Telemetrie connection poolu (per proces / gunicorn worker).
+
+Sleduje čekání na spojení z poolu (histogram), počet checkoutů a churn
+spojení (nově otevřená / zavřená / invalidovaná). Slouží k dimenzování
+`max_connections` v Postgresu pro N workerů.
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from dataclasses import dataclass, field
+
+from sqlalchemy import Engine, event
+from sqlalchemy.pool import Pool
+
+# Horní hranice bucketů histogramu čekání na spojení (ms); poslední bucket je +Inf
+WAIT_BUCKETS_MS: tuple[float, ...] = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+
+@dataclass
+class PoolStats:
+    name: str
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    checkouts: int = 0
+    connects: int = 0
+    closes: int = 0
+    invalidations: int = 0
+    wait_count: int = 0
+    wait_sum_ms: float = 0.0
+    wait_max_ms: float = 0.0
+    wait_buckets: list[int] = field(
+        default_factory=lambda: [0] * (len(WAIT_BUCKETS_MS) + 1)
+    )
+
+    def observe_wait(self, ms: float) -> None:
+        with self.lock:
+            self.wait_count += 1
+            self.wait_sum_ms += ms
+            self.wait_max_ms = max(self.wait_max_ms, ms)
+            self.wait_buckets[bisect_left(WAIT_BUCKETS_MS, ms)] += 1
+
+    def incr(self, attr: str) -> None:
+        with self.lock:
+            setattr(self, attr, getattr(self, attr) + 1)
+
+
+_stats: dict[str, tuple[PoolStats, Engine]] = {}
+
+
+def instrumented_pool_class(base: type[Pool], name: str) -> type[Pool]:
+    """Podtřída `base`, která měří čekání na spojení v `_do_get`.
+
+    Statistiky drží třída, takže přežijí i `pool.recreate()` (engine.dispose()).
+    """
+    stats = PoolStats(name=name)
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return base._do_get(self)
+        finally:
+            stats.observe_wait((time.perf_counter() - start) * 1000)
+
+    return type(
+        f"Instrumented{base.__name__}", (base,), {"_do_get": _do_get, "stats": stats}
+    )
+
+
+def register_engine(engine: Engine) -> None:
+    """Napojí pool eventy enginu na jeho statistiky (pro AsyncEngine `.sync_engine`)."""
+    stats: PoolStats = type(engine.pool).stats
+    _stats[stats.name] = (stats, engine)
+
+    event.listen(engine, "checkout", lambda *_: stats.incr("checkouts"))
+    event.listen(engine, "connect", lambda *_: stats.incr("connects"))
+    event.listen(engine, "close", lambda *_: stats.incr("closes"))
+    event.listen(engine, "invalidate", lambda *_: stats.incr("invalidations"))
+
+
+def snapshot() -> list[dict]:
+    """Aktuální stav všech registrovaných poolů tohoto procesu."""
+    result = []
+    for stats, engine in _stats.values():
+        pool = engine.pool
+        with stats.lock:
+            result.append(
+                {
+                    "name": stats.name,
+                    "pid": os.getpid(),
+                    "pool_size": pool.size(),
+                    "checked_out": pool.checkedout(),
+                    "checked_in": pool.checkedin(),
+                    "overflow": max(pool.overflow(), 0),
+                    "checkouts": stats.checkouts,
+                    "connects": stats.connects,
+                    "closes": stats.closes,
+                    "invalidations": stats.invalidations,
+                    "wait_count": stats.wait_count,
+                    "wait_avg_ms": (
+                        stats.wait_sum_ms / stats.wait_count if stats.wait_count else 0.0
+                    ),
+                    "wait_max_ms": stats.wait_max_ms,
+                    "wait_histogram": {
+                        **{
+                            f"le_{bound:g}ms": count
+                            for bound, count in zip(
+                                WAIT_BUCKETS_MS, stats.wait_buckets, strict=False
+                            )
+                        },
+                        "inf": stats.wait_buckets[-1],
+                    },
+                }
+            )
+    return result
@@ -0,0 +1,97 @@
+"""
+Počítadlo SQL dotazů a času v DB per HTTP požadavek.
+
+Napojeno na engine eventy (`before/after_cursor_execute`) všech enginů.
+Middleware v main.py založí pro každý request `QueryStats` v ContextVar;
+kontext se kopíruje i do threadpoolu (sync endpointy a dependencies),
+takže se počítají všechny dotazy požadavku.
+
+Opakuje-li se stejný SQL v jednom požadavku aspoň `N_PLUS_ONE_THRESHOLD`×,
+zaloguje se varování (typicky dotaz ve smyčce / lazy load — N+1).
+"""
+
+import logging
+import time
+from collections import Counter
+from collections.abc import Generator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import Engine, event
+
+log = logging.getLogger(__name__)
+
+N_PLUS_ONE_THRESHOLD = 5
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    duration_ms: float = 0.0
+    statements: Counter[str] = field(default_factory=Counter)
+
+    def repeated(self, threshold: int = N_PLUS_ONE_THRESHOLD) -> list[tuple[str, int]]:
+        """Dotazy spuštěné aspoň `threshold`× (kandidáti na N+1)."""
+        return [(sql, n) for sql, n in self.statements.most_common() if n >= threshold]
+
+
+_current: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is None:
+        return
+    stats.count += 1
+    stats.duration_ms += (time.perf_counter() - context._query_start) * 1000
+    stats.statements[statement] += 1
+
+
+def register_engine(engine: Engine) -> None:
+    """Pro AsyncEngine předej `.sync_engine`."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+@contextmanager
+def track() -> Generator[QueryStats]:
+    """Počítá dotazy spuštěné uvnitř bloku (i ve vláknech s kopií kontextu)."""
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def query_budget(max_queries: int) -> Generator[QueryStats]:
+    """Jako `track`, ale vyhodí AssertionError při překročení rozpočtu dotazů.
+
+    Určeno pro testy controllerů (volaných přímo se session), např.::
+
+        with query_budget(6):
+            get_course_progress(db, course_id=1, user=user)
+    """
+    with track() as stats:
+        yield stats
+    if stats.count > max_queries:
+        details = "\n".join(f"  {n}× {sql[:120]}" for sql, n in stats.repeated(2))
+        raise AssertionError(
+            f"Překročen rozpočet dotazů: {stats.count} > {max_queries}\n{details}"
+        )
+
+
+def log_request(method: str, path: str, stats: QueryStats) -> None:
+    log.debug(
+        "%s %s: %d queries, %.1f ms in DB", method, path, stats.count, stats.duration_ms
+    )
+    for sql, n in stats.repeated():
+        log.warning(
+            "Possible N+1 in %s %s: %d× %s", method, path, n, " ".join(sql.split())[:200]
+        )
@@ -0,0 +1,113 @@
+"""
+Směrování čtecích dotazů na read repliku.
+
+Replika se použije, jen když:
+  - je nakonfigurovaná (`POSTGRES__REPLICA_DSN`),
+  - poslední kontrola prošla a zpoždění replikace je pod
+    `POSTGRES__REPLICA_MAX_LAG_SECONDS` (jinak / při chybě spojení → primary),
+  - klient v posledních `POSTGRES__REPLICA_STICKY_SECONDS` sám nezapisoval
+    (read-your-writes: po vlastním zápisu čte z primary, než replika dožene).
+
+Read-your-writes nese klient v krátkodobé cookie `STICKY_COOKIE` (platí
+pro kterýkoli worker); klienti bez cookies se navíc poznají podle hashe
+tokenu v paměti workeru. Zdraví repliky je per proces — selhání spojení
+v requestu ji do další kontroly vyřadí.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+
+from sqlalchemy import Engine, text
+
+from api.config import settings
+
+log = logging.getLogger(__name__)
+
+# Jak často se ptát repliky na zpoždění (s)
+_LAG_CHECK_INTERVAL = 2.0
+
+# Cookie „čti z primary" nastavená po zápisu (Max-Age = sticky interval)
+STICKY_COOKIE = "read_primary"
+
+_LAG_SQL = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(
+            EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0
+        )
+    END
+    """
+)
+
+_lock = threading.Lock()
+_healthy = False
+_checked_at = 0.0
+# klíč klienta → time.monotonic(), do kdy čte z primary
+_sticky_until: dict[str, float] = {}
+
+
+def client_key(authorization: str | None) -> str | None:
+    """Klíč pro read-your-writes — hash bearer tokenu (anonymní klient None)."""
+    if not authorization:
+        return None
+    return hashlib.sha256(authorization.encode()).hexdigest()[:32]
+
+
+def mark_write(key: str | None) -> None:
+    """Zaznamená zápis klienta — jeho čtení půjdou chvíli na primary."""
+    if key is None:
+        return
+    now = time.monotonic()
+    with _lock:
+        _sticky_until[key] = now + settings.postgres.replica_sticky_seconds
+        if len(_sticky_until) > 10_000:
+            for k in [k for k, until in _sticky_until.items() if until <= now]:
+                del _sticky_until[k]
+
+
+def is_sticky(key: str | None) -> bool:
+    if key is None:
+        return False
+    with _lock:
+        until = _sticky_until.get(key)
+    return until is not None and until > time.monotonic()
+
+
+def mark_unhealthy() -> None:
+    """Spojení na repliku selhalo — do další kontroly čtení jdou na primary."""
+    global _healthy, _checked_at
+    with _lock:
+        _healthy = False
+        _checked_at = time.monotonic()
+
+
+def needs_check() -> bool:
+    with _lock:
+        return time.monotonic() - _checked_at > _LAG_CHECK_INTERVAL
+
+
+def check(replica_engine: Engine) -> bool:
+    """Změří zpoždění repliky; výsledek platí `_LAG_CHECK_INTERVAL` sekund."""
+    global _healthy, _checked_at
+    try:
+        with replica_engine.connect() as conn:
+            lag = float(conn.scalar(_LAG_SQL) or 0)
+        healthy = lag <= settings.postgres.replica_max_lag_seconds
+        if not healthy:
+            log.warning("Read replica lag %.1fs, routing reads to primary", lag)
+    except Exception:
+        log.exception("Read replica unavailable, routing reads to primary")
+        healthy = False
+    with _lock:
+        _healthy = healthy
+        _checked_at = time.monotonic()
+    return healthy
+
+
+def is_healthy() -> bool:
+    with _lock:
+        return _healthy
@@ -0,0 +1,221 @@
+"""Background synchronisation of application roles from Keycloak.
+
+Roles live in the DB (`User.role`); the request path only reads them.
+A worker thread periodically pulls realm role membership in bulk
+(role → members) through one long-lived admin client and writes the
+differences back. The time of the last run is shared by all processes
+(`role_sync_state`), so the full sync runs once per interval overall.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from datetime import datetime, timedelta, UTC
+
+from keycloak import KeycloakAdmin, KeycloakOpenIDConnection
+from keycloak.exceptions import KeycloakGetError
+from sqlalchemy import select, text, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from api import audit
+from api.config import settings
+from api.database import SessionLocal
+from api.enums import UserRole
+from api.models import RoleSyncState, User
+
+log = logging.getLogger(__name__)
+
+# Keycloak realm role names → DB enum
+KC_ROLE_MAP: dict[str, UserRole] = {
+    "superadmin": UserRole.superadmin,
+    "guarantor": UserRole.guarantor,
+    "lector": UserRole.lector,
+    "user": UserRole.user,
+}
+
+# Priority order (index = weight, higher wins)
+_ROLE_PRIORITY: list[str] = ["user", "lector", "guarantor", "superadmin"]
+
+ROLE_SYNC_INTERVAL = timedelta(minutes=5)
+
+# pg advisory lock key — only one worker process syncs at a time
+_ROLE_SYNC_LOCK_KEY = 0x726F6C65
+
+_admin_client: KeycloakAdmin | None = None
+_admin_lock = threading.Lock()
+
+
+def resolve_highest_role(role_names: list[str]) -> UserRole:
+    """Pick the highest application role from a list of realm role names."""
+    best = UserRole.user
+    best_idx = 0
+    for name in role_names:
+        if name in KC_ROLE_MAP:
+            idx = _ROLE_PRIORITY.index(name)
+            if idx > best_idx:
+                best_idx = idx
+                best = KC_ROLE_MAP[name]
+    return best
+
+
+def get_admin_client() -> KeycloakAdmin:
+    """Return the shared KeycloakAdmin authenticated via client credentials.
+
+    The client is created once per process; its connection refreshes the
+    service-account token on its own, so no new login happens per call.
+    Both authentication and queries happen in the same realm (praktikai-dev).
+    The 'app' client must have Service Accounts Enabled + realm-management roles.
+    """
+    global _admin_client
+    with _admin_lock:
+        if _admin_client is None:
+            connection = KeycloakOpenIDConnection(
+                server_url=settings.keycloak.server_url,
+                client_id=settings.keycloak.client_id,
+                client_secret_key=settings.keycloak.client_secret,
+                realm_name=settings.keycloak.realm_name,
+                timeout=settings.keycloak.timeout,
+            )
+            _admin_client = KeycloakAdmin(connection=connection)
+        return _admin_client
+
+
+def fetch_user_role(user_sub: str) -> UserRole:
+    """Fetch realm roles for a single user via Keycloak Admin REST API.
+
+    Used on login. Falls back to UserRole.user if the Admin API is unreachable.
+    """
+    try:
+        realm_roles = get_admin_client().get_realm_roles_of_user(user_id=user_sub)
+        return resolve_highest_role([r["name"] for r in realm_roles])
+    except Exception:
+        log.exception("Failed to fetch roles from Admin API for user %s", user_sub)
+        return UserRole.user
+
+
+def fetch_role_assignments() -> dict[str, UserRole]:
+    """Return `sub → highest role` for every user holding a mapped realm role.
+
+    One paginated members request per role instead of one request per user.
+    A role missing from the realm (404) has no members; any other failure
+    raises, so a partial answer never demotes anyone.
+    """
+    admin = get_admin_client()
+    roles_by_sub: dict[str, list[str]] = {}
+    for role_name in KC_ROLE_MAP:
+        try:
+            members = admin.get_realm_role_members(role_name)
+        except KeycloakGetError as e:
+            if e.response_code != 404:
+                raise
+            log.warning("Realm role %r not found in Keycloak, no members", role_name)
+            continue
+        for member in members:
+            roles_by_sub.setdefault(member["id"], []).append(role_name)
+    return {sub: resolve_highest_role(names) for sub, names in roles_by_sub.items()}
+
+
+def sync_all_roles(db: Session, min_age: timedelta | None = None) -> int | None:
+    """Write current Keycloak roles to all users; returns the number changed.
+
+    Returns None without calling Keycloak when another process holds the
+    sync lock, or when the last run (by any process) is younger than
+    `min_age`. Only users whose role changed are written.
+    """
+    # Lock first — a process that loses it never touches Keycloak
+    locked = db.scalar(
+        text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": _ROLE_SYNC_LOCK_KEY}
+    )
+    if not locked:
+        db.rollback()
+        return None
+
+    now = datetime.now(UTC)
+    if min_age is not None:
+        synced_at = db.scalar(select(RoleSyncState.synced_at))
+        if synced_at is not None and now - synced_at < min_age:
+            db.rollback()
+            return None
+
+    assignments = fetch_role_assignments()
+
+    changes = []
+    audited = []
+    for user_id, sub, role in db.execute(select(User.user_id, User.sub, User.role)):
+        resolved_role = assignments.get(sub, UserRole.user)
+        if resolved_role != role:
+            log.info("Refreshing user role: %s %s -> %s", sub, role, resolved_role)
+            changes.append(
+                {"user_id": user_id, "role": resolved_role, "last_synced_at": now}
+            )
+            audited.append(({"user_id": user_id}, {"role": (role, resolved_role)}))
+
+    if changes:
+        # Bulk UPDATE by PK bypasses the ORM flush hook — audit it explicitly
+        db.execute(update(User), changes)
+        audit.record_updates(db, User, audited)
+    stmt = insert(RoleSyncState).values(
+        state_id=1, synced_at=now, users_changed=len(changes)
+    )
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[RoleSyncState.state_id],
+            set_={"synced_at": now, "users_changed": len(changes)},
+        )
+    )
+    db.commit()
+    return len(changes)
+
+
+class RoleSyncWorker:
+    """Daemon thread running `sync_all_roles` every `interval`.
+
+    `request_sync()` wakes it early (e.g. when an unknown user shows up);
+    several wake-ups before the next run collapse into a single sync.
+    A periodic run is skipped when another process synced within the
+    last half interval; a requested one always runs.
+    """
+
+    def __init__(self, interval: timedelta = ROLE_SYNC_INTERVAL):
+        self._interval = interval
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="role-sync", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout=10)
+        self._thread = None
+
+    def request_sync(self) -> None:
+        self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            requested = self._wake.is_set()
+            self._wake.clear()
+            try:
+                with SessionLocal() as db:
+                    changed = sync_all_roles(
+                        db, min_age=None if requested else self._interval / 2
+                    )
+                if changed is not None:
+                    log.info("Role sync finished, %d users changed", changed)
+            except Exception:
+                log.exception("Role sync failed")
+            self._wake.wait(self._interval.total_seconds())
+
+
+role_sync_worker = RoleSyncWorker()
@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 
+from api import cache
 from api.database import SessionLocal
 from api.models import CourseBlock, CourseSubject, CourseTarget, SystemSetting
 
@@ -266,6 +267,7 @@ def seed_db() -> None:
 
         if db.query(SystemSetting).count() == 0:
             db.add_all([SystemSetting(**row) for row in SYSTEM_SETTINGS])
+            cache.invalidate(db, "system_setting")
 
         db.commit()
     finally:
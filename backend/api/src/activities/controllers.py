@@ -2,7 +2,7 @@ from fastapi import HTTPException
 from sqlalchemy import select, update, and_
 from sqlalchemy.orm import Session
 
-from api import models
+from api import cache, models
 from api.src.common.utils import get_or_404, assert_course_editable
 from api.src.activities.schemas import (
     LearnBlock,
@@ -48,6 +48,7 @@ def create_learn_block(
         content=learn_data.content,
     )
     db.add(new_lb)
+    cache.invalidate(db, f"course:{module.course_id}")
     db.commit()
     db.refresh(new_lb)
 
@@ -83,6 +84,7 @@ def update_learn_block(
         .where(models.LearnBlock.learn_id == learn_id)
         .values(**learn_data.model_dump())
     )
+    cache.invalidate(db, f"course:{learn_block.module.course_id}")
     db.commit()
     db.refresh(learn_block)
 
@@ -97,6 +99,7 @@ def delete_learn_block(db: Session, learn_id: int, user: models.User) -> None:
     assert_course_editable(learn_block.module.course)
 
     learn_block.soft_delete()
+    cache.invalidate(db, f"course:{learn_block.module.course_id}")
     db.commit()
 
 
@@ -120,6 +123,7 @@ def create_practice_question(
         example_answer=question_data.example_answer,
     )
     db.add(new_question)
+    cache.invalidate(db, f"course:{module.course_id}")
     db.commit()
     db.refresh(new_question)
 
@@ -140,6 +144,7 @@ def update_practice_question(
         .where(models.PracticeQuestion.question_id == question_id)
         .values(**question_data.model_dump())
     )
+    cache.invalidate(db, f"course:{question.module.course_id}")
     db.commit()
     db.refresh(question)
 
@@ -154,6 +159,7 @@ def delete_practice_question(db: Session, question_id: int, user: models.User) -
     assert_course_editable(question.module.course)
 
     question.soft_delete()  # _soft_delete_cascade = ["closed_options", "open_keywords"]
+    cache.invalidate(db, f"course:{question.module.course_id}")
     db.commit()
 
 
@@ -174,6 +180,7 @@ def create_practice_option(
         text=option_data.text,
     )
     db.add(new_option)
+    cache.invalidate(db, f"course:{question.module.course_id}")
     db.commit()
     db.refresh(new_option)
 
@@ -194,6 +201,7 @@ def update_practice_option(
         .where(models.PracticeOption.option_id == option_id)
         .values(**option_data.model_dump())
     )
+    cache.invalidate(db, f"course:{option.question.module.course_id}")
     db.commit()
     db.refresh(option)
 
@@ -208,6 +216,7 @@ def delete_practice_option(db: Session, option_id: int, user: models.User) -> No
     assert_course_editable(option.question.module.course)
 
     option.soft_delete()
+    cache.invalidate(db, f"course:{option.question.module.course_id}")
     db.commit()
 
 
@@ -240,6 +249,7 @@ def create_question_keyword(
         keyword=keyword_data.keyword,
     )
     db.add(new_keyword)
+    cache.invalidate(db, f"course:{question.module.course_id}")
     db.commit()
     db.refresh(new_keyword)
 
@@ -274,6 +284,7 @@ def update_question_keyword(
         .where(models.QuestionKeyword.keyword_id == keyword_id)
         .values(**keyword_data.model_dump())
     )
+    cache.invalidate(db, f"course:{keyword.question.module.course_id}")
     db.commit()
     db.refresh(keyword)
 
@@ -288,4 +299,5 @@ def delete_question_keyword(db: Session, keyword_id: int, user: models.User) ->
     assert_course_editable(keyword.question.module.course)
 
     keyword.soft_delete()
+    cache.invalidate(db, f"course:{keyword.question.module.course_id}")
     db.commit()
@@ -8,7 +8,7 @@ from sqlalchemy.orm import Session, joinedload
 
 from api import models
 from api.enums import QuestionType
-from api.src.common.utils import get_or_404, check_enrollment
+from api.src.common.utils import get_or_404, check_enrollment, run_released
 from api.src.agents.schemas import (
     EvaluatePracticeAnswerResponse,
     GeneratePracticeQuestionResponse,
@@ -20,12 +20,7 @@ from agents.practice_question_generator.service import PracticeQuestionGenerator
 from agents.practice_answer_evaluator.service import PracticeAnswerEvaluator
 
 
-async def generate_practice_question(
-    db: Session,
-    module_id: int,
-    question_type: QuestionType,
-    user: models.User,
-) -> GeneratePracticeQuestionResponse:
+def _check_practice_module(db: Session, module_id: int, user: models.User) -> None:
     module = get_or_404(db, models.Module, module_id, detail="Modul nenalezen")
 
     course = module.course
@@ -37,6 +32,15 @@ async def generate_practice_question(
 
     check_enrollment(db, user, course)
 
+
+async def generate_practice_question(
+    db: Session,
+    module_id: int,
+    question_type: QuestionType,
+    user: models.User,
+) -> GeneratePracticeQuestionResponse:
+    await run_released(db, _check_practice_module, db, module_id, user)
+
     try:
         result = await PracticeQuestionGenerator(
             db=db,
@@ -59,12 +63,13 @@ async def generate_practice_question(
     )
 
 
-async def evaluate_practice_answer(
+def _check_practice_answer(
     db: Session,
     user_question_id: int,
     user_input: str,
     user: models.User,
-) -> EvaluatePracticeAnswerResponse:
+) -> EvaluatePracticeAnswerResponse | None:
+    """Ověří otázku; uzavřenou rovnou vyhodnotí, u otevřené vrátí None."""
     question: models.UserPracticeQuestion | None = (
         db.execute(
             select(models.UserPracticeQuestion).where(
@@ -102,6 +107,20 @@ async def evaluate_practice_answer(
 
     if question.question_type == QuestionType.closed:
         return _evaluate_closed(db, question, user_input)
+    return None
+
+
+async def evaluate_practice_answer(
+    db: Session,
+    user_question_id: int,
+    user_input: str,
+    user: models.User,
+) -> EvaluatePracticeAnswerResponse:
+    closed = await run_released(
+        db, _check_practice_answer, db, user_question_id, user_input, user
+    )
+    if closed is not None:
+        return closed
 
     # open — AI evaluace
     try:
@@ -1,12 +1,14 @@
 import asyncio
 
 from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
 
 from agents.sql_agent.service import SQLAgentResult, SQLAgentService
 from api.dependencies import CurrentUser, require_role
 from api.authorization import validate_owner_or_superadmin
-from api.src.common.utils import get_or_404, check_enrollment
+from api.src.common.utils import get_or_404, check_enrollment, run_released
 from api.src.agents.schemas import (
     CourseGenerationProgressResponse,
     EvaluateAssessmentRequest,
@@ -120,7 +122,7 @@ async def generate_course(
     operation_id="get_course_generation_progress",
     dependencies=[require_role("lector")],
 )
-async def get_course_generation_progress(
+def get_course_generation_progress(
     course_id: int, db: SessionSqlSessionDependency, user: CurrentUser
 ) -> CourseGenerationProgressResponse:
     """Vrátí průběh AI generování kurzu."""
@@ -148,7 +150,7 @@ async def get_course_generation_progress(
     operation_id="get_active_course_generation",
     dependencies=[require_role("lector")],
 )
-async def get_active_course_generation(
+def get_active_course_generation(
     db: SessionSqlSessionDependency, user: CurrentUser
 ) -> int | None:
     """Vrátí course_id právě běžící generace pro přihlášeného uživatele,
@@ -171,16 +173,7 @@ async def get_active_course_generation(
     return None
 
 
-@router.post(
-    "/generate-course-embeddings",
-    operation_id="generate_course_embeddings",
-    dependencies=[require_role("lector")],
-)
-async def generate_course_embeddings(
-    course_id: int, db: SessionSqlSessionDependency, user: CurrentUser
-) -> GenerateEmbeddingsResponse:
-    """Endpoint pro generování embeddingů pro LearnBlocky v kurzu."""
-
+def _check_embeddings(db: Session, course_id: int, user: models.User) -> None:
     course = get_or_404(db, models.Course, course_id, detail="Kurz nenalezen")
 
     # Validace vlastnictví
@@ -194,6 +187,18 @@ async def generate_course_embeddings(
             f"Aktuální status: {course.status.value}",
         )
 
+
+@router.post(
+    "/generate-course-embeddings",
+    operation_id="generate_course_embeddings",
+    dependencies=[require_role("lector")],
+)
+async def generate_course_embeddings(
+    course_id: int, db: SessionSqlSessionDependency, user: CurrentUser
+) -> GenerateEmbeddingsResponse:
+    """Endpoint pro generování embeddingů pro LearnBlocky v kurzu."""
+    await run_released(db, _check_embeddings, db, course_id, user)
+
     service = EmbeddingGeneratorService(db=db, course_id=course_id)
 
     result = await service.generate()
@@ -205,16 +210,11 @@ async def generate_course_embeddings(
     )
 
 
-@router.post("/learn-blocks-chat", operation_id="learn_blocks_chat")
-async def learn_blocks_chat(
-    user_input: LearnBlocksChatRequest,
-    db: SessionSqlSessionDependency,
-    user: CurrentUser,
-) -> LearnBlocksChatResponse:
-    """Endpoint pro chat s learn blockem."""
-
+def _check_learn_block_chat(
+    db: Session, learn_block_id: int, user: models.User
+) -> None:
     learn_block = get_or_404(
-        db, models.LearnBlock, user_input.learn_block_id, detail="Learn block nenalezen"
+        db, models.LearnBlock, learn_block_id, detail="Learn block nenalezen"
     )
 
     if not (
@@ -229,6 +229,30 @@ async def learn_blocks_chat(
     # Owner and superadmin can use the tutor without enrollment
     check_enrollment(db, user, course, bypass_for_owner=True)
 
+
+def _log_mentor_interaction(
+    db: Session, user_id: int, learn_block_id: int, message: str, answer: str
+) -> None:
+    db.add(
+        models.MentorInteractionLog(
+            user_id=user_id,
+            learn_id=learn_block_id,
+            user_message=message,
+            ai_response=answer,
+        )
+    )
+    db.commit()
+
+
+@router.post("/learn-blocks-chat", operation_id="learn_blocks_chat")
+async def learn_blocks_chat(
+    user_input: LearnBlocksChatRequest,
+    db: SessionSqlSessionDependency,
+    user: CurrentUser,
+) -> LearnBlocksChatResponse:
+    """Endpoint pro chat s learn blockem."""
+    await run_released(db, _check_learn_block_chat, db, user_input.learn_block_id, user)
+
     service = MentorService(
         db=db,
         learn_block_id=user_input.learn_block_id,
@@ -238,30 +262,21 @@ async def learn_blocks_chat(
 
     result = await service.chat()
 
-    log = models.MentorInteractionLog(
-        user_id=user.user_id,
-        learn_id=user_input.learn_block_id,
-        user_message=user_input.message,
-        ai_response=result.answer,
+    await run_released(
+        db,
+        _log_mentor_interaction,
+        db,
+        user.user_id,
+        user_input.learn_block_id,
+        user_input.message,
+        result.answer,
     )
-    db.add(log)
-    db.commit()
 
     return LearnBlocksChatResponse(answer=result.answer)
 
 
-@router.post(
-    "/generate-assessment",
-    operation_id="generate_assessment",
-)
-async def generate_assessment(
-    body: GenerateAssessmentRequest,
-    db: SessionSqlSessionDependency,
-    user: CurrentUser,
-) -> GenerateAssessmentResponse:
-    """Vygeneruje assessment otázku pro modul. Vyžaduje zápis do kurzu."""
-
-    module = get_or_404(db, models.Module, body.module_id, detail="Modul nenalezen")
+def _check_generate_assessment(db: Session, module_id: int, user: models.User) -> None:
+    module = get_or_404(db, models.Module, module_id, detail="Modul nenalezen")
 
     course = module.course
     if not course.is_active or course.status not in ("approved", "archived"):
@@ -278,7 +293,7 @@ async def generate_assessment(
         db.execute(
             select(models.ModuleTaskSession).where(
                 models.ModuleTaskSession.user_id == user.user_id,
-                models.ModuleTaskSession.module_id == body.module_id,
+                models.ModuleTaskSession.module_id == module_id,
                 models.ModuleTaskSession.is_active.is_(True),
                 models.ModuleTaskSession.status.in_(
                     [
@@ -302,6 +317,19 @@ async def generate_assessment(
             detail="Pro tento modul již máte aktivní assessment",
         )
 
+
+@router.post(
+    "/generate-assessment",
+    operation_id="generate_assessment",
+)
+async def generate_assessment(
+    body: GenerateAssessmentRequest,
+    db: SessionSqlSessionDependency,
+    user: CurrentUser,
+) -> GenerateAssessmentResponse:
+    """Vygeneruje assessment otázku pro modul. Vyžaduje zápis do kurzu."""
+    await run_released(db, _check_generate_assessment, db, body.module_id, user)
+
     service = AssessmentService(db=db, module_id=body.module_id, user_id=user.user_id)
 
     try:
@@ -315,22 +343,12 @@ async def generate_assessment(
     )
 
 
-@router.post(
-    "/evaluate-assessment",
-    operation_id="evaluate_assessment",
-)
-async def evaluate_assessment(
-    body: EvaluateAssessmentRequest,
-    db: SessionSqlSessionDependency,
-    user: CurrentUser,
-) -> EvaluateAssessmentResponse:
-    """Vyhodnotí odpověď studenta na assessment otázku."""
-
+def _check_evaluate_assessment(db: Session, session_id: int, user: models.User) -> None:
     # Ověření, že session patří tomuto uživateli
     session: models.ModuleTaskSession | None = (
         db.execute(
             select(models.ModuleTaskSession).where(
-                models.ModuleTaskSession.session_id == body.session_id,
+                models.ModuleTaskSession.session_id == session_id,
                 models.ModuleTaskSession.user_id == user.user_id,
                 models.ModuleTaskSession.is_active.is_(True),
             )
@@ -363,6 +381,19 @@ async def evaluate_assessment(
             detail=f"Vyčerpali jste maximální počet pokusů ({module.max_task_attempts}) pro tento modul",
         )
 
+
+@router.post(
+    "/evaluate-assessment",
+    operation_id="evaluate_assessment",
+)
+async def evaluate_assessment(
+    body: EvaluateAssessmentRequest,
+    db: SessionSqlSessionDependency,
+    user: CurrentUser,
+) -> EvaluateAssessmentResponse:
+    """Vyhodnotí odpověď studenta na assessment otázku."""
+    await run_released(db, _check_evaluate_assessment, db, body.session_id, user)
+
     service = EvaluationService(
         db=db,
         session_id=body.session_id,
@@ -422,12 +453,14 @@ async def endp_evaluate_practice_answer(
 @router.post(
     "/sql-agent-chat",
     operation_id="sql_agent_chat",
-    dependencies=[require_role("superadmin")],
+    dependencies=[require_role("superadmin", introspect=True)],
 )
 async def sql_agent_chat(
     user_input: str, db: SessionSqlSessionDependency, user: CurrentUser
 ) -> str:
     """Endpoint pro chat s SQL agentem."""
+    # spojení z autentizace se před voláním grafu vrátí do poolu
+    await run_in_threadpool(db.close)
     service = SQLAgentService(
         db=db,
         user_input=user_input,
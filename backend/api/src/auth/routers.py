@@ -2,9 +2,11 @@ from typing import Annotated
 from fastapi import APIRouter, Depends
 from fastapi.security import OAuth2PasswordRequestForm
 
+from api import models
 from api.database import SessionSqlSessionDependency
-from api.dependencies import CurrentUser, auth, oauth2_bearer
+from api.dependencies import CurrentUser, IntrospectedUser, auth, oauth2_bearer
 from api.src.auth.schemas import ProfileUpdate, ProfileNameUpdate, UserResponse
+from api.src.courses.controllers.snapshot import refresh_course_snapshots
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
@@ -40,7 +42,7 @@ def endp_me(current_user: CurrentUser) -> UserResponse:
 @router.put("/profile")
 def endp_update_profile(
     data: ProfileUpdate,
-    current_user: CurrentUser,
+    current_user: IntrospectedUser,
     db: SessionSqlSessionDependency,
 ) -> UserResponse:
     """Aktualizuje AI preference profilu přihlášeného uživatele."""
@@ -54,11 +56,14 @@ def endp_update_profile(
 @router.put("/profile/name")
 def endp_update_profile_name(
     data: ProfileNameUpdate,
-    current_user: CurrentUser,
+    current_user: IntrospectedUser,
     db: SessionSqlSessionDependency,
 ) -> UserResponse:
     """Aktualizuje zobrazované jméno profilu přihlášeného uživatele."""
     current_user.display_name = data.display_name
+    # jméno autora je součástí snapshotů jeho schválených kurzů
+    db.flush()
+    refresh_course_snapshots(db, models.Course.owner_id == current_user.user_id)
     db.commit()
     db.refresh(current_user)
     return UserResponse.model_validate(current_user)
@@ -1,15 +1,60 @@
-from sqlalchemy.orm import Session
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from api import cache
+from api.database import async_primary_session
 from api.models import CourseBlock, CourseSubject, CourseTarget
+from api.src.catalogs import schemas
 
+# Číselníky se mění jen ručně v DB — zneplatní je TTL cache. Loadery čtou
+# z primary, aby cache nenaplnila zpožděná replika.
+_CATALOG_TAGS = ("catalog",)
 
-def get_course_blocks(db: Session) -> list[CourseBlock]:
-    return db.query(CourseBlock).filter(CourseBlock.is_active.is_(True)).all()
 
+async def get_course_blocks(db: AsyncSession) -> list[schemas.CourseBlock]:
+    async def load() -> list[schemas.CourseBlock]:
+        async with async_primary_session(db) as primary:
+            rows = await primary.scalars(
+                select(CourseBlock).where(CourseBlock.is_active.is_(True))
+            )
+        return [schemas.CourseBlock.model_validate(row) for row in rows]
 
-def get_course_targets(db: Session) -> list[CourseTarget]:
-    return db.query(CourseTarget).filter(CourseTarget.is_active.is_(True)).all()
+    return await cache.get_or_load_async(
+        cache.key("catalog.course_blocks"),
+        _CATALOG_TAGS,
+        TypeAdapter(list[schemas.CourseBlock]),
+        load,
+    )
 
 
-def get_course_subjects(db: Session) -> list[CourseSubject]:
-    return db.query(CourseSubject).filter(CourseSubject.is_active.is_(True)).all()
+async def get_course_targets(db: AsyncSession) -> list[schemas.CourseTarget]:
+    async def load() -> list[schemas.CourseTarget]:
+        async with async_primary_session(db) as primary:
+            rows = await primary.scalars(
+                select(CourseTarget).where(CourseTarget.is_active.is_(True))
+            )
+        return [schemas.CourseTarget.model_validate(row) for row in rows]
+
+    return await cache.get_or_load_async(
+        cache.key("catalog.course_targets"),
+        _CATALOG_TAGS,
+        TypeAdapter(list[schemas.CourseTarget]),
+        load,
+    )
+
+
+async def get_course_subjects(db: AsyncSession) -> list[schemas.CourseSubject]:
+    async def load() -> list[schemas.CourseSubject]:
+        async with async_primary_session(db) as primary:
+            rows = await primary.scalars(
+                select(CourseSubject).where(CourseSubject.is_active.is_(True))
+            )
+        return [schemas.CourseSubject.model_validate(row) for row in rows]
+
+    return await cache.get_or_load_async(
+        cache.key("catalog.course_subjects"),
+        _CATALOG_TAGS,
+        TypeAdapter(list[schemas.CourseSubject]),
+        load,
+    )
@@ -1,22 +1,47 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request, Response
+from pydantic import TypeAdapter
 
-from api.database import SessionSqlSessionDependency
+from api.database import AsyncReadSqlSessionDependency
 from api.src.catalogs import schemas
 from api.src.catalogs.controllers import get_course_blocks, get_course_subjects, get_course_targets
+from api.src.common.conditional import conditional_get, content_version
 
 router = APIRouter(prefix="/catalogs", tags=["Catalogs"])
 
+# Číselníky se čtou z cache, ETag se proto počítá z obsahu (bez dotazu do DB)
+
 
 @router.get("/course-blocks", operation_id="list_course_blocks")
-async def list_course_blocks(db: SessionSqlSessionDependency) -> list[schemas.CourseBlock]:
-    return get_course_blocks(db)
+async def list_course_blocks(
+    request: Request, response: Response, db: AsyncReadSqlSessionDependency
+) -> list[schemas.CourseBlock]:
+    items = await get_course_blocks(db)
+    version = content_version(TypeAdapter(list[schemas.CourseBlock]), items)
+    not_modified = conditional_get(request, response, version)
+    if not_modified is not None:
+        return not_modified
+    return items
 
 
 @router.get("/course-targets", operation_id="list_course_targets")
-async def list_course_targets(db: SessionSqlSessionDependency) -> list[schemas.CourseTarget]:
-    return get_course_targets(db)
+async def list_course_targets(
+    request: Request, response: Response, db: AsyncReadSqlSessionDependency
+) -> list[schemas.CourseTarget]:
+    items = await get_course_targets(db)
+    version = content_version(TypeAdapter(list[schemas.CourseTarget]), items)
+    not_modified = conditional_get(request, response, version)
+    if not_modified is not None:
+        return not_modified
+    return items
 
 
 @router.get("/course-subjects", operation_id="list_course_subjects")
-async def list_course_subjects(db: SessionSqlSessionDependency) -> list[schemas.CourseSubject]:
-    return get_course_subjects(db)
+async def list_course_subjects(
+    request: Request, response: Response, db: AsyncReadSqlSessionDependency
+) -> list[schemas.CourseSubject]:
+    items = await get_course_subjects(db)
+    version = content_version(TypeAdapter(list[schemas.CourseSubject]), items)
+    not_modified = conditional_get(request, response, version)
+    if not_modified is not None:
+        return not_modified
+    return items
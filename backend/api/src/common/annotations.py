@@ -3,6 +3,23 @@ from typing import Annotated
 from fastapi import Query
 
 
+PAGE_LIMIT_ANNOTATION = Annotated[
+    int, Query(ge=1, le=100, description="Page size")
+]
+
+CURSOR_ANNOTATION = Annotated[
+    str | None, Query(description="Cursor returned as next_cursor by the previous page")
+]
+
+FIELDS_ANNOTATION = Annotated[
+    str | None,
+    Query(description="Comma-separated list of fields to return (default: all)"),
+]
+
+WITH_TOTAL_ANNOTATION = Annotated[
+    bool, Query(description="Include total count of matching records")
+]
+
 INCLUDE_INACTIVE_ANNOTATION = Annotated[
     bool, Query(description="Include inactive records")
 ]
@@ -30,6 +47,10 @@ COURSE_SUBJECT_ID_ANNOTATION = Annotated[
 COURSE_STATUS_ANNOTATION = Annotated[
     str | None, Query(description="Filter by course status")
 ]
+
+COURSE_DIFFICULTY_ANNOTATION = Annotated[
+    str | None, Query(description="Filter by course difficulty")
+]
 RESOURCE_STATUS_ANNOTATION = Annotated[
     str | None, Query(description="Filter by resource status")
 ]
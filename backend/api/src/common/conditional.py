@@ -0,0 +1,114 @@
+"""
+Podmíněné GET — `ETag` / `Last-Modified` a odpověď 304 Not Modified.
+
+Verze odpovědi se počítá jedním levným dotazem ještě před načtením
+a serializací dat: `max(updated_at)` a počet řádků, ze kterých se odpověď
+skládá (počet zachytí i tvrdé smazání), případně další hodnoty, které
+`updated_at` nemění.
+
+Použití v endpointu::
+
+    version = await get_version_async(db, course_links_version_query(course_id))
+    not_modified = conditional_get(request, response, version)
+    if not_modified is not None:
+        return not_modified
+    return await get_course_links(db, course_id)
+
+Odpovědi čtené z cache verzují až vrácený obsah (`content_version`) —
+verze z DB by mohla patřit k novějším datům než tělo z cache.
+
+`If-None-Match` má přednost před `If-Modified-Since` (RFC 9110).
+"""
+
+import hashlib
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from sqlalchemy import ColumnElement, Select, func, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+
+@dataclass(frozen=True)
+class Version:
+    etag: str
+    last_modified: datetime | None = None
+
+
+def _etag(*parts: object) -> str:
+    digest = hashlib.sha256("|".join(map(str, parts)).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def version_query(
+    *sources: Select, extra: tuple[ColumnElement, ...] = ()
+) -> Select:
+    """Dotaz na verzi odpovědi.
+
+    Args:
+        sources: SELECTy s jediným sloupcem `updated_at` — řádky odpovědi
+        extra: další skalární výrazy, jejichž změna nemění `updated_at`
+    """
+    rows = union_all(*sources).subquery()
+    updated_at = list(rows.c)[0]
+    return select(func.max(updated_at), func.count(), *extra).select_from(rows)
+
+
+def _version(row) -> Version | None:
+    last_modified, count, *extra = row
+    if not count:
+        # nic k verzování (neexistující záznam / prázdný výpis) — rozhodne controller
+        return None
+    return Version(_etag(last_modified, count, *extra), last_modified)
+
+
+def get_version(db: Session, stmt: Select) -> Version | None:
+    return _version(db.execute(stmt).one())
+
+
+async def get_version_async(db: AsyncSession, stmt: Select) -> Version | None:
+    return _version((await db.execute(stmt)).one())
+
+
+def content_version[T](adapter: TypeAdapter[T], value: T) -> Version:
+    """Verze z už načtených dat (např. z cache) — bez dotazu do DB."""
+    return Version(_etag(adapter.dump_json(value).decode()))
+
+
+def conditional_get(
+    request: Request, response: Response, version: Version | None
+) -> Response | None:
+    """Nastaví validátory na `response`; při shodě vrátí 304 odpověď."""
+    if version is None:
+        return None
+    headers = {"ETag": version.etag, "Cache-Control": "no-cache"}
+    if version.last_modified is not None:
+        headers["Last-Modified"] = format_datetime(
+            version.last_modified.astimezone(UTC), usegmt=True
+        )
+    response.headers.update(headers)
+    if _not_modified(request, version):
+        return Response(status_code=304, headers=headers)
+    return None
+
+
+def _not_modified(request: Request, version: Version) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or version.etag in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or version.last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=UTC)
+    # Last-Modified má přesnost na sekundy
+    return version.last_modified.replace(microsecond=0) <= since
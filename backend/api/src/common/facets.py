@@ -0,0 +1,84 @@
+"""
+Fasetové počty pro filtry katalogu v jednom dotazu.
+
+Počty každé fasety respektují všechny ostatní zvolené filtry, ale ne filtr
+fasety samotné — uživatel tak u každé hodnoty vidí, kolik výsledků by
+po jejím (pře)zvolení dostal. Řádky odpovídající základním filtrům
+(text, aktivní, publikované) se čtou jednou v CTE, fasety jsou UNION ALL
+agregací nad ním.
+"""
+
+from dataclasses import dataclass
+
+from sqlalchemy import (
+    ColumnElement,
+    CompoundSelect,
+    Row,
+    Text,
+    cast,
+    func,
+    literal,
+    select,
+    union_all,
+)
+
+from api.src.common.schemas import FacetCount
+
+
+@dataclass(frozen=True)
+class Facet:
+    name: str
+    column: ColumnElement
+    # aktuálně zvolená hodnota filtru (None = nefiltruje se)
+    value: object | None = None
+    value_type: type = int
+
+    def condition(self) -> ColumnElement[bool] | None:
+        return None if self.value is None else self.column == self.value
+
+
+def facet_filters(facets: list[Facet]) -> list[ColumnElement[bool]]:
+    """WHERE podmínky všech zvolených faset (pro samotný výpis)."""
+    return [c for c in (f.condition() for f in facets) if c is not None]
+
+
+def facet_counts_query(
+    base_filters: list[ColumnElement[bool]], facets: list[Facet]
+) -> CompoundSelect:
+    base = (
+        select(*(f.column.label(f.name) for f in facets))
+        .where(*base_filters)
+        .cte("facet_base")
+    )
+    parts = []
+    for facet in facets:
+        column = base.c[facet.name]
+        others = [
+            base.c[other.name] == other.value
+            for other in facets
+            if other is not facet and other.value is not None
+        ]
+        parts.append(
+            select(
+                literal(facet.name).label("facet"),
+                cast(column, Text).label("value"),
+                func.count().label("count"),
+            )
+            .where(column.is_not(None), *others)
+            .group_by(column)
+        )
+    return union_all(*parts)
+
+
+def collect_facets(rows: list[Row], facets: list[Facet]) -> dict[str, list[FacetCount]]:
+    """Výsledek `facet_counts_query` → {faseta: [hodnota + počet, …]}."""
+    by_name = {f.name: f for f in facets}
+    result: dict[str, list[FacetCount]] = {f.name: [] for f in facets}
+    for row in rows:
+        facet = by_name[row.facet]
+        result[row.facet].append(
+            FacetCount(value=facet.value_type(row.value), count=row.count)
+        )
+    for counts in result.values():
+        counts.sort(key=lambda c: (-c.count, str(c.value)))
+    return result
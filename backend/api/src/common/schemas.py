@@ -3,3 +3,8 @@ from pydantic import BaseModel, ConfigDict
 
 class ORMModel(BaseModel):
     model_config = ConfigDict(from_attributes=True)
+
+
+class FacetCount(BaseModel):
+    value: int | str
+    count: int
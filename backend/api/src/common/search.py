@@ -0,0 +1,74 @@
+"""
+Fulltextové hledání nad generovanými sloupci `search_vector` (GIN index).
+
+Hledaný text se rozloží na slova a každé se hledá jako prefix
+(„mate alg" → `mate:* & alg:*`), diakritiku odstraní konfigurace
+`SEARCH_CONFIG` (unaccent) na obou stranách.
+"""
+
+import html
+import re
+
+from sqlalchemy import ColumnElement, false, func, literal
+from sqlalchemy.dialects.postgresql import REGCONFIG
+
+from api.models import SEARCH_CONFIG
+
+_TOKEN_RE = re.compile(r"[^\W_]+")
+
+# Značky zvýraznění — řídicí znaky, které se v textu nevyskytují, aby šel
+# snippet bezpečně escapovat a teprve pak převést na <mark>
+_START_SEL = "\x02"
+_STOP_SEL = "\x03"
+_SELECTORS = f"StartSel={_START_SEL}, StopSel={_STOP_SEL}"
+_SNIPPET_OPTIONS = (
+    f"{_SELECTORS}, MaxWords=35, MinWords=15, MaxFragments=2, "
+    'FragmentDelimiter=" … "'
+)
+
+
+def _config() -> ColumnElement:
+    return literal(SEARCH_CONFIG, REGCONFIG)
+
+
+def ts_query(text_search: str) -> ColumnElement | None:
+    """Prefixový tsquery z hledaného textu; None, pokud v něm není žádné slovo."""
+    tokens = _TOKEN_RE.findall(text_search)
+    if not tokens:
+        return None
+    return func.to_tsquery(_config(), " & ".join(f"{token}:*" for token in tokens))
+
+
+def matches(search_vector, query: ColumnElement) -> ColumnElement[bool]:
+    return search_vector.bool_op("@@")(query)
+
+
+def text_search_filter(search_vector, text_search: str) -> ColumnElement[bool]:
+    """Podmínka pro `text_search` filtr výpisů (text bez slov nic nenajde)."""
+    query = ts_query(text_search)
+    return false() if query is None else matches(search_vector, query)
+
+
+def rank(search_vector, query: ColumnElement) -> ColumnElement[float]:
+    return func.ts_rank(search_vector, query)
+
+
+def headline(column, query: ColumnElement, *, snippet: bool = True) -> ColumnElement[str]:
+    """`ts_headline` se značkami zvýraznění — převést přes `render_headline`.
+
+    Args:
+        snippet: vybrat úryvky kolem shod (jinak celý text, např. pro titulky)
+    """
+    options = _SNIPPET_OPTIONS if snippet else f"{_SELECTORS}, HighlightAll=TRUE"
+    return func.ts_headline(_config(), column, query, options)
+
+
+def render_headline(value: str | None) -> str | None:
+    """Escapuje snippet pro HTML a zvýraznění převede na `<mark>…</mark>`."""
+    if value is None:
+        return None
+    return (
+        html.escape(value)
+        .replace(_START_SEL, "<mark>")
+        .replace(_STOP_SEL, "</mark>")
+    )
@@ -1,7 +1,14 @@
 from __future__ import annotations
 
+import base64
+import json
+from collections.abc import Callable
+from datetime import date, datetime
+
 from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy import inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from api import models
 
@@ -23,11 +30,32 @@ def get_or_404[T](
         detail: vlastní chybová hláška (výchozí: „{Model} nenalezen/a")
         check_active: přidat podmínku is_active=True (výchozí True)
     """
-    pk_col = inspect(model).mapper.primary_key[0]
-    stm = select(model).where(pk_col == pk_value)
-    if check_active and hasattr(model, "is_active"):
-        stm = stm.where(model.is_active.is_(True))
-    result = db.scalars(stm).first()
+    result = db.scalars(_pk_select(model, pk_value, check_active)).first()
+    if result is None:
+        raise HTTPException(
+            status_code=404,
+            detail=detail or f"{model.__name__} nenalezen/a",
+        )
+    return result
+
+
+async def get_or_404_async[T](
+    db: AsyncSession,
+    model: type[T],
+    pk_value: int,
+    *,
+    detail: str | None = None,
+    check_active: bool = True,
+    options: tuple = (),
+) -> T:
+    """Async varianta `get_or_404`.
+
+    Args:
+        options: loader options (selectinload, …) — v async session nejde
+            lazy load, vztahy potřebné pro response je nutné načíst zde.
+    """
+    stm = _pk_select(model, pk_value, check_active).options(*options)
+    result = (await db.scalars(stm)).first()
     if result is None:
         raise HTTPException(
             status_code=404,
@@ -36,6 +64,54 @@ def get_or_404[T](
     return result
 
 
+def _pk_select(model, pk_value: int, check_active: bool):
+    pk_col = inspect(model).mapper.primary_key[0]
+    stm = select(model).where(pk_col == pk_value)
+    if check_active and hasattr(model, "is_active"):
+        stm = stm.where(model.is_active.is_(True))
+    return stm
+
+
+def encode_cursor(*values: int | float | str | date) -> str:
+    """Zakóduje klíč posledního řádku stránky do neprůhledného kurzoru."""
+    raw = json.dumps(
+        values, separators=(",", ":"), default=lambda v: v.isoformat()
+    ).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *types: type) -> list:
+    """Dekóduje kurzor z `encode_cursor`, při neplatném vyhodí 400.
+
+    `types` jsou očekávané typy hodnot řadicího klíče v pořadí (`int`,
+    `float`, `str`, `date`/`datetime` jako ISO řetězec) — hodnota jiného
+    typu by jinak skončila chybou až v DB dotazu.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError(cursor)
+        return [_cursor_value(v, t) for v, t in zip(values, types, strict=True)]
+    except (TypeError, ValueError) as e:
+        raise HTTPException(
+            status_code=400, detail="Neplatný kurzor stránkování"
+        ) from e
+
+
+def _cursor_value(value, expected: type):
+    # bool je v Pythonu podtřída int — v kurzoru ho nepřipouštíme
+    if isinstance(value, bool):
+        raise TypeError(value)
+    if expected is float and isinstance(value, int | float):
+        return float(value)
+    if expected in (date, datetime) and isinstance(value, str):
+        return expected.fromisoformat(value)
+    if isinstance(value, expected):
+        return value
+    raise TypeError(value)
+
+
 def assert_course_editable(course: models.Course) -> None:
     """Vyhodí 400 pokud kurz není v editovatelném stavu (draft/generated/edited)."""
     from api.enums import Status
@@ -76,3 +152,20 @@ def check_enrollment(
     )
     if enrollment is None:
         raise HTTPException(status_code=403, detail="Nejste zapsáni v tomto kurzu")
+
+
+async def run_released[T](db: Session, fn: Callable[..., T], *args) -> T:
+    """Spustí sync práci se session v threadpoolu a session pak zavře.
+
+    Pro `async` endpointy volající LLM — kontroly před grafem a zápis po
+    něm neblokují event loop a spojení se nedrží po dobu čekání na
+    poskytovatele. Session zůstává použitelná, spojení si vypůjčí znovu.
+    """
+
+    def run() -> T:
+        try:
+            return fn(*args)
+        finally:
+            db.close()
+
+    return await run_in_threadpool(run)
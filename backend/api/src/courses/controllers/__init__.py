@@ -10,9 +10,13 @@ from api.src.courses.controllers.create import (
 )
 from api.src.courses.controllers.read import (
     get_courses,
+    get_courses_page,
+    get_course_facets,
     get_course,
+    get_course_tree,
     get_course_files,
     get_course_links,
+    course_links_version_query,
 )
 from api.src.courses.controllers.update import (
     update_course,
@@ -27,6 +31,10 @@ from api.src.courses.controllers.delete import (
 from api.src.courses.controllers.recommended import (
     get_recommended_courses,
 )
+from api.src.courses.controllers.snapshot import (
+    get_course_snapshot,
+    rebuild_course_snapshots,
+)
 
 __all__ = [
     # Create operations
@@ -35,10 +43,16 @@ __all__ = [
     "create_course_link",
     # Read operations
     "get_courses",
+    "get_courses_page",
+    "get_course_facets",
     "get_course",
+    "get_course_tree",
     "get_course_files",
     "get_course_links",
+    "course_links_version_query",
     "get_recommended_courses",
+    "get_course_snapshot",
+    "rebuild_course_snapshots",
     # Update operations
     "update_course",
     "update_course_status",
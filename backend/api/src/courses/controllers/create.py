@@ -6,7 +6,7 @@ from fastapi import HTTPException, UploadFile
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from api import models
+from api import cache, models
 from api.src.common.utils import get_or_404
 from api.src.courses.schemas import CourseCreate, CourseCreated, CourseFile, CourseLink
 from api import enums
@@ -104,6 +104,7 @@ async def upload_course_file(
     )
 
     db.add(course_file)
+    cache.invalidate(db, "courses", f"course:{course_id}")
     db.commit()
     db.refresh(course_file)
 
@@ -142,6 +143,7 @@ def create_course_link(
 
     course_link = models.CourseLink(course_id=course_id, url=url)
     db.add(course_link)
+    cache.invalidate(db, "courses", f"course:{course_id}")
     db.commit()
     db.refresh(course_link)
 
@@ -8,7 +8,7 @@ from fastapi import HTTPException
 from sqlalchemy import delete, select
 from sqlalchemy.orm import Session
 
-from api import models
+from api import cache, models
 from api.src.common.utils import get_or_404
 from api.enums import Status, UserRole
 from api.authorization import validate_owner_or_superadmin
@@ -71,6 +71,7 @@ def delete_course(db: Session, course_id: int, user: models.User) -> None:
     else:
         course.soft_delete()
 
+    cache.invalidate(db, "courses", f"course:{course_id}")
     db.commit()
 
 
@@ -100,6 +101,7 @@ def delete_course_file(db: Session, course_id: int, file_id: int, user: models.U
 
     seaweedfs.delete_file(course_file.file_path)
     db.delete(course_file)
+    cache.invalidate(db, "courses", f"course:{course_id}")
     db.commit()
 
 
@@ -128,4 +130,5 @@ def delete_course_link(db: Session, course_id: int, link_id: int, user: models.U
         )
 
     db.delete(course_link)
+    cache.invalidate(db, "courses", f"course:{course_id}")
     db.commit()
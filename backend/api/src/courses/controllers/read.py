@@ -4,16 +4,118 @@ Controllery pro čtení zdrojů kurzu.
 
 from collections.abc import Sequence
 
-from sqlalchemy import Select, func, or_, select
-from sqlalchemy.orm import Session, joinedload
+from fastapi import HTTPException
+from pydantic import TypeAdapter
+from sqlalchemy import ColumnElement, Select, and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
 
-from api import models
-from api.src.common.utils import get_or_404
-from api.src.courses.schemas import Course, CourseDetail, CourseFile, CourseLink
+from api import cache, models
+from api.database import async_primary_session
+from api.src.common.conditional import version_query
+from api.src.common.facets import (
+    Facet,
+    collect_facets,
+    facet_counts_query,
+    facet_filters,
+)
+from api.src.common.schemas import FacetCount
+from api.src.common.search import text_search_filter
+from api.src.common.utils import decode_cursor, encode_cursor, get_or_404_async
+from api.src.courses.schemas import (
+    Course,
+    CourseDetail,
+    CourseFile,
+    CourseLink,
+    CoursePage,
+    CourseTree,
+)
 
+# Vztahy, které čte schema `Course` — v AsyncSession nejde lazy load,
+# proto je načteme dávkově (jeden SELECT … IN na vztah, ne na kurz).
+COURSE_LOAD_OPTIONS = (
+    joinedload(models.Course.owner),
+    joinedload(models.Course.course_block),
+    joinedload(models.Course.course_target),
+    joinedload(models.Course.course_subject),
+    selectinload(models.Course.modules),
+    selectinload(models.Course.files),
+    selectinload(models.Course.links),
+)
 
-def get_courses(
-    db: Session,
+COURSE_DETAIL_LOAD_OPTIONS = (
+    joinedload(models.Course.owner),
+    joinedload(models.Course.course_block),
+    joinedload(models.Course.course_target),
+    joinedload(models.Course.course_subject),
+    selectinload(models.Course.modules).options(
+        selectinload(models.Module.learn_blocks),
+        selectinload(models.Module.practice_questions).options(
+            selectinload(models.PracticeQuestion.closed_options),
+            selectinload(models.PracticeQuestion.open_keywords),
+        ),
+    ),
+    selectinload(models.Course.files),
+    selectinload(models.Course.links),
+)
+
+
+# Strom kurzu bez souborů a odkazů: 1 SELECT kurzu (+ JOIN vlastníka
+# a číselníků) a po jednom SELECT … IN na moduly, learn bloky, otázky,
+# možnosti a klíčová slova — 6 dotazů bez ohledu na velikost kurzu.
+COURSE_TREE_LOAD_OPTIONS = (
+    joinedload(models.Course.owner),
+    joinedload(models.Course.course_block),
+    joinedload(models.Course.course_target),
+    joinedload(models.Course.course_subject),
+    selectinload(models.Course.modules).options(
+        selectinload(models.Module.learn_blocks),
+        selectinload(models.Module.practice_questions).options(
+            selectinload(models.PracticeQuestion.closed_options),
+            selectinload(models.PracticeQuestion.open_keywords),
+        ),
+    ),
+)
+
+
+def _course_base_filters(
+    include_inactive: bool = False,
+    text_search: str | None = None,
+    is_published: bool = False,
+) -> list[ColumnElement[bool]]:
+    filters: list[ColumnElement[bool]] = []
+
+    if not include_inactive:
+        filters.append(models.Course.is_active.is_(True))
+
+    if is_published:
+        filters.append(models.Course.is_published.is_(True))
+
+    if text_search:
+        filters.append(
+            text_search_filter(models.Course.search_vector, text_search)
+        )
+
+    return filters
+
+
+def _course_facets(
+    course_block_id: int | None = None,
+    course_target_id: int | None = None,
+    course_subject_id: int | None = None,
+    status: str | None = None,
+    difficulty: str | None = None,
+) -> list[Facet]:
+    return [
+        Facet("course_block_id", models.Course.course_block_id, course_block_id),
+        Facet("course_target_id", models.Course.course_target_id, course_target_id),
+        Facet("course_subject_id", models.Course.course_subject_id, course_subject_id),
+        Facet("status", models.Course.status, status, value_type=str),
+        Facet("difficulty", models.Course.difficulty, difficulty, value_type=str),
+    ]
+
+
+def _course_filters(
     include_inactive: bool = False,
     text_search: str | None = None,
     is_published: bool = False,
@@ -21,102 +123,331 @@ def get_courses(
     course_target_id: int | None = None,
     course_subject_id: int | None = None,
     status: str | None = None,
+    difficulty: str | None = None,
+) -> list[ColumnElement[bool]]:
+    """WHERE podmínky katalogu kurzů (sdílené výpisem i stránkováním)."""
+    return [
+        *_course_base_filters(include_inactive, text_search, is_published),
+        *facet_filters(
+            _course_facets(
+                course_block_id, course_target_id, course_subject_id, status, difficulty
+            )
+        ),
+    ]
+
+
+async def get_courses(
+    db: AsyncSession,
+    include_inactive: bool = False,
+    text_search: str | None = None,
+    is_published: bool = False,
+    course_block_id: int | None = None,
+    course_target_id: int | None = None,
+    course_subject_id: int | None = None,
+    status: str | None = None,
+    difficulty: str | None = None,
 ) -> list[Course]:
-    """Vrátí seznam kurzů. Doplňuje agregovaný počet aktivních zápisů a třídí
-    od nejvíce zapsaného (pomáhá frontendu řadit „nejoblíbenější první")."""
+    """Vrátí seznam kurzů seřazený od nejvíce zapsaného (pomáhá frontendu
+    řadit „nejoblíbenější první"; index `ix_course_enrollments_count`).
+
+    Veřejný katalog (jen publikované, aktivní) jde přes cache s tagem
+    `courses`; pořadí podle zápisů může být zastaralé max. o TTL cache.
+    """
+    filters = {
+        "text_search": text_search,
+        "course_block_id": course_block_id,
+        "course_target_id": course_target_id,
+        "course_subject_id": course_subject_id,
+        "status": status,
+        "difficulty": difficulty,
+    }
 
-    enrollment_count_subq = (
-        select(
-            models.Enrollment.course_id.label("course_id"),
-            func.count(models.Enrollment.enrollment_id).label("cnt"),
+    if not is_published or include_inactive:
+        return await _load_courses(
+            db, include_inactive=include_inactive, is_published=is_published, **filters
         )
-        .where(models.Enrollment.is_active.is_(True))
-        .group_by(models.Enrollment.course_id)
-        .subquery()
-    )
-    enrollments_count_col = func.coalesce(enrollment_count_subq.c.cnt, 0).label(
-        "enrollments_count"
+
+    async def load() -> list[Course]:
+        # plnění cache vždy z primary — replika může být pozadu za invalidací
+        async with async_primary_session(db) as primary:
+            return await _load_courses(
+                primary, include_inactive=False, is_published=True, **filters
+            )
+
+    return await cache.get_or_load_async(
+        cache.key("courses.published", **filters),
+        ("courses",),
+        TypeAdapter(list[Course]),
+        load,
     )
 
-    stm: Select[tuple[models.Course, int]] = (
-        select(models.Course, enrollments_count_col)
-        .outerjoin(
-            enrollment_count_subq,
-            models.Course.course_id == enrollment_count_subq.c.course_id,
+
+async def _load_courses(
+    db: AsyncSession,
+    include_inactive: bool,
+    is_published: bool,
+    text_search: str | None,
+    course_block_id: int | None,
+    course_target_id: int | None,
+    course_subject_id: int | None,
+    status: str | None,
+    difficulty: str | None,
+) -> list[Course]:
+    stm: Select[tuple[models.Course]] = (
+        select(models.Course)
+        .options(*COURSE_LOAD_OPTIONS)
+        .where(
+            *_course_filters(
+                include_inactive=include_inactive,
+                text_search=text_search,
+                is_published=is_published,
+                course_block_id=course_block_id,
+                course_target_id=course_target_id,
+                course_subject_id=course_subject_id,
+                status=status,
+                difficulty=difficulty,
+            )
+        )
+        .order_by(
+            models.Course.enrollments_count.desc(), models.Course.course_id.asc()
         )
-        .options(joinedload(models.Course.owner))
-        .order_by(enrollments_count_col.desc(), models.Course.course_id.asc())
     )
 
-    if not include_inactive:
-        stm = stm.where(models.Course.is_active.is_(True))
+    courses: Sequence[models.Course] = (await db.scalars(stm)).unique().all()
+    return [Course.model_validate(course) for course in courses]
 
-    if is_published:
-        stm = stm.where(models.Course.is_published.is_(True))
 
-    if text_search:
+# Pole `Course`, která jdou vybrat přes `fields=` — jen skalární sloupce
+# (bez vztahů), aby projekce byla jeden SELECT bez eager loadů.
+COURSE_PAGE_FIELDS: frozenset[str] = frozenset(
+    name
+    for name in Course.model_fields
+    if name in models.Course.__table__.columns
+) | {"owner_display_name"}
+
+
+def _parse_fields(fields: str | None) -> list[str] | None:
+    if fields is None:
+        return None
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = sorted(set(requested) - COURSE_PAGE_FIELDS)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=(
+                f"Neznámá pole: {', '.join(unknown)}. "
+                f"Povolená: {', '.join(sorted(COURSE_PAGE_FIELDS))}"
+            ),
+        )
+    # course_id a enrollments_count jsou klíč kurzoru, vracejí se vždy
+    return list(dict.fromkeys(["course_id", "enrollments_count", *requested]))
+
+
+async def get_courses_page(
+    db: AsyncSession,
+    *,
+    limit: int = 20,
+    cursor: str | None = None,
+    fields: str | None = None,
+    with_total: bool = True,
+    include_inactive: bool = False,
+    text_search: str | None = None,
+    is_published: bool = False,
+    course_block_id: int | None = None,
+    course_target_id: int | None = None,
+    course_subject_id: int | None = None,
+    status: str | None = None,
+    difficulty: str | None = None,
+) -> CoursePage:
+    """Stránka katalogu kurzů, keyset stránkování podle
+    `(enrollments_count DESC, course_id ASC)`.
+
+    Čte se jen `limit + 1` řádků po indexu `ix_course_enrollments_count`
+    (řádek navíc určí, zda existuje další stránka), vztahy se dotahují jen
+    pro kurzy na stránce.
+
+    Args:
+        cursor: `next_cursor` z předchozí stránky
+        fields: čárkou oddělená pole (viz `COURSE_PAGE_FIELDS`) — projekce
+            jen vybraných sloupců bez vztahů
+        with_total: spočítat i celkový počet odpovídajících kurzů
+            (samostatný COUNT; pro nekonečné scrollování lze vypnout)
+    """
+    filters = _course_filters(
+        include_inactive=include_inactive,
+        text_search=text_search,
+        is_published=is_published,
+        course_block_id=course_block_id,
+        course_target_id=course_target_id,
+        course_subject_id=course_subject_id,
+        status=status,
+        difficulty=difficulty,
+    )
+    selected = _parse_fields(fields)
+
+    if selected is None:
+        columns = [models.Course]
+    else:
+        columns = [
+            models.User.display_name.label(name)
+            if name == "owner_display_name"
+            else getattr(models.Course, name)
+            for name in selected
+        ]
+    stm = select(*columns).where(*filters)
+    if selected is None:
+        stm = stm.options(*COURSE_LOAD_OPTIONS)
+    elif "owner_display_name" in selected:
+        stm = stm.outerjoin(
+            models.User, models.User.user_id == models.Course.owner_id
+        )
+
+    if cursor is not None:
+        last_count, last_id = decode_cursor(cursor, int, int)
         stm = stm.where(
             or_(
-                models.Course.title.ilike(f"%{text_search}%"),
-                models.Course.description.ilike(f"%{text_search}%"),
+                models.Course.enrollments_count < last_count,
+                and_(
+                    models.Course.enrollments_count == last_count,
+                    models.Course.course_id > last_id,
+                ),
             )
         )
 
-    if course_block_id is not None:
-        stm = stm.where(models.Course.course_block_id == course_block_id)
+    stm = stm.order_by(
+        models.Course.enrollments_count.desc(), models.Course.course_id.asc()
+    ).limit(limit + 1)
+    rows = (await db.execute(stm)).unique().all()
+
+    items: list[Course] = []
+    for row in rows[:limit]:
+        if selected is None:
+            items.append(Course.model_validate(row[0]))
+        else:
+            # Bez validace — hodnoty jsou přímo sloupce kurzu; nevyžádaná pole
+            # zůstanou „unset" a router je do odpovědi nezahrne.
+            items.append(Course.model_construct(**row._asdict()))
+
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor(last.enrollments_count, last.course_id)
+
+    total = None
+    if with_total:
+        total = await db.scalar(
+            select(func.count()).select_from(models.Course).where(*filters)
+        )
+
+    return CoursePage(items=items, next_cursor=next_cursor, total=total)
+
+
+async def get_course_facets(
+    db: AsyncSession,
+    include_inactive: bool = False,
+    text_search: str | None = None,
+    is_published: bool = False,
+    course_block_id: int | None = None,
+    course_target_id: int | None = None,
+    course_subject_id: int | None = None,
+    status: str | None = None,
+    difficulty: str | None = None,
+) -> dict[str, list[FacetCount]]:
+    """Počty kurzů pro každou hodnotu filtrů katalogu (jeden dotaz)."""
+    facets = _course_facets(
+        course_block_id, course_target_id, course_subject_id, status, difficulty
+    )
+    rows = await db.execute(
+        facet_counts_query(
+            _course_base_filters(include_inactive, text_search, is_published), facets
+        )
+    )
+    return collect_facets(rows.all(), facets)
+
 
-    if course_target_id is not None:
-        stm = stm.where(models.Course.course_target_id == course_target_id)
+def course_links_version_query(course_id: int) -> Select:
+    """Verze seznamu odkazů kurzu"""
+    return version_query(
+        select(models.CourseLink.updated_at).where(
+            models.CourseLink.course_id == course_id
+        )
+    )
 
-    if course_subject_id is not None:
-        stm = stm.where(models.Course.course_subject_id == course_subject_id)
 
-    if status is not None:
-        stm = stm.where(models.Course.status == status)
+async def get_course(db: AsyncSession, course_id: int) -> CourseDetail:
+    """Vrátí detail kurzu podle ID (cache s tagem `course:<id>`)
 
-    rows: Sequence[tuple[models.Course, int]] = db.execute(stm).all()
-    result: list[Course] = []
-    for course, cnt in rows:
-        course.__dict__["enrollments_count"] = int(cnt or 0)
-        result.append(Course.model_validate(course))
-    return result
+    `enrollments_count` se mění s každým zápisem, proto v cache nezůstává
+    aktuální — dočítá se zvlášť dotazem na PK a detail kvůli němu není
+    nutné zneplatňovat.
+    """
 
+    async def load() -> CourseDetail:
+        async with async_primary_session(db) as primary:
+            course = await get_or_404_async(
+                primary,
+                models.Course,
+                course_id,
+                check_active=False,
+                options=COURSE_DETAIL_LOAD_OPTIONS,
+            )
+            return CourseDetail.model_validate(course)
 
-def get_course(db: Session, course_id: int) -> CourseDetail:
-    """Vrátí detail kurzu podle ID"""
-    course = get_or_404(db, models.Course, course_id, check_active=False)
-    return CourseDetail.model_validate(course)
+    course = await cache.get_or_load_async(
+        cache.key("course.detail", course_id=course_id),
+        (f"course:{course_id}",),
+        TypeAdapter(CourseDetail),
+        load,
+    )
+    enrollments_count = await db.scalar(
+        select(models.Course.enrollments_count).where(
+            models.Course.course_id == course_id
+        )
+    )
+    if enrollments_count is None:
+        # kurz mezitím smazán (detail z cache)
+        raise HTTPException(status_code=404, detail="Kurz nenalezen")
+    return course.model_copy(update={"enrollments_count": enrollments_count})
 
 
-def get_course_files(db: Session, course_id: int) -> list[CourseFile]:
+async def get_course_tree(db: AsyncSession, course_id: int) -> CourseTree:
+    """Vrátí kurz s aktivními moduly a jejich obsahem (`COURSE_TREE_LOAD_OPTIONS`)"""
+    course = await get_or_404_async(
+        db,
+        models.Course,
+        course_id,
+        detail="Kurz nenalezen",
+        check_active=False,
+        options=COURSE_TREE_LOAD_OPTIONS,
+    )
+    return CourseTree.model_validate(course)
+
+
+async def get_course_files(db: AsyncSession, course_id: int) -> list[CourseFile]:
     """Vrátí seznam souborů kurzu"""
-    get_or_404(db, models.Course, course_id, check_active=False)
+    await get_or_404_async(db, models.Course, course_id, check_active=False)
 
     files = (
-        db.execute(
+        await db.scalars(
             select(models.CourseFile).where(
                 models.CourseFile.course_id == course_id
             )
         )
-        .scalars()
-        .all()
-    )
+    ).all()
 
     return [CourseFile.model_validate(f) for f in files]
 
 
-def get_course_links(db: Session, course_id: int) -> list[CourseLink]:
+async def get_course_links(db: AsyncSession, course_id: int) -> list[CourseLink]:
     """Vrátí seznam odkazů kurzu"""
-    get_or_404(db, models.Course, course_id, check_active=False)
+    await get_or_404_async(db, models.Course, course_id, check_active=False)
 
     links = (
-        db.execute(
+        await db.scalars(
             select(models.CourseLink).where(
                 models.CourseLink.course_id == course_id
             )
         )
-        .scalars()
-        .all()
-    )
+    ).all()
 
     return [CourseLink.model_validate(r) for r in links]
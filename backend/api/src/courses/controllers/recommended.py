@@ -1,15 +1,16 @@
 """Controller pro doporučené kurzy uživateli."""
 
-from sqlalchemy import case, func, literal, select
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import case, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from api import models
 from api.enums import Status
+from api.src.courses.controllers.read import COURSE_LOAD_OPTIONS
 from api.src.courses.schemas import Course
 
 
-def get_recommended_courses(
-    db: Session,
+async def get_recommended_courses(
+    db: AsyncSession,
     user: models.User,
     limit: int = 3,
 ) -> list[Course]:
@@ -25,7 +26,7 @@ def get_recommended_courses(
 
     # Předměty, do kterých user už je zapsán → boost pro doporučení
     enrolled_subject_ids: set[int] = set(
-        sid for sid in db.execute(
+        sid for sid in await db.scalars(
             select(models.Course.course_subject_id)
             .join(models.Enrollment, models.Enrollment.course_id == models.Course.course_id)
             .where(
@@ -35,32 +36,19 @@ def get_recommended_courses(
                 models.Course.course_subject_id.is_not(None),
             )
             .distinct()
-        ).scalars()
+        )
         if sid is not None
     )
 
     # Kurzy, do kterých už je uživatel zapsán → vyloučit
     enrolled_course_ids = set(
-        db.execute(
+        await db.scalars(
             select(models.Enrollment.course_id).where(
                 models.Enrollment.user_id == user.user_id,
                 models.Enrollment.is_active.is_(True),
                 models.Enrollment.left_at.is_(None),
             )
-        ).scalars()
-    )
-
-    enrollment_count_subq = (
-        select(
-            models.Enrollment.course_id.label("course_id"),
-            func.count(models.Enrollment.enrollment_id).label("cnt"),
         )
-        .where(models.Enrollment.is_active.is_(True))
-        .group_by(models.Enrollment.course_id)
-        .subquery()
-    )
-    enrollments_count_col = func.coalesce(enrollment_count_subq.c.cnt, 0).label(
-        "enrollments_count"
     )
 
     # Score: same-subject boost + popularity
@@ -71,15 +59,11 @@ def get_recommended_courses(
         )
     else:
         subject_boost = literal(0)
-    score_col = (subject_boost + enrollments_count_col).label("score")
+    score_col = (subject_boost + models.Course.enrollments_count).label("score")
 
     stm = (
-        select(models.Course, enrollments_count_col, score_col)
-        .outerjoin(
-            enrollment_count_subq,
-            models.Course.course_id == enrollment_count_subq.c.course_id,
-        )
-        .options(joinedload(models.Course.owner))
+        select(models.Course)
+        .options(*COURSE_LOAD_OPTIONS)
         .where(
             models.Course.is_active.is_(True),
             models.Course.is_published.is_(True),
@@ -91,9 +75,5 @@ def get_recommended_courses(
     if enrolled_course_ids:
         stm = stm.where(~models.Course.course_id.in_(enrolled_course_ids))
 
-    rows = db.execute(stm.limit(limit)).all()
-    result: list[Course] = []
-    for course, cnt, _score in rows:
-        course.__dict__["enrollments_count"] = int(cnt or 0)
-        result.append(Course.model_validate(course))
-    return result
+    courses = (await db.scalars(stm.limit(limit))).unique().all()
+    return [Course.model_validate(course) for course in courses]
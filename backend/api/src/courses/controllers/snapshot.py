@@ -0,0 +1,113 @@
+"""
+Snapshoty schválených kurzů pro studenty.
+
+Schválený kurz nejde editovat (`assert_course_editable`), jeho strom
+(moduly, learn block, otázky s možnostmi a klíčovými slovy) je tedy
+neměnný. Při schválení / publikování se jednou vyrenderuje do gzip JSON
+v tabulce `course_snapshot` a `GET /courses/{id}/player` ho vrací jedním
+dotazem bez ORM. Archivace nebo návrat do editace snapshot smaže.
+
+Snapshot obsahuje i data mimo strom kurzu — jméno autora a názvy
+číselníků. Změna jména v profilu snapshoty autora přestaví
+(`refresh_course_snapshots`); číselníky aplikace nemění (seed jen plní
+prázdné tabulky), po ruční změně je nutné `python -m api.manage snapshots`.
+"""
+
+import gzip
+import hashlib
+
+from fastapi import HTTPException
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from api import models
+from api.enums import Status
+from api.src.courses.controllers.read import COURSE_TREE_LOAD_OPTIONS
+from api.src.courses.schemas import CoursePlayer
+
+
+def build_course_snapshot(db: Session, course_id: int) -> str:
+    """Vyrenderuje snapshot kurzu v transakci `db` (commit volá volající).
+
+    Returns:
+        verze snapshotu (hash obsahu)
+    """
+    course = db.scalars(
+        select(models.Course)
+        .options(*COURSE_TREE_LOAD_OPTIONS)
+        .where(models.Course.course_id == course_id)
+        .execution_options(populate_existing=True)
+    ).one()
+    raw = CoursePlayer.model_validate(course).model_dump_json().encode()
+    version = hashlib.sha256(raw).hexdigest()[:32]
+    # mtime=0 — stejný obsah dá stejné bajty
+    content = gzip.compress(raw, mtime=0)
+
+    stmt = insert(models.CourseSnapshot).values(
+        course_id=course_id, version=version, content=content
+    )
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[models.CourseSnapshot.course_id],
+            set_={
+                "version": stmt.excluded.version,
+                "content": stmt.excluded.content,
+                "built_at": stmt.excluded.built_at,
+            },
+        )
+    )
+    return version
+
+
+def refresh_course_snapshots(db: Session, *criteria) -> int:
+    """Přestaví existující snapshoty kurzů splňujících `criteria` nad
+    `models.Course` (commit volá volající); vrací jejich počet."""
+    course_ids = db.scalars(
+        select(models.CourseSnapshot.course_id).join(models.Course).where(*criteria)
+    ).all()
+    for course_id in course_ids:
+        build_course_snapshot(db, course_id)
+    return len(course_ids)
+
+
+def drop_course_snapshot(db: Session, course_id: int) -> None:
+    db.execute(
+        delete(models.CourseSnapshot).where(
+            models.CourseSnapshot.course_id == course_id
+        )
+    )
+
+
+def rebuild_course_snapshots(db: Session) -> int:
+    """Postaví snapshoty všech schválených kurzů (`python -m api.manage snapshots`)."""
+    course_ids = db.scalars(
+        select(models.Course.course_id).where(
+            models.Course.status == Status.approved,
+            models.Course.is_active.is_(True),
+        )
+    ).all()
+    for course_id in course_ids:
+        build_course_snapshot(db, course_id)
+    db.commit()
+    return len(course_ids)
+
+
+async def get_course_snapshot(
+    db: AsyncSession, course_id: int
+) -> models.CourseSnapshot:
+    """Snapshot publikovaného schváleného kurzu, jinak 404 (jeden dotaz)."""
+    snapshot = await db.scalar(
+        select(models.CourseSnapshot)
+        .join(models.Course)
+        .where(
+            models.CourseSnapshot.course_id == course_id,
+            models.Course.is_active.is_(True),
+            models.Course.is_published.is_(True),
+            models.Course.status == Status.approved,
+        )
+    )
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="Kurz nenalezen")
+    return snapshot
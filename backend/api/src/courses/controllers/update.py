@@ -6,8 +6,9 @@ from fastapi import HTTPException
 from sqlalchemy import update
 from sqlalchemy.orm import Session
 
-from api import models
+from api import cache, models
 from api.src.common.utils import get_or_404, assert_course_editable
+from api.src.courses.controllers.snapshot import build_course_snapshot, drop_course_snapshot
 from api.src.courses.schemas import Course, CourseUpdate
 from api.enums import Status
 from api.authorization import validate_owner_or_superadmin, validate_guarantor_or_superadmin, validate_superadmin
@@ -59,6 +60,7 @@ def update_course(db: Session, course_id: int, course_data: CourseUpdate, user:
         .where(models.Course.course_id == course_id)
         .values(**update_data)
     )
+    cache.invalidate(db, "courses", f"course:{course_id}")
     db.commit()
     db.refresh(course)
 
@@ -105,11 +107,19 @@ def update_course_status(db: Session, course_id: int, status: Status, user: mode
         values["is_published"] = False
         values["approved_by_id"] = None
 
+    # ORM UPDATE synchronizuje `course.status` na nový stav
+    old_status = course.status
     db.execute(
         update(models.Course)
         .where(models.Course.course_id == course_id)
         .values(**values)
     )
+    if status == Status.approved:
+        build_course_snapshot(db, course_id)
+    elif old_status == Status.approved:
+        # archivace / návrat do editace
+        drop_course_snapshot(db, course_id)
+    cache.invalidate(db, "courses", f"course:{course_id}")
     db.commit()
     db.refresh(course)
 
@@ -138,6 +148,9 @@ def update_course_published(db: Session, course_id: int, is_published: bool, use
         .where(models.Course.course_id == course_id)
         .values(is_published=is_published)
     )
+    if is_published and course.status == Status.approved:
+        build_course_snapshot(db, course_id)
+    cache.invalidate(db, "courses", f"course:{course_id}")
     db.commit()
     db.refresh(course)
 
@@ -1,37 +1,57 @@
 from typing import Literal
+import gzip
 import mimetypes
 
-from fastapi import APIRouter, BackgroundTasks, HTTPException, UploadFile, File
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Request, UploadFile, File
 from fastapi.responses import Response
+from pydantic import TypeAdapter
 from langgraph.graph.state import CompiledStateGraph
 
 from api.storage import seaweedfs
+from api.src.common.conditional import (
+    Version,
+    conditional_get,
+    content_version,
+    get_version_async,
+)
 from api.src.common.utils import get_or_404
 from api import models
 
 from api.dependencies import CurrentUser, require_role
 from api.src.common.annotations import (
     COURSE_BLOCK_ID_ANNOTATION,
+    COURSE_DIFFICULTY_ANNOTATION,
     COURSE_STATUS_ANNOTATION,
     COURSE_SUBJECT_ID_ANNOTATION,
     COURSE_TARGET_ID_ANNOTATION,
+    CURSOR_ANNOTATION,
+    FIELDS_ANNOTATION,
     INCLUDE_INACTIVE_ANNOTATION,
     IS_PUBLISHED_ANNOTATION,
+    PAGE_LIMIT_ANNOTATION,
     TEXT_SEARCH_ANNOTATION,
+    WITH_TOTAL_ANNOTATION,
 )
 from api.src.courses.schemas import (
     CourseCreate,
     CourseCreated,
     Course,
     CourseDetail,
+    CourseFacetPage,
     CourseUpdate,
     CourseFile,
     CourseLink,
+    CoursePage,
+    CoursePlayer,
+    CourseTree,
 )
 from api.src.courses.controllers import (
     create_course,
     get_courses,
+    get_courses_page,
+    get_course_facets,
     get_course,
+    get_course_tree,
     get_course_files,
     get_recommended_courses,
     update_course,
@@ -40,11 +60,19 @@ from api.src.courses.controllers import (
     delete_course_file,
     create_course_link,
     get_course_links,
+    course_links_version_query,
+    get_course_snapshot,
     delete_course_link,
     update_course_status,
     update_course_published,
 )
-from api.database import SessionLocal, SessionSqlSessionDependency
+from api.database import (
+    AsyncReadSqlSessionDependency,
+    AsyncSqlSessionDependency,
+    SessionLocal,
+    SessionSqlSessionDependency,
+)
+from agents.base.graphs import get_graph
 from agents.embedding_generator import create_graph as create_embedding_graph
 from agents.embedding_generator.state import AgentState
 
@@ -65,18 +93,18 @@ public_router = APIRouter(prefix="/courses", tags=["Courses"])
     dependencies=[require_role("user")],
 )
 async def endp_list_recommended_courses(
-    db: SessionSqlSessionDependency,
+    db: AsyncReadSqlSessionDependency,
     user: CurrentUser,
     limit: int = 3,
 ) -> list[Course]:
     """Vrátí kurzy doporučené aktuálnímu uživateli — preferuje předměty,
     do nichž je již zapsán, tiebreaker je popularita. Vylučuje již zapsané."""
-    return get_recommended_courses(db, user=user, limit=limit)
+    return await get_recommended_courses(db, user=user, limit=limit)
 
 
 @public_router.get("", operation_id="list_courses")
 async def list_courses(
-    db: SessionSqlSessionDependency,
+    db: AsyncReadSqlSessionDependency,
     include_inactive: INCLUDE_INACTIVE_ANNOTATION = False,
     is_published: IS_PUBLISHED_ANNOTATION = False,
     text_search: TEXT_SEARCH_ANNOTATION = None,
@@ -84,8 +112,9 @@ async def list_courses(
     course_target_id: COURSE_TARGET_ID_ANNOTATION = None,
     course_subject_id: COURSE_SUBJECT_ID_ANNOTATION = None,
     status: COURSE_STATUS_ANNOTATION = None,
+    difficulty: COURSE_DIFFICULTY_ANNOTATION = None,
 ) -> list[Course]:
-    return get_courses(
+    return await get_courses(
         db,
         include_inactive=include_inactive,
         is_published=is_published,
@@ -94,28 +123,156 @@ async def list_courses(
         course_target_id=course_target_id,
         course_subject_id=course_subject_id,
         status=status,
+        difficulty=difficulty,
+    )
+
+
+# `/page` musí být (jako `/recommended`) registrované před `/{course_id}`.
+@public_router.get(
+    "/page",
+    operation_id="list_courses_page",
+    response_model_exclude_unset=True,
+)
+async def list_courses_page(
+    db: AsyncReadSqlSessionDependency,
+    limit: PAGE_LIMIT_ANNOTATION = 20,
+    cursor: CURSOR_ANNOTATION = None,
+    fields: FIELDS_ANNOTATION = None,
+    with_total: WITH_TOTAL_ANNOTATION = True,
+    include_inactive: INCLUDE_INACTIVE_ANNOTATION = False,
+    is_published: IS_PUBLISHED_ANNOTATION = False,
+    text_search: TEXT_SEARCH_ANNOTATION = None,
+    course_block_id: COURSE_BLOCK_ID_ANNOTATION = None,
+    course_target_id: COURSE_TARGET_ID_ANNOTATION = None,
+    course_subject_id: COURSE_SUBJECT_ID_ANNOTATION = None,
+    status: COURSE_STATUS_ANNOTATION = None,
+    difficulty: COURSE_DIFFICULTY_ANNOTATION = None,
+) -> CoursePage:
+    """Stránkovaný katalog kurzů — další stránka přes `cursor=next_cursor`."""
+    return await get_courses_page(
+        db,
+        limit=limit,
+        cursor=cursor,
+        fields=fields,
+        with_total=with_total,
+        include_inactive=include_inactive,
+        is_published=is_published,
+        text_search=text_search,
+        course_block_id=course_block_id,
+        course_target_id=course_target_id,
+        course_subject_id=course_subject_id,
+        status=status,
+        difficulty=difficulty,
+    )
+
+
+@public_router.get(
+    "/facets",
+    operation_id="list_courses_faceted",
+    response_model_exclude_unset=True,
+)
+async def list_courses_faceted(
+    db: AsyncReadSqlSessionDependency,
+    limit: PAGE_LIMIT_ANNOTATION = 20,
+    cursor: CURSOR_ANNOTATION = None,
+    fields: FIELDS_ANNOTATION = None,
+    include_inactive: INCLUDE_INACTIVE_ANNOTATION = False,
+    is_published: IS_PUBLISHED_ANNOTATION = False,
+    text_search: TEXT_SEARCH_ANNOTATION = None,
+    course_block_id: COURSE_BLOCK_ID_ANNOTATION = None,
+    course_target_id: COURSE_TARGET_ID_ANNOTATION = None,
+    course_subject_id: COURSE_SUBJECT_ID_ANNOTATION = None,
+    status: COURSE_STATUS_ANNOTATION = None,
+    difficulty: COURSE_DIFFICULTY_ANNOTATION = None,
+) -> CourseFacetPage:
+    """Stránka katalogu spolu s počty pro filtry (blok, cílovka, předmět,
+    stav, obtížnost). Počty fasety ignorují její vlastní zvolený filtr."""
+    filters = {
+        "include_inactive": include_inactive,
+        "is_published": is_published,
+        "text_search": text_search,
+        "course_block_id": course_block_id,
+        "course_target_id": course_target_id,
+        "course_subject_id": course_subject_id,
+        "status": status,
+        "difficulty": difficulty,
+    }
+    page = await get_courses_page(
+        db, limit=limit, cursor=cursor, fields=fields, with_total=True, **filters
+    )
+    return CourseFacetPage(
+        items=page.items,
+        next_cursor=page.next_cursor,
+        total=page.total,
+        facets=await get_course_facets(db, **filters),
     )
 
 
 @public_router.get("/{course_id}", operation_id="get_course_public")
-async def endp_get_course_public(course_id: int, db: SessionSqlSessionDependency) -> CourseDetail:
-    return get_course(db, course_id)
+async def endp_get_course_public(
+    course_id: int, request: Request, response: Response, db: AsyncReadSqlSessionDependency
+) -> CourseDetail:
+    # Detail se čte z cache, ETag se proto počítá z obsahu, který se vrací
+    course = await get_course(db, course_id)
+    version = content_version(TypeAdapter(CourseDetail), course)
+    not_modified = conditional_get(request, response, version)
+    if not_modified is not None:
+        return not_modified
+    return course
+
+
+@public_router.get(
+    "/{course_id}/player",
+    operation_id="get_course_player",
+    response_model=CoursePlayer,
+)
+async def endp_get_course_player(
+    course_id: int, request: Request, response: Response, db: AsyncReadSqlSessionDependency
+) -> Response:
+    """Strom publikovaného kurzu pro studenta — předpočítaný gzip snapshot."""
+    snapshot = await get_course_snapshot(db, course_id)
+    version = Version(f'"{snapshot.version}"', snapshot.built_at)
+    not_modified = conditional_get(request, response, version)
+    if not_modified is not None:
+        return not_modified
+
+    headers = {**response.headers, "Vary": "Accept-Encoding"}
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        content = snapshot.content
+    else:
+        content = gzip.decompress(snapshot.content)
+    return Response(content=content, media_type="application/json", headers=headers)
 
 
 @router.post("", operation_id="create_course", dependencies=[require_role("lector")])
-async def endp_create_course(
+def endp_create_course(
     course: CourseCreate, db: SessionSqlSessionDependency, user: CurrentUser
 ) -> CourseCreated:
     return create_course(db, course, user)
 
 
 @router.get("/{course_id}", operation_id="get_course")
-async def endp_get_course(course_id: int, db: SessionSqlSessionDependency) -> CourseDetail:
-    return get_course(db, course_id)
+async def endp_get_course(
+    course_id: int, request: Request, response: Response, db: AsyncReadSqlSessionDependency
+) -> CourseDetail:
+    # Detail se čte z cache, ETag se proto počítá z obsahu, který se vrací
+    course = await get_course(db, course_id)
+    version = content_version(TypeAdapter(CourseDetail), course)
+    not_modified = conditional_get(request, response, version)
+    if not_modified is not None:
+        return not_modified
+    return course
+
+
+@router.get("/{course_id}/tree", operation_id="get_course_tree")
+async def endp_get_course_tree(course_id: int, db: AsyncReadSqlSessionDependency) -> CourseTree:
+    """Vrátí kurz s aktivními moduly, learn bloky a otázkami (6 dotazů)."""
+    return await get_course_tree(db, course_id)
 
 
 @router.put("/{course_id}", operation_id="update_course", dependencies=[require_role("lector")])
-async def endp_update_course(
+def endp_update_course(
     course_id: int, course: CourseUpdate, db: SessionSqlSessionDependency, user: CurrentUser
 ) -> Course:
     return update_course(db, course_id, course, user)
@@ -125,7 +282,9 @@ async def _generate_embeddings(course_id: int) -> None:
     """Background task: vygeneruje embeddingy pro kurz."""
     db: SessionSqlSessionDependency = SessionLocal()
     try:
-        app: CompiledStateGraph[AgentState, None, AgentState, AgentState] = create_embedding_graph()
+        app: CompiledStateGraph[AgentState, None, AgentState, AgentState] = get_graph(
+            create_embedding_graph
+        )
         await app.ainvoke({"course_id": course_id, "db": db})
     except Exception as e:
         print(f"Chyba při generování embeddingů pro kurz {course_id}: {e}")
@@ -134,7 +293,7 @@ async def _generate_embeddings(course_id: int) -> None:
 
 
 @router.put("/{course_id}/status", operation_id="update_course_status", dependencies=[require_role("lector")])
-async def endp_update_course_status(
+def endp_update_course_status(
     course_id: int,
     status: Literal["edited", "in_review", "approved", "archived"],
     db: SessionSqlSessionDependency,
@@ -150,7 +309,7 @@ async def endp_update_course_status(
 
 
 @router.put("/{course_id}/published", operation_id="update_course_published", dependencies=[require_role("lector")])
-async def endp_update_course_published(
+def endp_update_course_published(
     course_id: int,
     is_published: bool,
     db: SessionSqlSessionDependency,
@@ -160,7 +319,7 @@ async def endp_update_course_published(
 
 
 @router.delete("/{course_id}", operation_id="delete_course", status_code=204, dependencies=[require_role("lector")])
-async def endp_delete_course(course_id: int, db: SessionSqlSessionDependency, user: CurrentUser) -> None:
+def endp_delete_course(course_id: int, db: SessionSqlSessionDependency, user: CurrentUser) -> None:
     delete_course(db, course_id, user)
 
 
@@ -180,10 +339,10 @@ async def endp_upload_course_file(
 
 @router.get("/{course_id}/files", operation_id="list_course_files", dependencies=[require_role("lector")])
 async def endp_list_course_files(
-    course_id: int, db: SessionSqlSessionDependency
+    course_id: int, db: AsyncSqlSessionDependency
 ) -> list[CourseFile]:
     """Vrátí seznam podkladových souborů kurzu (pouze pro vlastníky/superadminy)."""
-    return get_course_files(db, course_id)
+    return await get_course_files(db, course_id)
 
 
 @router.get(
@@ -191,7 +350,7 @@ async def endp_list_course_files(
     operation_id="download_course_file",
     dependencies=[require_role("lector")],
 )
-async def endp_download_course_file(
+def endp_download_course_file(
     course_id: int, file_id: int, db: SessionSqlSessionDependency
 ) -> Response:
     """Stáhne podkladový soubor kurzu ze SeaweedFS."""
@@ -222,7 +381,7 @@ async def endp_download_course_file(
     "/{course_id}/files/{file_id}", operation_id="delete_course_file", status_code=204,
     dependencies=[require_role("lector")],
 )
-async def endp_delete_course_file(
+def endp_delete_course_file(
     course_id: int, file_id: int, db: SessionSqlSessionDependency, user: CurrentUser
 ) -> None:
     """Smaže soubor kurzu"""
@@ -233,7 +392,7 @@ async def endp_delete_course_file(
 
 
 @router.post("/{course_id}/links", operation_id="create_course_link", dependencies=[require_role("lector")])
-async def endp_create_course_link(
+def endp_create_course_link(
     course_id: int,
     db: SessionSqlSessionDependency,
     url: str,
@@ -246,10 +405,16 @@ async def endp_create_course_link(
 @router.get("/{course_id}/links", operation_id="list_course_links")
 async def endp_list_course_links(
     course_id: int,
-    db: SessionSqlSessionDependency,
+    request: Request,
+    response: Response,
+    db: AsyncSqlSessionDependency,
 ) -> list[CourseLink]:
     """Vrátí seznam odkazů ke kurzu"""
-    return get_course_links(db, course_id)
+    version = await get_version_async(db, course_links_version_query(course_id))
+    not_modified = conditional_get(request, response, version)
+    if not_modified is not None:
+        return not_modified
+    return await get_course_links(db, course_id)
 
 
 @router.delete(
@@ -258,7 +423,7 @@ async def endp_list_course_links(
     status_code=204,
     dependencies=[require_role("lector")],
 )
-async def endp_delete_course_link(
+def endp_delete_course_link(
     course_id: int, link_id: int, db: SessionSqlSessionDependency, user: CurrentUser
 ) -> None:
     """Smaže odkaz kurzu"""
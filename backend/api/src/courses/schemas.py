@@ -1,7 +1,7 @@
-from pydantic import Field, model_validator
+from pydantic import BaseModel, Field, model_validator
 
 from api.src.modules.schemas import Module
-from api.src.common.schemas import ORMModel
+from api.src.common.schemas import FacetCount, ORMModel
 from api.enums import Difficulty, Status
 from api.src.catalogs.schemas import CourseBlock, CourseTarget, CourseSubject
 
@@ -96,8 +96,6 @@ class Course(CourseBase):
                     obj.__dict__["modules_count"] = len(obj.modules)
                 except Exception:
                     pass
-            # enrollments_count se plní v `read.py` přes agregační dotaz, aby
-            # nedocházelo k N+1; tady zachováme případně už předvyplněnou hodnotu.
             owner = getattr(obj, "owner", None)
             if owner is not None:
                 try:
@@ -111,3 +109,51 @@ class CourseDetail(Course):
     """Detailní response kurzu včetně modulů (GET /courses/{id})"""
 
     modules: list[Module] = []
+
+
+class CoursePlayer(CourseBase):
+    """Strom schváleného kurzu pro studenta (GET /courses/{id}/player)
+
+    Servíruje se z předpočítaného snapshotu, proto neobsahuje nic, co se
+    u schváleného kurzu mění (status, publikování, čítače zápisů).
+    """
+
+    course_id: int
+    owner_display_name: str | None = None
+    course_block: CourseBlock | None = None
+    course_target: CourseTarget | None = None
+    course_subject: CourseSubject | None = None
+    modules: list[Module] = []
+
+    @model_validator(mode="before")
+    @classmethod
+    def populate_owner_display_name(cls, obj):
+        owner = getattr(obj, "owner", None)
+        if owner is not None:
+            obj.__dict__["owner_display_name"] = owner.display_name
+        return obj
+
+
+class CourseTree(CoursePlayer):
+    """Živě načtený strom kurzu i s rozpracovaným obsahem (GET /courses/{id}/tree)"""
+
+    status: Status
+    is_published: bool
+    is_active: bool
+
+
+class CoursePage(BaseModel):
+    """Stránka katalogu kurzů (keyset stránkování)
+
+    Při `fields=` obsahují položky jen vyžádaná pole.
+    """
+
+    items: list[Course]
+    next_cursor: str | None = None
+    total: int | None = None
+
+
+class CourseFacetPage(CoursePage):
+    """Stránka katalogu + počty kurzů pro každou hodnotu filtrů"""
+
+    facets: dict[str, list[FacetCount]]
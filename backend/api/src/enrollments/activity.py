@@ -0,0 +1,58 @@
+"""
+Denní rollup aktivity uživatelů (`user_activity_daily`) pro heat mapu.
+
+Události — passed modul, zápis do kurzu, dokončení kurzu — zapisují
+controllery a agent hodnocení voláním `record_*` před commitem ve stejné
+transakci: jeden upsert zvýší počet dne a doplní popisek (max.
+`TOP_TITLES`). Heat mapa i roční souhrn jsou pak range scan primárního
+klíče (user_id, day). Den se počítá v UTC.
+
+Rollup je deník událostí: pozdější změna (např. superadmin vrátí passed
+session na failed) už zapsanou událost neodečte.
+"""
+
+from sqlalchemy import Date, case, cast, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from api import models
+
+TOP_TITLES = 3
+
+
+def record_activity(db: Session, user_id: int, title: str) -> None:
+    """Započítá jednu událost do dnešního dne uživatele (commit volá volající)."""
+    daily = models.UserActivityDaily
+    stmt = insert(daily).values(
+        user_id=user_id,
+        day=cast(func.timezone("UTC", func.now()), Date),
+        count=1,
+        top_titles=[title],
+    )
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[daily.user_id, daily.day],
+            set_={
+                "count": daily.count + 1,
+                "top_titles": case(
+                    (
+                        func.cardinality(daily.top_titles) < TOP_TITLES,
+                        daily.top_titles + stmt.excluded.top_titles,
+                    ),
+                    else_=daily.top_titles,
+                ),
+            },
+        )
+    )
+
+
+def record_module_passed(db: Session, user_id: int, module: models.Module) -> None:
+    record_activity(db, user_id, f"✅ {module.course.title}: {module.title}")
+
+
+def record_enrolled(db: Session, user_id: int, course: models.Course) -> None:
+    record_activity(db, user_id, f"📚 Zápis: {course.title}")
+
+
+def record_course_completed(db: Session, user_id: int, course: models.Course) -> None:
+    record_activity(db, user_id, f"🏆 Dokončen: {course.title}")
@@ -1,16 +1,20 @@
-from collections import defaultdict
 from datetime import UTC, date, datetime, timedelta
 
 from fastapi import HTTPException
-from sqlalchemy import func, select
+from sqlalchemy import func, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
 
 from api import models
+from api.config import settings
 from api.src.common.utils import get_or_404
 from api.enums import Status, UserRole, ModuleTaskSessionStatus
+from api.src.enrollments import visits
+from api.src.enrollments.activity import record_enrolled
 from api.src.enrollments.schemas import (
     ActivityDay,
     ActivityResponse,
+    ActivitySummary,
     Enrollment,
     MyEnrollment,
     MyEnrollmentCourse,
@@ -18,6 +22,26 @@ from api.src.enrollments.schemas import (
 )
 
 
+def _adjust_enrollments_count(db: Session, course_id: int, delta: int) -> None:
+    """Atomicky upraví `course.enrollments_count` ve stejné transakci.
+
+    Volat až po změně zápisu. Session nemá autoflush, proto se zápis
+    nejdřív explicitně flushne — zámky se pak berou ve stejném pořadí
+    (enrollment, course) jako v `reconcile_enrollments_count`.
+    """
+    db.flush()
+    db.execute(
+        update(models.Course)
+        .where(models.Course.course_id == course_id)
+        .values(
+            enrollments_count=models.Course.enrollments_count + delta,
+            # změna čítače není editace kurzu
+            updated_at=models.Course.updated_at,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
 def list_enrollments(
     db: Session,
     actor: models.User,
@@ -88,6 +112,8 @@ def create_enrollment(
 
     enrollment = models.Enrollment(user_id=user_id, course_id=course_id)
     db.add(enrollment)
+    _adjust_enrollments_count(db, course_id, +1)
+    record_enrolled(db, user_id, course)
     db.commit()
     db.refresh(enrollment)
     return Enrollment.model_validate(enrollment)
@@ -111,6 +137,8 @@ def delete_enrollment(
         )
 
     enrollment.left_at = func.now()
+    if enrollment.is_active:
+        _adjust_enrollments_count(db, enrollment.course_id, -1)
     db.commit()
 
 
@@ -131,10 +159,12 @@ def soft_delete_enrollment(
         )
 
     enrollment.is_active = False
+    if enrollment.left_at is None:
+        _adjust_enrollments_count(db, enrollment.course_id, -1)
     db.commit()
 
 
-def my_enrollments(db: Session, user: models.User) -> list[MyEnrollment]:
+async def my_enrollments(db: AsyncSession, user: models.User) -> list[MyEnrollment]:
     """
     Vrátí zápisy aktuálního uživatele s progress informacemi.
 
@@ -142,7 +172,7 @@ def my_enrollments(db: Session, user: models.User) -> list[MyEnrollment]:
     načteny v jediném SQL dotazu na uživatele, nikoli per-kurz.
     """
     enrollments: list[models.Enrollment] = list(
-        db.execute(
+        await db.scalars(
             select(models.Enrollment)
             .options(joinedload(models.Enrollment.course))
             .where(
@@ -150,7 +180,7 @@ def my_enrollments(db: Session, user: models.User) -> list[MyEnrollment]:
                 models.Enrollment.is_active.is_(True),
                 models.Enrollment.left_at.is_(None),
             )
-        ).scalars()
+        )
     )
 
     if not enrollments:
@@ -164,45 +194,36 @@ def my_enrollments(db: Session, user: models.User) -> list[MyEnrollment]:
     # Course.modules má custom primaryjoin s is_active==True, takže pro
     # předvídatelné chování v rámci dávky raději vlastní explicit query.
     modules_by_course: dict[int, list[models.Module]] = {}
-    for m in db.execute(
+    for m in await db.scalars(
         select(models.Module)
         .where(
             models.Module.course_id.in_(course_ids),
             models.Module.is_active.is_(True),
         )
         .order_by(models.Module.course_id, models.Module.module_id)
-    ).scalars():
+    ):
         modules_by_course.setdefault(m.course_id, []).append(m)
 
-    # Jedním dotazem stáhneme všechny passed (module_id) pro daného uživatele
-    # napříč jeho zápisy.
-    passed_rows = db.execute(
-        select(models.ModuleTaskSession.module_id)
-        .join(models.Module, models.Module.module_id == models.ModuleTaskSession.module_id)
-        .where(
-            models.ModuleTaskSession.user_id == user.user_id,
-            models.ModuleTaskSession.status == ModuleTaskSessionStatus.passed,
-            models.Module.course_id.in_(course_ids),
-        )
-    ).all()
-    passed_module_ids: set[int] = {row[0] for row in passed_rows}
-
-    # Druhým dotazem agregujeme nejnovější timestamp aktivity pro každý
-    # (user_id, course_id) — bere v úvahu i activity před zavedením
-    # `last_activity_at` (legacy fallback).
-    legacy_activity_rows = db.execute(
+    # Postup napříč zápisy jedním indexovaným dotazem do user_module_progress:
+    # splněné moduly a nejnovější aktivita pro každý kurz — bere v úvahu
+    # i aktivitu před zavedením `last_activity_at` (legacy fallback).
+    passed_module_ids: set[int] = set()
+    legacy_activity: dict[int, datetime] = {}
+    for course_id, module_id, status, activity_at in await db.execute(
         select(
-            models.Module.course_id,
-            func.max(models.ModuleTaskSession.updated_at),
+            models.UserModuleProgress.course_id,
+            models.UserModuleProgress.module_id,
+            models.UserModuleProgress.status,
+            models.UserModuleProgress.last_activity_at,
+        ).where(
+            models.UserModuleProgress.user_id == user.user_id,
+            models.UserModuleProgress.course_id.in_(course_ids),
         )
-        .join(models.Module, models.Module.module_id == models.ModuleTaskSession.module_id)
-        .where(
-            models.ModuleTaskSession.user_id == user.user_id,
-            models.Module.course_id.in_(course_ids),
-        )
-        .group_by(models.Module.course_id)
-    ).all()
-    legacy_activity: dict[int, datetime] = {row[0]: row[1] for row in legacy_activity_rows}
+    ):
+        if status == ModuleTaskSessionStatus.passed:
+            passed_module_ids.add(module_id)
+        if course_id not in legacy_activity or activity_at > legacy_activity[course_id]:
+            legacy_activity[course_id] = activity_at
 
     result: list[MyEnrollment] = []
     for enrollment in enrollments:
@@ -228,7 +249,7 @@ def my_enrollments(db: Session, user: models.User) -> list[MyEnrollment]:
                 break
 
         # Pokud uživatel má explicitní last_visited, použij ho; jinak
-        # spadni na agregovaný timestamp ze task_session (backfill pro
+        # spadni na agregovaný timestamp z user_module_progress (backfill pro
         # existující uživatele před zavedením explicitního trackingu).
         last_activity = enrollment.last_activity_at or legacy_activity.get(course.course_id)
 
@@ -270,9 +291,38 @@ def leave_enrollment(db: Session, enrollment_id: int, user: models.User) -> None
         raise HTTPException(status_code=400, detail="Kurz jste již opustili")
 
     enrollment.left_at = func.now()
+    if enrollment.is_active:
+        _adjust_enrollments_count(db, enrollment.course_id, -1)
     db.commit()
 
 
+def reconcile_enrollments_count(db: Session) -> int:
+    """Srovná `course.enrollments_count` se skutečným počtem zápisů.
+
+    Opravuje drift (ruční zásahy v DB, chyby). `enrollment` se zamkne
+    v SHARE režimu — čtení běží dál, zápisy zápisů počkají do commitu, takže
+    agregace nemůže přepsat souběžnou změnu čítače. Vrací počet opravených kurzů.
+    """
+    db.execute(text("LOCK TABLE enrollment IN SHARE MODE"))
+    fixed = db.execute(
+        text(
+            """
+            UPDATE course c SET enrollments_count = COALESCE(e.cnt, 0)
+            FROM course c2
+            LEFT JOIN (
+                SELECT course_id, count(*) AS cnt FROM enrollment
+                WHERE is_active AND left_at IS NULL
+                GROUP BY course_id
+            ) e ON e.course_id = c2.course_id
+            WHERE c.course_id = c2.course_id
+              AND c.enrollments_count <> COALESCE(e.cnt, 0)
+            """
+        )
+    ).rowcount
+    db.commit()
+    return fixed
+
+
 def mark_module_visited(db: Session, module_id: int, user: models.User) -> None:
     """
     Označí modul jako naposledy otevřený daným uživatelem.
@@ -281,7 +331,14 @@ def mark_module_visited(db: Session, module_id: int, user: models.User) -> None:
 
     Tichý no-op, pokud user není zapsán nebo modul/kurz neexistuje —
     endpoint slouží pro tracking, ne pro authorization.
+
+    S `VISITS__WRITE_BEHIND` (výchozí) se návštěva jen předá bufferu
+    a zapíše se dávkově se zpožděním nejvýše `VISITS__FLUSH_INTERVAL` s.
     """
+    if settings.visits.write_behind:
+        visits.buffer.add(user.user_id, module_id, datetime.now(tz=UTC))
+        return
+
     module = db.scalar(
         select(models.Module).where(models.Module.module_id == module_id)
     )
@@ -324,7 +381,8 @@ def get_my_activity(
     od dneška.
 
     Aktivita = úspěšně dokončené (passed) task sessions + zapsání do kurzu +
-    dokončení kurzu. Vše agregováno per den v UTC.
+    dokončení kurzu. Čte se z denního rollupu `user_activity_daily`
+    (jeden range scan primárního klíče), dny jsou v UTC.
     """
     if from_date is not None and to_date is not None:
         if from_date > to_date:
@@ -338,87 +396,69 @@ def get_my_activity(
         to_date = datetime.now(tz=UTC).date()
         from_date = to_date - timedelta(days=days - 1)
 
-    from_dt = datetime.combine(from_date, datetime.min.time(), tzinfo=UTC)
-    to_dt = datetime.combine(to_date, datetime.max.time(), tzinfo=UTC)
-
-    bucket: dict[date, dict[str, object]] = defaultdict(
-        lambda: {"count": 0, "titles": []}
-    )
-
-    # Passed task sessions (užitečnější granularita než completed_at zápisu)
-    passed_rows = db.execute(
+    rows = db.execute(
         select(
-            func.date_trunc("day", models.ModuleTaskSession.updated_at).label("d"),
-            models.Module.title,
-            models.Course.title,
+            models.UserActivityDaily.day,
+            models.UserActivityDaily.count,
+            models.UserActivityDaily.top_titles,
         )
-        .join(models.Module, models.Module.module_id == models.ModuleTaskSession.module_id)
-        .join(models.Course, models.Course.course_id == models.Module.course_id)
         .where(
-            models.ModuleTaskSession.user_id == user.user_id,
-            models.ModuleTaskSession.status == ModuleTaskSessionStatus.passed,
-            models.ModuleTaskSession.updated_at >= from_dt,
-            models.ModuleTaskSession.updated_at <= to_dt,
-        )
-    ).all()
-    for d, mod_title, course_title in passed_rows:
-        day = d.date()
-        entry = bucket[day]
-        entry["count"] = int(entry["count"]) + 1  # type: ignore[arg-type]
-        titles = entry["titles"]
-        if isinstance(titles, list) and len(titles) < 3:
-            titles.append(f"✅ {course_title}: {mod_title}")
-
-    # Enrollment created (zápis do kurzu) — jedno započítané "události" denně
-    enrolled_rows = db.execute(
-        select(
-            func.date_trunc("day", models.Enrollment.created_at).label("d"),
-            models.Course.title,
-        )
-        .join(models.Course, models.Course.course_id == models.Enrollment.course_id)
-        .where(
-            models.Enrollment.user_id == user.user_id,
-            models.Enrollment.created_at >= from_dt,
-            models.Enrollment.created_at <= to_dt,
-        )
-    ).all()
-    for d, course_title in enrolled_rows:
-        day = d.date()
-        entry = bucket[day]
-        entry["count"] = int(entry["count"]) + 1  # type: ignore[arg-type]
-        titles = entry["titles"]
-        if isinstance(titles, list) and len(titles) < 3:
-            titles.append(f"📚 Zápis: {course_title}")
-
-    # Enrollment completed (celý kurz hotov)
-    completed_rows = db.execute(
-        select(
-            func.date_trunc("day", models.Enrollment.completed_at).label("d"),
-            models.Course.title,
-        )
-        .join(models.Course, models.Course.course_id == models.Enrollment.course_id)
-        .where(
-            models.Enrollment.user_id == user.user_id,
-            models.Enrollment.completed_at.is_not(None),
-            models.Enrollment.completed_at >= from_dt,
-            models.Enrollment.completed_at <= to_dt,
+            models.UserActivityDaily.user_id == user.user_id,
+            models.UserActivityDaily.day.between(from_date, to_date),
         )
+        .order_by(models.UserActivityDaily.day)
     ).all()
-    for d, course_title in completed_rows:
-        day = d.date()
-        entry = bucket[day]
-        entry["count"] = int(entry["count"]) + 1  # type: ignore[arg-type]
-        titles = entry["titles"]
-        if isinstance(titles, list) and len(titles) < 3:
-            titles.append(f"🏆 Dokončen: {course_title}")
-
     days_out = [
-        ActivityDay(
-            date=day,
-            count=int(entry["count"]),  # type: ignore[arg-type]
-            titles=list(entry["titles"]),  # type: ignore[arg-type]
-        )
-        for day, entry in sorted(bucket.items())
+        ActivityDay(date=day, count=count, titles=titles)
+        for day, count, titles in rows
     ]
 
     return ActivityResponse(days=days_out, from_date=from_date, to_date=to_date)
+
+
+def get_my_activity_summary(
+    db: Session, user: models.User, year: int | None = None
+) -> ActivitySummary:
+    """
+    Roční souhrn aktivity z rollupu — součet událostí, aktivní dny,
+    nejdelší a aktuální série po sobě jdoucích dnů a nejaktivnější den.
+
+    Série se počítají v rámci roku; aktuální série končí dnes (nebo včera,
+    pokud dnes ještě aktivita nebyla) a pro minulé roky je 0.
+    """
+    today = datetime.now(tz=UTC).date()
+    if year is None:
+        year = today.year
+
+    rows = db.execute(
+        select(models.UserActivityDaily.day, models.UserActivityDaily.count)
+        .where(
+            models.UserActivityDaily.user_id == user.user_id,
+            models.UserActivityDaily.day.between(date(year, 1, 1), date(year, 12, 31)),
+        )
+        .order_by(models.UserActivityDaily.day)
+    ).all()
+
+    longest = streak = 0
+    previous: date | None = None
+    best: tuple[date, int] | None = None
+    for day, count in rows:
+        streak = streak + 1 if previous == day - timedelta(days=1) else 1
+        longest = max(longest, streak)
+        previous = day
+        if best is None or count > best[1]:
+            best = (day, count)
+
+    current = 0
+    if previous is not None and today - previous <= timedelta(days=1):
+        current = streak
+
+    return ActivitySummary(
+        year=year,
+        total=sum(count for _, count in rows),
+        active_days=len(rows),
+        longest_streak=longest,
+        current_streak=current,
+        best_day=best[0] if best else None,
+        best_day_count=best[1] if best else 0,
+    )
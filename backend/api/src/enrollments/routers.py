@@ -3,10 +3,15 @@ from typing import Annotated
 
 from fastapi import APIRouter, Query
 
-from api.database import SessionSqlSessionDependency
+from api.database import (
+    AsyncReadSqlSessionDependency,
+    ReadSqlSessionDependency,
+    SessionSqlSessionDependency,
+)
 from api.dependencies import CurrentUser, require_role
 from api.src.enrollments.schemas import (
     ActivityResponse,
+    ActivitySummary,
     Enrollment,
     EnrollmentCreate,
     MyEnrollment,
@@ -20,19 +25,20 @@ from api.src.enrollments.controllers import (
     leave_enrollment,
     mark_module_visited,
     get_my_activity,
+    get_my_activity_summary,
 )
 
 router = APIRouter(prefix="/enrollments", tags=["Enrollments"])
 
 
 @router.get("/my", operation_id="my_enrollments", dependencies=[require_role("user")])
-def endp_my_enrollments(
-    db: SessionSqlSessionDependency,
+async def endp_my_enrollments(
+    db: AsyncReadSqlSessionDependency,
     actor: CurrentUser,
 ) -> list[MyEnrollment]:
     """Vrátí zápisy aktuálního uživatele s progress informacemi, next-module
     cílem a posledním časem aktivity. Seřazeno od nejnovější aktivity."""
-    return my_enrollments(db, user=actor)
+    return await my_enrollments(db, user=actor)
 
 
 @router.post(
@@ -58,7 +64,7 @@ def endp_mark_module_visited(
     dependencies=[require_role("user")],
 )
 def endp_my_activity(
-    db: SessionSqlSessionDependency,
+    db: ReadSqlSessionDependency,
     actor: CurrentUser,
     days: Annotated[int, Query(ge=1, le=400)] = 180,
     from_date: Annotated[
@@ -76,6 +82,24 @@ def endp_my_activity(
     return get_my_activity(db, user=actor, days=days, from_date=from_date, to_date=to_date)
 
 
+@router.get(
+    "/my/activity/summary",
+    operation_id="my_activity_summary",
+    dependencies=[require_role("user")],
+)
+def endp_my_activity_summary(
+    db: ReadSqlSessionDependency,
+    actor: CurrentUser,
+    year: Annotated[
+        int | None,
+        Query(ge=2000, le=2100, description="Rok souhrnu (výchozí aktuální rok)."),
+    ] = None,
+) -> ActivitySummary:
+    """Roční souhrn aktivity — celkový počet událostí, aktivní dny,
+    nejdelší a aktuální série a nejaktivnější den."""
+    return get_my_activity_summary(db, user=actor, year=year)
+
+
 @router.get("", operation_id="list_enrollments", dependencies=[require_role("lector")])
 def endp_list_enrollments(
     db: SessionSqlSessionDependency,
@@ -118,7 +142,7 @@ def endp_remove_from_course(
     delete_enrollment(db, enrollment_id=enrollment_id, actor=actor)
 
 
-@router.delete("/{enrollment_id}/delete", operation_id="delete_enrollment", status_code=204, dependencies=[require_role("superadmin")])
+@router.delete("/{enrollment_id}/delete", operation_id="delete_enrollment", status_code=204, dependencies=[require_role("superadmin", introspect=True)])
 def endp_delete_enrollment(
     enrollment_id: int,
     db: SessionSqlSessionDependency,
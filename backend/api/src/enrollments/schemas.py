@@ -80,3 +80,15 @@ class ActivityResponse(ORMModel):
     days: list[ActivityDay]
     from_date: date
     to_date: date
+
+
+class ActivitySummary(ORMModel):
+    """Roční souhrn aktivity (série = po sobě jdoucí aktivní dny)."""
+
+    year: int
+    total: int
+    active_days: int
+    longest_streak: int
+    current_streak: int
+    best_day: date | None = None
+    best_day_count: int = 0
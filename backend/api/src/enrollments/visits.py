@@ -0,0 +1,135 @@
+"""
+Write-behind sledování otevřených modulů („Pokračuj kde jsi skončil").
+
+`mark_module_visited` jen zapíše návštěvu do paměti workeru — opakovaná
+otevření se slijí na poslední (user, modul). Vlákno bufferu je nejpozději
+po `VISITS__FLUSH_INTERVAL` s (nebo při `VISITS__MAX_PENDING` čekajících)
+zapíše jedním `UPDATE enrollment ... FROM (VALUES ...)`; kurz modulu se
+dohledá až v SQL a za každý zápis se použije nejnovější návštěva.
+Při ukončení workeru se buffer dopíše (`buffer.stop()` v lifespan).
+
+Je to čistě tracking: při pádu procesu se ztratí nejvýše poslední
+interval návštěv, chyba zápisu se jen zaloguje.
+"""
+
+import logging
+import threading
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, and_, column, or_, select, update, values
+
+from api import models
+from api.config import settings
+from api.database import engine
+
+log = logging.getLogger(__name__)
+
+
+def _flush_statement(rows: list[tuple[int, int, datetime]]):
+    visits = values(
+        column("user_id", BigInteger),
+        column("module_id", BigInteger),
+        column("visited_at", DateTime(timezone=True)),
+        name="visits",
+    ).data(rows)
+    # Nejnovější návštěva pro každý (user, kurz)
+    latest = (
+        select(
+            visits.c.user_id,
+            models.Module.course_id,
+            visits.c.module_id,
+            visits.c.visited_at,
+        )
+        .join(
+            models.Module,
+            and_(
+                models.Module.module_id == visits.c.module_id,
+                models.Module.is_active.is_(True),
+            ),
+        )
+        .distinct(visits.c.user_id, models.Module.course_id)
+        .order_by(
+            visits.c.user_id, models.Module.course_id, visits.c.visited_at.desc()
+        )
+        .subquery()
+    )
+    enrollment = models.Enrollment
+    return (
+        update(enrollment)
+        .where(
+            enrollment.user_id == latest.c.user_id,
+            enrollment.course_id == latest.c.course_id,
+            enrollment.is_active.is_(True),
+            enrollment.left_at.is_(None),
+            # souběžný flush jiného workeru mohl zapsat novější návštěvu
+            or_(
+                enrollment.last_activity_at.is_(None),
+                enrollment.last_activity_at < latest.c.visited_at,
+            ),
+        )
+        .values(
+            last_visited_module_id=latest.c.module_id,
+            last_activity_at=latest.c.visited_at,
+        )
+    )
+
+
+class VisitBuffer:
+    """Slévá návštěvy modulů v paměti a dávkově je zapisuje na pozadí."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: dict[tuple[int, int], datetime] = {}
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._thread: threading.Thread | None = None
+
+    def add(self, user_id: int, module_id: int, visited_at: datetime) -> None:
+        with self._lock:
+            self._pending[(user_id, module_id)] = visited_at
+            full = len(self._pending) >= settings.visits.max_pending
+            # Vlákno se startuje líně až v procesu, který zapisuje (ne před forkem)
+            if self._thread is None:
+                self._stopping = False
+                self._thread = threading.Thread(
+                    target=self._run, name="visit-buffer", daemon=True
+                )
+                self._thread.start()
+        if full:
+            self._wakeup.set()
+
+    def flush(self) -> int:
+        """Zapíše čekající návštěvy; vrací počet aktualizovaných zápisů."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        rows = [
+            (user_id, module_id, visited_at)
+            for (user_id, module_id), visited_at in pending.items()
+        ]
+        try:
+            with engine.begin() as conn:
+                return conn.execute(_flush_statement(rows)).rowcount
+        except Exception:
+            log.exception("Failed to write %d module visits", len(rows))
+            return 0
+
+    def stop(self) -> None:
+        """Ukončí vlákno a dopíše zbylé návštěvy."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+            self._stopping = True
+        if thread is not None:
+            self._wakeup.set()
+            thread.join(timeout=30)
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stopping:
+            self._wakeup.wait(settings.visits.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+
+buffer = VisitBuffer()
@@ -1,14 +1,37 @@
 from collections.abc import Sequence
 from fastapi import HTTPException
-from sqlalchemy import Select, and_, func, select
+from sqlalchemy import ColumnElement, Select, and_, exists, func, select
 from sqlalchemy.orm import Session
 
+from api.src.common.conditional import version_query
+from api.src.common.search import text_search_filter
 from api.src.common.utils import get_or_404, assert_course_editable, check_enrollment
+from api.src.enrollments.activity import record_course_completed, record_module_passed
+from api.src.modules.progress import refresh_module_progress
 from api.src.modules.schemas import Module, ModuleCreate, ModuleUpdate, ModuleCompletionStatus, ModuleAssessmentQuestion, AssessmentAttemptDetail
-from api import enums, models
+from api import cache, enums, models
 from api.authorization import validate_owner_or_superadmin
 
 
+def _module_filters(
+    include_inactive: bool = False,
+    text_search: str | None = None,
+    course_id: int | None = None,
+) -> list[ColumnElement[bool]]:
+    filters: list[ColumnElement[bool]] = []
+
+    if not include_inactive:
+        filters.append(models.Module.is_active.is_(True))
+
+    if course_id is not None:
+        filters.append(models.Module.course_id == course_id)
+
+    if text_search:
+        filters.append(text_search_filter(models.Module.search_vector, text_search))
+
+    return filters
+
+
 def get_modules(
     db: Session,
     include_inactive: bool = False,
@@ -18,26 +41,48 @@ def get_modules(
     """
     Vrátí seznam modulů s volitelnými filtry:
     - include_inactive: zahrnout i neaktivní (jinak jen aktivní)
-    - text_search: fulltext přes title
+    - text_search: fulltext přes title (`search_vector`)
     - course_id: moduly jen pro daný kurz
     """
-    stm: Select[tuple[models.Module]] = select(models.Module)
-
-    if not include_inactive:
-        stm = stm.where(models.Module.is_active.is_(True))
-
-    if course_id is not None:
-        stm = stm.where(models.Module.course_id == course_id)
-
-    if text_search:
-        stm = stm.where(models.Module.title.ilike(f"%{text_search}%"))
-
-    stm = stm.order_by(models.Module.course_id, models.Module.module_id)
+    stm: Select[tuple[models.Module]] = (
+        select(models.Module)
+        .where(*_module_filters(include_inactive, text_search, course_id))
+        .order_by(models.Module.course_id, models.Module.module_id)
+    )
 
     rows: Sequence[models.Module] = db.execute(stm).scalars().all()
     return [Module.model_validate(m) for m in rows]
 
 
+def modules_version_query(
+    include_inactive: bool = False,
+    text_search: str | None = None,
+    course_id: int | None = None,
+) -> Select:
+    """Verze výpisu modulů — moduly včetně learn bloků a otázek, které vrací."""
+    module_ids = select(models.Module.module_id).where(
+        *_module_filters(include_inactive, text_search, course_id)
+    )
+    question_ids = select(models.PracticeQuestion.question_id).where(
+        models.PracticeQuestion.module_id.in_(module_ids)
+    )
+    return version_query(
+        select(models.Module.updated_at).where(models.Module.module_id.in_(module_ids)),
+        select(models.LearnBlock.updated_at).where(
+            models.LearnBlock.module_id.in_(module_ids)
+        ),
+        select(models.PracticeQuestion.updated_at).where(
+            models.PracticeQuestion.module_id.in_(module_ids)
+        ),
+        select(models.PracticeOption.updated_at).where(
+            models.PracticeOption.question_id.in_(question_ids)
+        ),
+        select(models.QuestionKeyword.updated_at).where(
+            models.QuestionKeyword.question_id.in_(question_ids)
+        ),
+    )
+
+
 def create_module(db: Session, data: ModuleCreate, user: models.User) -> Module:
     """
     Vytvoří modul.
@@ -51,6 +96,7 @@ def create_module(db: Session, data: ModuleCreate, user: models.User) -> Module:
     obj.is_active = True
 
     db.add(obj)
+    cache.invalidate(db, "courses", f"course:{course.course_id}")
     db.commit()
     db.refresh(obj)
     return Module.model_validate(obj)
@@ -96,6 +142,7 @@ def update_module(db: Session, module_id: int, module_data: ModuleUpdate, user:
     module.title = module_data.title
     module.max_task_attempts = module_data.max_task_attempts
     db.add(module)
+    cache.invalidate(db, "courses", f"course:{module.course_id}")
     db.commit()
     db.refresh(module)
 
@@ -110,6 +157,7 @@ def delete_module(db: Session, module_id: int) -> None:
 
     # Soft delete - nastavíme is_active na False
     module.is_active = False
+    cache.invalidate(db, "courses", f"course:{module.course_id}")
     db.commit()
 
 
@@ -128,15 +176,9 @@ def complete_module(db: Session, module_id: int, user: models.User, score: int)
     check_enrollment(db, user, course, bypass_for_owner=True)
 
     # Check if already passed
-    existing = db.scalar(
-        select(models.ModuleTaskSession).where(
-            models.ModuleTaskSession.user_id == user.user_id,
-            models.ModuleTaskSession.module_id == module_id,
-            models.ModuleTaskSession.status == enums.ModuleTaskSessionStatus.passed,
-        )
-    )
+    progress = db.get(models.UserModuleProgress, (user.user_id, module_id))
 
-    if not existing:
+    if progress is None or progress.status != enums.ModuleTaskSessionStatus.passed:
         # Create task session as passed
         session = models.ModuleTaskSession(
             user_id=user.user_id,
@@ -145,23 +187,24 @@ def complete_module(db: Session, module_id: int, user: models.User, score: int)
             generated_task=f"Practice test score: {score}%",
         )
         db.add(session)
-        db.flush()
-
-    # Check if ALL active modules are now passed → mark enrollment as completed
-    all_passed = True
-    for m in [m for m in course.modules if m.is_active]:
-        if m.module_id == module_id:
-            continue  # just completed this one
-        m_passed = db.scalar(
-            select(models.ModuleTaskSession).where(
-                models.ModuleTaskSession.user_id == user.user_id,
-                models.ModuleTaskSession.module_id == m.module_id,
-                models.ModuleTaskSession.status == enums.ModuleTaskSessionStatus.passed,
+        refresh_module_progress(db, user.user_id, module_id)
+        record_module_passed(db, user.user_id, module)
+
+    # Jsou teď splněné všechny aktivní moduly? → zápis je dokončený (jeden dotaz)
+    all_passed = not db.scalar(
+        select(
+            exists().where(
+                models.Module.course_id == course.course_id,
+                models.Module.is_active.is_(True),
+                models.Module.module_id != module_id,
+                ~exists().where(
+                    models.UserModuleProgress.user_id == user.user_id,
+                    models.UserModuleProgress.module_id == models.Module.module_id,
+                    models.UserModuleProgress.status == enums.ModuleTaskSessionStatus.passed,
+                ),
             )
         )
-        if m_passed is None:
-            all_passed = False
-            break
+    )
 
     if all_passed:
         enrollment_obj = db.scalar(
@@ -174,6 +217,7 @@ def complete_module(db: Session, module_id: int, user: models.User, score: int)
         )
         if enrollment_obj and enrollment_obj.completed_at is None:
             enrollment_obj.completed_at = func.now()
+            record_course_completed(db, user.user_id, course)
 
     db.commit()
 
@@ -184,28 +228,18 @@ def get_assessment_question(db: Session, module_id: int, user: models.User) -> M
     """Vrátí assessment otázku pro daný modul a uživatele. Priorita: in_progress > passed > nejnovější failed."""
     module = get_or_404(db, models.Module, module_id, detail="Modul nenalezen")
 
-    # Priorita: in_progress nebo passed (max 1 díky unique indexu), pak nejnovější failed
+    # Rozhodující session (in_progress / passed > nejnovější failed) drží user_module_progress
     session = db.scalar(
-        select(models.ModuleTaskSession).where(
-            models.ModuleTaskSession.user_id == user.user_id,
-            models.ModuleTaskSession.module_id == module_id,
-            models.ModuleTaskSession.status.in_([
-                enums.ModuleTaskSessionStatus.in_progress,
-                enums.ModuleTaskSessionStatus.passed,
-            ]),
+        select(models.ModuleTaskSession)
+        .join(
+            models.UserModuleProgress,
+            models.UserModuleProgress.session_id == models.ModuleTaskSession.session_id,
         )
-    )
-
-    if session is None:
-        session = db.scalar(
-            select(models.ModuleTaskSession)
-            .where(
-                models.ModuleTaskSession.user_id == user.user_id,
-                models.ModuleTaskSession.module_id == module_id,
-                models.ModuleTaskSession.status == enums.ModuleTaskSessionStatus.failed,
-            )
-            .order_by(models.ModuleTaskSession.session_id.desc())
+        .where(
+            models.UserModuleProgress.user_id == user.user_id,
+            models.UserModuleProgress.module_id == module_id,
         )
+    )
 
     if session is None:
         raise HTTPException(status_code=404, detail="Žádná assessment otázka pro tento modul")
@@ -234,53 +268,44 @@ def get_assessment_question(db: Session, module_id: int, user: models.User) -> M
 
 
 def get_course_progress(db: Session, course_id: int, user: models.User) -> list[ModuleCompletionStatus]:
-    """Vrátí stav dokončení všech modulů kurzu pro daného uživatele."""
-    course = get_or_404(db, models.Course, course_id, detail="Kurz nenalezen")
-
-    result: list[ModuleCompletionStatus] = []
-    for module in course.modules:
-        if not module.is_active:
-            continue
-
-        # Najdi relevantní task session: priorita passed > in_progress > nejnovější failed
-        session = db.scalar(
-            select(models.ModuleTaskSession).where(
-                models.ModuleTaskSession.user_id == user.user_id,
-                models.ModuleTaskSession.module_id == module.module_id,
-                models.ModuleTaskSession.status.in_([
-                    enums.ModuleTaskSessionStatus.passed,
-                    enums.ModuleTaskSessionStatus.in_progress,
-                ]),
-            )
+    """Vrátí stav dokončení všech modulů kurzu pro daného uživatele.
+
+    Jeden dotaz: aktivní moduly kurzu s připojeným řádkem
+    `user_module_progress` (lookup podle primárního klíče).
+    """
+    get_or_404(db, models.Course, course_id, detail="Kurz nenalezen")
+
+    progress = models.UserModuleProgress
+    rows = db.execute(
+        select(
+            models.Module.module_id,
+            models.Module.max_task_attempts,
+            models.Module.passing_score,
+            progress.status,
+            progress.attempts_used,
         )
-        if session is None:
-            session = db.scalar(
-                select(models.ModuleTaskSession)
-                .where(
-                    models.ModuleTaskSession.user_id == user.user_id,
-                    models.ModuleTaskSession.module_id == module.module_id,
-                    models.ModuleTaskSession.status == enums.ModuleTaskSessionStatus.failed,
-                )
-                .order_by(models.ModuleTaskSession.session_id.desc())
-            )
+        .outerjoin(
+            progress,
+            and_(
+                progress.module_id == models.Module.module_id,
+                progress.user_id == user.user_id,
+            ),
+        )
+        .where(
+            models.Module.course_id == course_id,
+            models.Module.is_active.is_(True),
+        )
+        .order_by(models.Module.module_id)
+    ).all()
 
-        task_session_status: str | None = None
-        attempts_used = 0
-        if session is not None:
-            task_session_status = session.status.value
-            attempts_used = db.scalar(
-                select(func.count()).where(
-                    models.TaskAttempt.session_id == session.session_id,
-                    models.TaskAttempt.status == enums.AttemptStatus.evaluated,
-                )
-            ) or 0
-
-        result.append(ModuleCompletionStatus(
-            module_id=module.module_id,
-            passed=task_session_status == enums.ModuleTaskSessionStatus.passed,
-            task_session_status=task_session_status,
-            attempts_used=attempts_used,
-            max_attempts=module.max_task_attempts,
-            passing_score=module.passing_score,
-        ))
-    return result
+    return [
+        ModuleCompletionStatus(
+            module_id=module_id,
+            passed=status == enums.ModuleTaskSessionStatus.passed,
+            task_session_status=status.value if status is not None else None,
+            attempts_used=attempts if status is not None else 0,
+            max_attempts=max_attempts,
+            passing_score=passing_score,
+        )
+        for module_id, max_attempts, passing_score, status, attempts in rows
+    ]
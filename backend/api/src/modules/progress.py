@@ -0,0 +1,133 @@
+"""
+Materializovaný postup uživatelů v modulech (`user_module_progress`).
+
+Řádek (user, modul) se přepočítá z `module_task_session` a `task_attempt`
+jedním upsertem při každé změně (`refresh_module_progress` — volat před
+commitem ve stejné transakci). Čtení postupu je pak indexovaný lookup.
+
+Rozhodující session: passed / in_progress (max. jedna díky unique indexu),
+jinak nejnovější failed. `python -m api.manage progress` tabulku přestaví
+celou, `python -m api.manage progress --check` jen spočítá odchylky.
+"""
+
+from sqlalchemy import (
+    ColumnElement,
+    Select,
+    case,
+    except_,
+    func,
+    select,
+    text,
+    union_all,
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from api import enums, models
+
+_COLUMNS = (
+    "user_id",
+    "module_id",
+    "course_id",
+    "session_id",
+    "status",
+    "attempts_used",
+    "last_activity_at",
+)
+
+
+def _progress_source(*where: ColumnElement[bool]) -> Select:
+    """Postup spočítaný ze sessions a pokusů (sloupce v pořadí `_COLUMNS`)."""
+    session = models.ModuleTaskSession
+    failed = session.status == enums.ModuleTaskSessionStatus.failed
+    ranked = (
+        select(
+            session.user_id,
+            session.module_id,
+            session.session_id,
+            session.status,
+            func.row_number()
+            .over(
+                partition_by=(session.user_id, session.module_id),
+                order_by=(case((failed, 1), else_=0), session.session_id.desc()),
+            )
+            .label("priority"),
+            func.max(session.updated_at)
+            .over(partition_by=(session.user_id, session.module_id))
+            .label("session_activity_at"),
+        )
+        .where(*where)
+        .subquery()
+    )
+    attempts_used = (
+        select(func.count())
+        .where(
+            models.TaskAttempt.session_id == ranked.c.session_id,
+            models.TaskAttempt.status == enums.AttemptStatus.evaluated,
+        )
+        .scalar_subquery()
+    )
+    # pokus nemusí změnit status session (a tedy ani její updated_at)
+    attempt_activity_at = (
+        select(func.max(models.TaskAttempt.updated_at))
+        .join(session)
+        .where(
+            session.user_id == ranked.c.user_id,
+            session.module_id == ranked.c.module_id,
+        )
+        .scalar_subquery()
+    )
+    return (
+        select(
+            ranked.c.user_id,
+            ranked.c.module_id,
+            models.Module.course_id,
+            ranked.c.session_id,
+            ranked.c.status,
+            attempts_used.label("attempts_used"),
+            func.greatest(ranked.c.session_activity_at, attempt_activity_at).label(
+                "last_activity_at"
+            ),
+        )
+        .join(models.Module, models.Module.module_id == ranked.c.module_id)
+        .where(ranked.c.priority == 1)
+    )
+
+
+def refresh_module_progress(db: Session, user_id: int, module_id: int) -> None:
+    """Přepočítá postup uživatele v modulu (v transakci `db`, commit volá volající)."""
+    db.flush()
+    session = models.ModuleTaskSession
+    stmt = insert(models.UserModuleProgress).from_select(
+        _COLUMNS,
+        _progress_source(session.user_id == user_id, session.module_id == module_id),
+    )
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["user_id", "module_id"],
+            set_={name: stmt.excluded[name] for name in _COLUMNS[2:]},
+        )
+    )
+
+
+def rebuild_module_progress(db: Session) -> int:
+    """Přestaví celou tabulku (backfill); vrací počet řádků."""
+    # Souběžné refresh_module_progress počkají a zapíšou až po přestavbě
+    db.execute(text("LOCK TABLE user_module_progress IN EXCLUSIVE MODE"))
+    db.execute(models.UserModuleProgress.__table__.delete())
+    result = db.execute(
+        insert(models.UserModuleProgress).from_select(_COLUMNS, _progress_source()),
+        execution_options={"preserve_rowcount": True},
+    )
+    db.commit()
+    return result.rowcount
+
+
+def check_module_progress(db: Session) -> int:
+    """Počet řádků, ve kterých se tabulka liší od přepočtu (0 = konzistentní)."""
+    table = select(
+        *(getattr(models.UserModuleProgress, name) for name in _COLUMNS)
+    )
+    source = _progress_source()
+    drift = union_all(except_(source, table), except_(table, source)).subquery()
+    return db.scalar(select(func.count()).select_from(drift))
@@ -1,8 +1,9 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request, Response
 
 from api.src.modules.controllers import (
     create_module,
     get_modules,
+    modules_version_query,
     get_module,
     update_module,
     complete_module,
@@ -13,12 +14,13 @@ from api.src.modules.controllers import (
 from api.src.agents.practice_controllers import list_practice_questions
 from api.src.agents.schemas import PracticeQuestionWithAttempts
 from api.src.modules.schemas import Module, ModuleCreate, ModuleUpdate, ModuleCompletionStatus, CompleteModuleRequest, ModuleAssessmentQuestion
+from api.src.common.conditional import conditional_get, get_version
 from api.src.common.annotations import (
     INCLUDE_INACTIVE_ANNOTATION,
     TEXT_SEARCH_ANNOTATION,
 )
 
-from api.database import SessionSqlSessionDependency
+from api.database import ReadSqlSessionDependency, SessionSqlSessionDependency
 
 from api.dependencies import CurrentUser, require_role
 
@@ -26,12 +28,25 @@ router = APIRouter(prefix="/modules", tags=["Modules"])
 
 
 @router.get("", operation_id="list_modules")
-async def list_modules(
+def list_modules(
+    request: Request,
+    response: Response,
     db: SessionSqlSessionDependency,
     include_inactive: INCLUDE_INACTIVE_ANNOTATION = False,
     text_search: TEXT_SEARCH_ANNOTATION = None,
     course_id: int | None = None,
 ) -> list[Module]:
+    version = get_version(
+        db,
+        modules_version_query(
+            include_inactive=include_inactive,
+            text_search=text_search,
+            course_id=course_id,
+        ),
+    )
+    not_modified = conditional_get(request, response, version)
+    if not_modified is not None:
+        return not_modified
     return get_modules(
         db,
         include_inactive=include_inactive,
@@ -41,14 +56,14 @@ async def list_modules(
 
 
 @router.post("", operation_id="create_module", dependencies=[require_role("lector")])
-async def endp_create_module(
+def endp_create_module(
     module: ModuleCreate, db: SessionSqlSessionDependency, user: CurrentUser
 ) -> Module:
     return create_module(db, module, user)
 
 
 @router.get("/{module_id}", operation_id="get_module")
-async def endp_get_module(
+def endp_get_module(
     module_id: int,
     db: SessionSqlSessionDependency,
     user: CurrentUser,
@@ -57,14 +72,14 @@ async def endp_get_module(
 
 
 @router.put("/{module_id}", operation_id="update_module", dependencies=[require_role("lector")])
-async def endp_update_module(
+def endp_update_module(
     module_id: int, module: ModuleUpdate, db: SessionSqlSessionDependency, user: CurrentUser
 ) -> Module:
     return update_module(db, module_id, module, user)
 
 
 @router.post("/{module_id}/complete", operation_id="complete_module", dependencies=[require_role("user")])
-async def endp_complete_module(
+def endp_complete_module(
     module_id: int,
     body: CompleteModuleRequest,
     db: SessionSqlSessionDependency,
@@ -75,9 +90,9 @@ async def endp_complete_module(
 
 
 @router.get("/course/{course_id}/progress", operation_id="get_course_progress", dependencies=[require_role("user")])
-async def endp_get_course_progress(
+def endp_get_course_progress(
     course_id: int,
-    db: SessionSqlSessionDependency,
+    db: ReadSqlSessionDependency,
     user: CurrentUser,
 ) -> list[ModuleCompletionStatus]:
     """Vrátí stav dokončení všech modulů kurzu pro aktuálního uživatele."""
@@ -85,7 +100,7 @@ async def endp_get_course_progress(
 
 
 @router.get("/{module_id}/practice-questions", operation_id="list_practice_questions")
-async def endp_list_practice_questions(
+def endp_list_practice_questions(
     module_id: int,
     db: SessionSqlSessionDependency,
     user: CurrentUser,
@@ -95,7 +110,7 @@ async def endp_list_practice_questions(
 
 
 @router.get("/{module_id}/assessment", operation_id="get_module_assessment")
-async def endp_get_assessment_question(
+def endp_get_assessment_question(
     module_id: int,
     db: SessionSqlSessionDependency,
     user: CurrentUser,
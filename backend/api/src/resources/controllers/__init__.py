@@ -9,8 +9,10 @@ from api.src.resources.controllers.create import (
 )
 from api.src.resources.controllers.read import (
     get_resources,
+    get_resource_facets,
     get_resource,
     get_resource_files,
+    resource_version_query,
 )
 
 from api.src.resources.controllers.delete import (
@@ -30,8 +32,10 @@ __all__ = [
     "upload_resource_file",
     # Read operations
     "get_resources",
+    "get_resource_facets",
     "get_resource",
     "get_resource_files",
+    "resource_version_query",
     # Delete operations
     "delete_resource",
     "delete_resource_file",
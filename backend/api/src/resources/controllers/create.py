@@ -6,7 +6,7 @@ from fastapi import HTTPException, UploadFile
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from api import models
+from api import cache, models
 from api.authorization import validate_owner_or_superadmin
 from api.src.common.utils import get_or_404
 from api.src.resources.schemas import (
@@ -69,6 +69,7 @@ def create_resource(
     db.add(resource)
     db.flush()
 
+    cache.invalidate(db, "resources")
     db.commit()
     db.refresh(resource)
 
@@ -110,6 +111,7 @@ async def upload_resource_file(
         file_type=_detect_file_type(file.filename or ""),
     )
     db.add(resource_file)
+    cache.invalidate(db, "resources")
     db.commit()
     db.refresh(resource_file)
 
@@ -8,7 +8,7 @@ from fastapi import HTTPException
 from sqlalchemy import delete, select
 from sqlalchemy.orm import Session
 
-from api import models
+from api import cache, models
 from api.src.common.utils import get_or_404
 from api.enums import PubResourceStatus, UserRole
 from api.authorization import validate_owner_or_superadmin
@@ -54,6 +54,7 @@ def delete_resource(db: Session, resource_id: int, user: models.User) -> None:
     else:
         resource.soft_delete()
 
+    cache.invalidate(db, "resources")
     db.commit()
 
 
@@ -96,4 +97,5 @@ def delete_resource_file(
 
     seaweedfs.delete_file(resource_file.file_path)
     db.delete(resource_file)
+    cache.invalidate(db, "resources")
     db.commit()
@@ -2,28 +2,132 @@
 Controllery pro čtení veřejných materiálů.
 """
 
-from sqlalchemy import func, or_, select
+from pydantic import TypeAdapter
+from sqlalchemy import ColumnElement, Select, func, select
 from sqlalchemy.orm import Session, joinedload
 
-from api import models
+from api import cache, models
+from api.database import primary_session
+from api.src.common.conditional import version_query
+from api.src.common.facets import (
+    Facet,
+    collect_facets,
+    facet_counts_query,
+    facet_filters,
+)
+from api.src.common.schemas import FacetCount
+from api.src.common.search import text_search_filter
 from api.src.common.utils import get_or_404
 from api.src.resources.schemas import PubResource, PubResourceFile
 
 
+def _resource_base_filters(
+    include_inactive: bool = False,
+    text_search: str | None = None,
+    is_public: bool = False,
+    status: str | None = None,
+) -> list[ColumnElement[bool]]:
+    filters: list[ColumnElement[bool]] = []
+
+    if not include_inactive:
+        filters.append(models.PubResource.is_active.is_(True))
+
+    if is_public:
+        filters.append(models.PubResource.is_public.is_(True))
+
+    if text_search:
+        filters.append(
+            text_search_filter(models.PubResource.search_vector, text_search)
+        )
+
+    if status is not None:
+        filters.append(models.PubResource.status == status)
+
+    return filters
+
+
+def _resource_facets(
+    education_level: str | None = None,
+    difficulty_level: str | None = None,
+    resource_target_id: int | None = None,
+    resource_subject_id: int | None = None,
+) -> list[Facet]:
+    return [
+        Facet(
+            "education_level",
+            models.PubResource.education_level,
+            education_level,
+            value_type=str,
+        ),
+        Facet(
+            "difficulty_level",
+            models.PubResource.difficulty_level,
+            difficulty_level,
+            value_type=str,
+        ),
+        Facet("resource_target_id", models.PubResource.target_id, resource_target_id),
+        Facet(
+            "resource_subject_id", models.PubResource.subject_id, resource_subject_id
+        ),
+    ]
+
+
 def get_resources(
     db: Session,
     include_inactive: bool = False,
     text_search: str | None = None,
     is_public: bool = False,
-    education_level: int | None = None,
-    difficulty_level: int | None = None,
+    education_level: str | None = None,
+    difficulty_level: str | None = None,
     resource_target_id: int | None = None,
     resource_subject_id: int | None = None,
     status: str | None = None,
 ) -> list[PubResource]:
     """Vrátí seznam veřejných materiálů s filtrací.
     Doplňuje počty hodnocení, souborů a kolirát si nekdo vytvořil kopii. (fork)
+
+    Veřejný výpis (`is_public`, jen aktivní) jde přes cache s tagem `resources`.
     """
+    filters = {
+        "text_search": text_search,
+        "education_level": education_level,
+        "difficulty_level": difficulty_level,
+        "resource_target_id": resource_target_id,
+        "resource_subject_id": resource_subject_id,
+        "status": status,
+    }
+
+    if not is_public or include_inactive:
+        return _load_resources(
+            db, include_inactive=include_inactive, is_public=is_public, **filters
+        )
+
+    def load() -> list[PubResource]:
+        # plnění cache vždy z primary — replika může být pozadu za invalidací
+        with primary_session(db) as primary:
+            return _load_resources(
+                primary, include_inactive=False, is_public=True, **filters
+            )
+
+    return cache.get_or_load(
+        cache.key("resources.public", **filters),
+        ("resources",),
+        TypeAdapter(list[PubResource]),
+        load,
+    )
+
+
+def _load_resources(
+    db: Session,
+    include_inactive: bool,
+    is_public: bool,
+    text_search: str | None,
+    education_level: str | None,
+    difficulty_level: str | None,
+    resource_target_id: int | None,
+    resource_subject_id: int | None,
+    status: str | None,
+) -> list[PubResource]:
     ratings_count_subq = (
         select(
             models.PubResourceRating.resource_id.label("resource_id"),
@@ -86,34 +190,17 @@ def get_resources(
         .order_by(models.PubResource.resource_id.desc())
     )
 
-    if not include_inactive:
-        stm = stm.where(models.PubResource.is_active.is_(True))
-
-    if is_public:
-        stm = stm.where(models.PubResource.is_public.is_(True))
-
-    if text_search:
-        stm = stm.where(
-            or_(
-                models.PubResource.title.ilike(f"%{text_search}%"),
-                models.PubResource.description.ilike(f"%{text_search}%"),
+    stm = stm.where(
+        *_resource_base_filters(include_inactive, text_search, is_public, status),
+        *facet_filters(
+            _resource_facets(
+                education_level,
+                difficulty_level,
+                resource_target_id,
+                resource_subject_id,
             )
-        )
-
-    if education_level is not None:
-        stm = stm.where(models.PubResource.education_level == education_level)
-
-    if difficulty_level is not None:
-        stm = stm.where(models.PubResource.difficulty_level == difficulty_level)
-
-    if resource_target_id is not None:
-        stm = stm.where(models.PubResource.target_id == resource_target_id)
-
-    if resource_subject_id is not None:
-        stm = stm.where(models.PubResource.subject_id == resource_subject_id)
-
-    if status is not None:
-        stm = stm.where(models.PubResource.status == status)
+        ),
+    )
 
     rows = db.execute(stm).all()
     result: list[PubResource] = []
@@ -125,6 +212,54 @@ def get_resources(
     return result
 
 
+def get_resource_facets(
+    db: Session,
+    include_inactive: bool = False,
+    text_search: str | None = None,
+    is_public: bool = False,
+    education_level: str | None = None,
+    difficulty_level: str | None = None,
+    resource_target_id: int | None = None,
+    resource_subject_id: int | None = None,
+    status: str | None = None,
+) -> dict[str, list[FacetCount]]:
+    """Počty materiálů pro každou hodnotu filtrů (jeden dotaz)."""
+    facets = _resource_facets(
+        education_level, difficulty_level, resource_target_id, resource_subject_id
+    )
+    rows = db.execute(
+        facet_counts_query(
+            _resource_base_filters(include_inactive, text_search, is_public, status),
+            facets,
+        )
+    ).all()
+    return collect_facets(rows, facets)
+
+
+def resource_version_query(resource_id: int) -> Select:
+    """Verze detailu materiálu — materiál, jeho soubory a hodnocení."""
+    return version_query(
+        select(models.PubResource.updated_at).where(
+            models.PubResource.resource_id == resource_id
+        ),
+        select(models.PubResourceFile.updated_at).where(
+            models.PubResourceFile.resource_id == resource_id
+        ),
+        select(models.PubResourceRating.updated_at).where(
+            models.PubResourceRating.resource_id == resource_id
+        ),
+        # PubResourceFork nemá updated_at — stačí počet aktivních forků
+        extra=(
+            select(func.count())
+            .where(
+                models.PubResourceFork.original_id == resource_id,
+                models.PubResourceFork.is_active.is_(True),
+            )
+            .scalar_subquery(),
+        ),
+    )
+
+
 def get_resource(db: Session, resource_id: int) -> PubResource:
     """Vrátí detail materiálu podle ID s počty."""
     ratings_count_subq = (
@@ -6,7 +6,7 @@ from fastapi import HTTPException
 from sqlalchemy import update, select, desc
 from sqlalchemy.orm import Session
 
-from api import models
+from api import cache, models
 from api.src.common.utils import get_or_404
 from api.enums import PubResourceStatus, ReviewVerdict
 from api.src.resources.schemas import (
@@ -90,6 +90,7 @@ def update_resource(
         .where(models.PubResource.resource_id == resource_id)
         .values(**update_data)
     )
+    cache.invalidate(db, "resources")
     db.commit()
     db.refresh(resource)
 
@@ -126,6 +127,7 @@ def update_resource_status(
         .where(models.PubResource.resource_id == resource_id)
         .values(status=new_status)
     )
+    cache.invalidate(db, "resources")
     db.commit()
     db.refresh(resource)
 
@@ -163,6 +165,7 @@ def update_resource_public_state(
         .where(models.PubResource.resource_id == resource_id)
         .values(is_public=is_published)
     )
+    cache.invalidate(db, "resources")
     db.commit()
     db.refresh(resource)
 
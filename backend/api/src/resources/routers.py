@@ -1,9 +1,10 @@
 from typing import Literal
 
-from fastapi import APIRouter, UploadFile, File
+from fastapi import APIRouter, Request, Response, UploadFile, File
 
 from api.dependencies import CurrentUser, require_role
 
+from api.src.common.conditional import conditional_get, get_version
 from api.src.common.annotations import (
     RESOURCE_DIFFICULTY_LEVEL_ID_ANNOTATION,
     RESOURCE_EDU_LEVEL_ID_ANNOTATION,
@@ -20,6 +21,7 @@ from api.src.resources.schemas import (
     PubResourceCreated,
     PubResourceFile,
     PubResource,
+    PubResourceFacetList,
     PubResourceUpdate,
 )
 from api.src.resources.controllers import (
@@ -27,6 +29,8 @@ from api.src.resources.controllers import (
     upload_resource_file,
     get_resource,
     get_resources,
+    get_resource_facets,
+    resource_version_query,
     delete_resource,
     delete_resource_file,
     update_resource,
@@ -34,7 +38,7 @@ from api.src.resources.controllers import (
     update_resource_public_state,
 )
 
-from api.database import SessionSqlSessionDependency
+from api.database import ReadSqlSessionDependency, SessionSqlSessionDependency
 
 router = APIRouter(prefix="/resources", tags=["Resources"])
 public_router = APIRouter(prefix="/resources", tags=["Resources"])
@@ -43,8 +47,8 @@ public_router = APIRouter(prefix="/resources", tags=["Resources"])
 
 
 @public_router.get("", operation_id="list_resources")
-async def list_resources(
-    db: SessionSqlSessionDependency,
+def list_resources(
+    db: ReadSqlSessionDependency,
     include_inactive: INCLUDE_INACTIVE_ANNOTATION = False,
     text_search: TEXT_SEARCH_ANNOTATION = None,
     is_published: IS_PUBLISHED_ANNOTATION = False,
@@ -67,17 +71,51 @@ async def list_resources(
     )
 
 
+@public_router.get("/facets", operation_id="list_resources_faceted")
+def list_resources_faceted(
+    db: ReadSqlSessionDependency,
+    include_inactive: INCLUDE_INACTIVE_ANNOTATION = False,
+    text_search: TEXT_SEARCH_ANNOTATION = None,
+    is_published: IS_PUBLISHED_ANNOTATION = False,
+    education_level: RESOURCE_EDU_LEVEL_ID_ANNOTATION = None,
+    difficulty_level: RESOURCE_DIFFICULTY_LEVEL_ID_ANNOTATION = None,
+    resource_target_id: RESOURCE_TARGET_ID_ANNOTATION = None,
+    resource_subject_id: RESOURCE_SUBJECT_ID_ANNOTATION = None,
+    status: RESOURCE_STATUS_ANNOTATION = None,
+) -> PubResourceFacetList:
+    """Výpis materiálů spolu s počty pro filtry (úroveň, obtížnost, cílovka,
+    předmět). Počty fasety ignorují její vlastní zvolený filtr."""
+    filters = {
+        "include_inactive": include_inactive,
+        "text_search": text_search,
+        "is_public": is_published,
+        "education_level": education_level,
+        "difficulty_level": difficulty_level,
+        "resource_target_id": resource_target_id,
+        "resource_subject_id": resource_subject_id,
+        "status": status,
+    }
+    return PubResourceFacetList(
+        items=get_resources(db, **filters),
+        facets=get_resource_facets(db, **filters),
+    )
+
+
 @router.get(
     "/{resource_id}", operation_id="get_resource", dependencies=[require_role("user")]
 )
-async def endp_get_resource(
-    resource_id: int, db: SessionSqlSessionDependency
+def endp_get_resource(
+    resource_id: int, request: Request, response: Response, db: ReadSqlSessionDependency
 ) -> PubResource:
+    version = get_version(db, resource_version_query(resource_id))
+    not_modified = conditional_get(request, response, version)
+    if not_modified is not None:
+        return not_modified
     return get_resource(db, resource_id)
 
 
 @router.post("", operation_id="create_resource", dependencies=[require_role("user")])
-async def endp_create_resource(
+def endp_create_resource(
     resource: PubResourceCreate, db: SessionSqlSessionDependency, user: CurrentUser
 ) -> PubResourceCreated:
     return create_resource(db, resource, user)
@@ -88,7 +126,7 @@ async def endp_create_resource(
     operation_id="delete_resource",
     dependencies=[require_role("user")],
 )
-async def endp_delete_resource(
+def endp_delete_resource(
     resource_id: int, db: SessionSqlSessionDependency, user: CurrentUser
 ) -> None:
     delete_resource(db, resource_id, user)
@@ -99,7 +137,7 @@ async def endp_delete_resource(
     operation_id="update_resource",
     dependencies=[require_role("user")],
 )
-async def endp_update_resource(
+def endp_update_resource(
     resource_id: int,
     resource_data: PubResourceUpdate,
     db: SessionSqlSessionDependency,
@@ -113,7 +151,7 @@ async def endp_update_resource(
     operation_id="update_resource_status",
     dependencies=[require_role("user")],
 )
-async def endp_update_resource_status(
+def endp_update_resource_status(
     resource_id: int,
     new_status: Literal["draft", "pending_review",],
     db: SessionSqlSessionDependency,
@@ -127,7 +165,7 @@ async def endp_update_resource_status(
     operation_id="update_resource_public_state",
     dependencies=[require_role("user")],
 )
-async def endp_update_resource_public_state(
+def endp_update_resource_public_state(
     resource_id: int,
     is_published: bool,
     db: SessionSqlSessionDependency,
@@ -158,7 +196,7 @@ async def endp_upload_resource_file(
     operation_id="delete_resource_file",
     dependencies=[require_role("user")],
 )
-async def endp_delete_resource_file(
+def endp_delete_resource_file(
     resource_id: int, file_id: int, db: SessionSqlSessionDependency, user: CurrentUser
 ) -> None:
     delete_resource_file(db, resource_id, file_id, user)
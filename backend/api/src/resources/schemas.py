@@ -1,10 +1,10 @@
 from datetime import datetime
 
-from pydantic import Field, model_validator
+from pydantic import BaseModel, Field, model_validator
 
 from api.enums import AttachType, Difficulty, EduLevel, PubResourceStatus
 from api.src.catalogs.schemas import CourseSubject, CourseTarget
-from api.src.common.schemas import ORMModel
+from api.src.common.schemas import FacetCount, ORMModel
 
 
 class PubResourceBase(ORMModel):
@@ -78,3 +78,10 @@ class PubResource(PubResourceBase):
                 except Exception:
                     pass
         return obj
+
+
+class PubResourceFacetList(BaseModel):
+    """Výpis materiálů + počty pro každou hodnotu filtrů"""
+
+    items: list[PubResource]
+    facets: dict[str, list[FacetCount]]
@@ -1,7 +1,7 @@
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
 
-from api import models
+from api import cache, models
 from api.src.common.utils import get_or_404
 from api.src.reviews.schemas import PubResourceReviewCreate
 from api.enums import PubResourceStatus, ReviewVerdict
@@ -43,6 +43,7 @@ def review_resource(
     elif review_data.verdict == ReviewVerdict.needs_revision:
         resource.status = PubResourceStatus.rejected
 
+    cache.invalidate(db, "resources")
     db.commit()
     db.refresh(resource)
 
@@ -14,7 +14,7 @@ router = APIRouter(prefix="/reviews", tags=["Reviews"])
     operation_id="review_resource",
     dependencies=[require_role("guarantor")],
 )
-async def endp_review_resource(
+def endp_review_resource(
     resource_id: int,
     review: PubResourceReviewCreate,
     db: SessionSqlSessionDependency,
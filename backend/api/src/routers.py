@@ -12,6 +12,7 @@ from api.src.users.routers import router as users_router
 from api.src.enrollments.routers import router as enrollments_router
 from api.src.feedbacks.routers import router as feedbacks_router
 from api.src.catalogs.routers import router as catalogs_router
+from api.src.search.routers import router as search_router
 from api.src.superadmin.routers import router as superadmin_router
 from api.src.module_tickets.routers import router as module_tickets_router
 from api.src.resources.routers import router as resources_router
@@ -25,6 +26,7 @@ router = APIRouter()
 router.include_router(auth_router)
 router.include_router(courses_public_router)
 router.include_router(catalogs_router)
+router.include_router(search_router)
 
 # Všechny ostatní routery s povinnou autentizací
 router.include_router(courses_router, dependencies=[Depends(auth.get_current_user)])
@@ -0,0 +1,126 @@
+from sqlalchemy import Integer, Text, desc, literal, null, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api import models
+from api.enums import Status
+from api.src.common.search import headline, matches, rank, render_headline, ts_query
+from api.src.search.schemas import SearchEntity, SearchHit
+
+
+def _visible_course():
+    return (
+        models.Course.is_active.is_(True),
+        models.Course.is_published.is_(True),
+        models.Course.status == Status.approved,
+    )
+
+
+async def search(
+    db: AsyncSession,
+    text_search: str,
+    entities: list[SearchEntity] | None = None,
+    limit: int = 20,
+) -> list[SearchHit]:
+    """Fulltext přes publikované kurzy, jejich moduly a lekce a veřejné
+    materiály, seřazený podle `ts_rank`.
+
+    Kandidáti se hledají po GIN indexech, `ts_headline` (drahý) se počítá
+    jen pro `limit` nejlepších.
+    """
+    query = ts_query(text_search)
+    if query is None:
+        return []
+    entities = entities or ["course", "module", "learn_block", "resource"]
+
+    parts = []
+    if "course" in entities:
+        parts.append(
+            select(
+                literal("course").label("entity"),
+                models.Course.course_id.label("id"),
+                models.Course.course_id.label("course_id"),
+                null().cast(Integer).label("module_id"),
+                models.Course.title.label("title"),
+                models.Course.description.label("body"),
+                rank(models.Course.search_vector, query).label("rank"),
+            ).where(matches(models.Course.search_vector, query), *_visible_course())
+        )
+    if "module" in entities:
+        parts.append(
+            select(
+                literal("module").label("entity"),
+                models.Module.module_id.label("id"),
+                models.Module.course_id.label("course_id"),
+                models.Module.module_id.label("module_id"),
+                models.Module.title.label("title"),
+                null().cast(Text).label("body"),
+                rank(models.Module.search_vector, query).label("rank"),
+            )
+            .join(models.Course, models.Course.course_id == models.Module.course_id)
+            .where(
+                matches(models.Module.search_vector, query),
+                models.Module.is_active.is_(True),
+                *_visible_course(),
+            )
+        )
+    if "learn_block" in entities:
+        parts.append(
+            select(
+                literal("learn_block").label("entity"),
+                models.LearnBlock.learn_id.label("id"),
+                models.Module.course_id.label("course_id"),
+                models.LearnBlock.module_id.label("module_id"),
+                models.LearnBlock.title.label("title"),
+                models.LearnBlock.content.label("body"),
+                rank(models.LearnBlock.search_vector, query).label("rank"),
+            )
+            .join(models.Module, models.Module.module_id == models.LearnBlock.module_id)
+            .join(models.Course, models.Course.course_id == models.Module.course_id)
+            .where(
+                matches(models.LearnBlock.search_vector, query),
+                models.LearnBlock.is_active.is_(True),
+                models.Module.is_active.is_(True),
+                *_visible_course(),
+            )
+        )
+    if "resource" in entities:
+        parts.append(
+            select(
+                literal("resource").label("entity"),
+                models.PubResource.resource_id.label("id"),
+                null().cast(Integer).label("course_id"),
+                null().cast(Integer).label("module_id"),
+                models.PubResource.title.label("title"),
+                models.PubResource.description.label("body"),
+                rank(models.PubResource.search_vector, query).label("rank"),
+            ).where(
+                matches(models.PubResource.search_vector, query),
+                models.PubResource.is_active.is_(True),
+                models.PubResource.is_public.is_(True),
+            )
+        )
+
+    top = union_all(*parts).order_by(desc("rank"), "entity", "id").limit(limit).subquery()
+    rows = await db.execute(
+        select(
+            top.c.entity,
+            top.c.id,
+            top.c.course_id,
+            top.c.module_id,
+            headline(top.c.title, query, snippet=False).label("title"),
+            headline(top.c.body, query).label("snippet"),
+            top.c.rank,
+        ).order_by(top.c.rank.desc(), top.c.entity, top.c.id)
+    )
+    return [
+        SearchHit(
+            entity=row.entity,
+            id=row.id,
+            course_id=row.course_id,
+            module_id=row.module_id,
+            title=render_headline(row.title),
+            snippet=render_headline(row.snippet),
+            rank=row.rank,
+        )
+        for row in rows
+    ]
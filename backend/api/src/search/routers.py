@@ -0,0 +1,22 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Query
+
+from api.database import AsyncReadSqlSessionDependency
+from api.src.search.controllers import search
+from api.src.search.schemas import SearchEntity, SearchHit
+
+router = APIRouter(prefix="/search", tags=["Search"])
+
+
+@router.get("", operation_id="search")
+async def endp_search(
+    db: AsyncReadSqlSessionDependency,
+    text_search: Annotated[str, Query(min_length=1, description="Text to search for")],
+    entities: Annotated[
+        list[SearchEntity] | None, Query(description="Restrict to entity types")
+    ] = None,
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+) -> list[SearchHit]:
+    """Fulltext přes publikovaný obsah seřazený podle relevance (ts_rank)."""
+    return await search(db, text_search, entities=entities, limit=limit)
@@ -0,0 +1,18 @@
+from typing import Literal
+
+from pydantic import BaseModel
+
+SearchEntity = Literal["course", "module", "learn_block", "resource"]
+
+
+class SearchHit(BaseModel):
+    """Výsledek fulltextu. `title` a `snippet` jsou HTML-escapované,
+    shody jsou zvýrazněné `<mark>…</mark>`."""
+
+    entity: SearchEntity
+    id: int
+    course_id: int | None = None
+    module_id: int | None = None
+    title: str
+    snippet: str | None = None
+    rank: float
@@ -3,7 +3,8 @@ from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 from sqlalchemy.orm import Session
 
-from api import models
+from api import cache, models
+from api.enums import ModuleTaskSessionStatus
 from api.src.superadmin.schemas import (
     MentorInteractionLogItem,
     SystemSettingResponse,
@@ -12,6 +13,8 @@ from api.src.superadmin.schemas import (
     TaskSessionStatusUpdate,
 )
 from api.src.common.utils import get_or_404
+from api.src.enrollments.activity import record_module_passed
+from api.src.modules.progress import refresh_module_progress
 
 
 def get_mentor_interaction_logs(
@@ -59,6 +62,8 @@ def update_system_setting(
     for field, value in payload.model_dump(exclude_unset=True).items():
         setattr(setting, field, value)
 
+    # LLM konfigurace agentů (agents/base/llm.py) se přečte znovu
+    cache.invalidate(db, "system_setting")
     db.commit()
     db.refresh(setting)
     return SystemSettingResponse.model_validate(setting)
@@ -96,7 +101,13 @@ def update_task_session_status(
     session = get_or_404(
         db, models.ModuleTaskSession, session_id, detail="Session nenalezena"
     )
+    if (
+        payload.status == ModuleTaskSessionStatus.passed
+        and session.status != ModuleTaskSessionStatus.passed
+    ):
+        record_module_passed(db, session.user_id, session.module)
     session.status = payload.status
+    refresh_module_progress(db, session.user_id, session.module_id)
     db.commit()
     db.refresh(session)
     return TaskSessionResponse.model_validate(session)
@@ -110,6 +121,7 @@ def delete_task_session(db: Session, session_id: int) -> TaskSessionResponse:
     if not session.is_active:
         raise HTTPException(status_code=409, detail="Session je již neaktivní")
     session.is_active = False
+    refresh_module_progress(db, session.user_id, session.module_id)
     db.commit()
     db.refresh(session)
     return TaskSessionResponse.model_validate(session)
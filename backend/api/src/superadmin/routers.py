@@ -1,14 +1,20 @@
 from fastapi import APIRouter
 
 from api.database import SessionSqlSessionDependency
-from api.dependencies import require_role
+from api import cache, pool_metrics
+from api.dependencies import auth, require_role
 from api.src.superadmin.schemas import (
+    CacheStats,
+    DbPoolStats,
+    IntrospectionCacheStats,
     MentorInteractionLogItem,
+    ReconcileResult,
     SystemSettingResponse,
     SystemSettingUpdate,
     TaskSessionResponse,
     TaskSessionStatusUpdate,
 )
+from api.src.enrollments.controllers import reconcile_enrollments_count
 from api.src.superadmin.controllers import (
     get_mentor_interaction_logs,
     list_system_settings,
@@ -21,7 +27,7 @@ from api.src.superadmin.controllers import (
 router = APIRouter(
     prefix="/superadmin",
     tags=["Superadmin"],
-    dependencies=[require_role("superadmin")],
+    dependencies=[require_role("superadmin", introspect=True)],
 )
 
 
@@ -82,3 +88,34 @@ def endp_delete_task_session(
 ) -> TaskSessionResponse:
     """Soft-delete assessment session (is_active = False)."""
     return delete_task_session(db, session_id)
+
+
+# ---------- Maintenance ----------
+
+
+@router.post("/reconcile-counters", operation_id="reconcile_counters")
+def endp_reconcile_counters(db: SessionSqlSessionDependency) -> ReconcileResult:
+    """Srovná denormalizované čítače (course.enrollments_count) se skutečností."""
+    return ReconcileResult(enrollments_count_fixed=reconcile_enrollments_count(db))
+
+
+# ---------- Monitoring ----------
+
+
+@router.get("/auth-cache", operation_id="get_introspection_cache_stats")
+def endp_get_introspection_cache_stats() -> IntrospectionCacheStats:
+    """Vrátí statistiky cache introspekce tokenů (hits / misses / coalesced)."""
+    return IntrospectionCacheStats(**auth.introspection_cache.stats())
+
+
+@router.get("/cache", operation_id="get_cache_stats")
+def endp_get_cache_stats() -> CacheStats:
+    """Vrátí statistiky read-through cache katalogu tohoto workeru (hit rate)."""
+    return CacheStats(**cache.stats())
+
+
+@router.get("/db-pool", operation_id="get_db_pool_stats")
+def endp_get_db_pool_stats() -> list[DbPoolStats]:
+    """Vrátí stav connection poolů tohoto workeru (checked-out, overflow,
+    histogram čekání na spojení, churn spojení)."""
+    return [DbPoolStats(**item) for item in pool_metrics.snapshot()]
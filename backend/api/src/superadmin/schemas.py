@@ -62,3 +62,49 @@ class TaskSessionResponse(ORMModel):
 
 class TaskSessionStatusUpdate(BaseModel):
     status: ModuleTaskSessionStatus
+
+
+# ---------- Maintenance ----------
+
+
+class ReconcileResult(BaseModel):
+    enrollments_count_fixed: int
+
+
+# ---------- Monitoring ----------
+
+
+class IntrospectionCacheStats(BaseModel):
+    size: int
+    max_size: int
+    hits: int
+    misses: int
+    coalesced: int
+
+
+class CacheStats(BaseModel):
+    local_hits: int
+    shared_hits: int
+    misses: int
+    invalidations: int
+    size: int
+    max_entries: int
+    shared: bool
+    hit_rate: float
+
+
+class DbPoolStats(BaseModel):
+    name: str
+    pid: int
+    pool_size: int
+    checked_out: int
+    checked_in: int
+    overflow: int
+    checkouts: int
+    connects: int
+    closes: int
+    invalidations: int
+    wait_count: int
+    wait_avg_ms: float
+    wait_max_ms: float
+    wait_histogram: dict[str, int]
@@ -11,7 +11,7 @@ from api.src.users.schemas import UserRoleResponse, UserWithRole
 router = APIRouter(
     prefix="/users",
     tags=["Users"],
-    dependencies=[require_role("superadmin")],
+    dependencies=[require_role("superadmin", introspect=True)],
 )
 
 
@@ -0,0 +1,205 @@
+"""
+Souběžné chaty s mentorem nesmí blokovat event loop ani držet spojení.
+
+LLM i vektorové úložiště jsou nahrazené stuby — odpověď LLM trvá
+`LLM_DELAY` sekund. 50 souběžných požadavků (víc, než má sync pool
+spojení) musí doběhnout zhruba za dobu jednoho volání, ne po vlnách,
+a během čekání na LLM nesmí mít vypůjčené spojení.
+
+Test potřebuje běžící PostgreSQL s migrovaným schématem (`POSTGRES__*`),
+bez něj se přeskočí. Spuštění z `backend/`:
+
+    python -m unittest discover tests
+"""
+
+import asyncio
+import time
+import unittest
+import uuid
+from typing import Annotated
+from unittest import mock
+
+import httpx
+from fastapi import Depends
+from langchain_core.documents.base import Document
+from langchain_core.messages import AIMessage
+from sqlalchemy import delete, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from api import models
+from api.config import settings
+from api.database import SessionLocal, engine, get_sql
+from api.dependencies import auth
+from api.enums import Status, UserRole
+from api.main import app
+
+CONCURRENT_CHATS = 50
+LLM_DELAY = 2.0
+
+
+class SleepingLLM:
+    """Stub chat modelu — jen čeká, jako by odpovídal poskytovatel.
+
+    V půlce čekání si zapíše, kolik spojení sync poolu je vypůjčených.
+    """
+
+    checked_out: list[int] = []
+
+    async def ainvoke(self, messages, **kwargs) -> AIMessage:
+        await asyncio.sleep(LLM_DELAY / 2)
+        self.checked_out.append(engine.pool.checkedout())
+        await asyncio.sleep(LLM_DELAY / 2)
+        return AIMessage(content="odpověď")
+
+
+class StubVectorStore:
+    def similarity_search(self, query: str, k: int, filter: dict) -> list[Document]:  # noqa: A002
+        return [Document(page_content="obsah lekce", metadata=filter)]
+
+
+class MentorChatConcurrencyTest(unittest.IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls):
+        try:
+            with engine.connect():
+                pass
+        except OperationalError as e:
+            raise unittest.SkipTest(f"PostgreSQL není dostupný: {e}") from e
+
+        suffix = uuid.uuid4().hex[:8]
+        with SessionLocal() as db:
+            user = models.User(
+                sub=f"test-{suffix}",
+                email=f"test-{suffix}@example.com",
+                display_name="Test",
+                role=UserRole.user,
+            )
+            owner = models.User(
+                sub=f"test-owner-{suffix}",
+                email=f"test-owner-{suffix}@example.com",
+                display_name="Test Owner",
+                role=UserRole.lector,
+            )
+            db.add_all([user, owner])
+            db.flush()
+            course = models.Course(
+                title=f"Test {suffix}",
+                owner_id=owner.user_id,
+                status=Status.approved,
+                is_published=True,
+                course_block_id=db.scalars(select(models.CourseBlock.block_id)).first(),
+                course_target_id=db.scalars(
+                    select(models.CourseTarget.target_id)
+                ).first(),
+                course_subject_id=db.scalars(
+                    select(models.CourseSubject.subject_id)
+                ).first(),
+            )
+            db.add(course)
+            db.flush()
+            module = models.Module(course_id=course.course_id, title="Modul")
+            db.add(module)
+            db.flush()
+            learn_block = models.LearnBlock(
+                module_id=module.module_id, title="Lekce", content="obsah lekce"
+            )
+            db.add(learn_block)
+            db.add(models.Enrollment(user_id=user.user_id, course_id=course.course_id))
+            db.commit()
+            cls.user_id = user.user_id
+            cls.user_ids = (user.user_id, owner.user_id)
+            cls.course_id = course.course_id
+            cls.module_id = module.module_id
+            cls.learn_id = learn_block.learn_id
+
+    @classmethod
+    def tearDownClass(cls):
+        with SessionLocal() as db:
+            db.execute(
+                delete(models.MentorInteractionLog).where(
+                    models.MentorInteractionLog.learn_id == cls.learn_id
+                )
+            )
+            db.execute(
+                delete(models.Enrollment).where(
+                    models.Enrollment.course_id == cls.course_id
+                )
+            )
+            db.execute(
+                delete(models.LearnBlock).where(
+                    models.LearnBlock.learn_id == cls.learn_id
+                )
+            )
+            db.execute(
+                delete(models.Module).where(models.Module.module_id == cls.module_id)
+            )
+            db.execute(
+                delete(models.Course).where(models.Course.course_id == cls.course_id)
+            )
+            db.execute(delete(models.User).where(models.User.user_id.in_(cls.user_ids)))
+            db.commit()
+
+    def setUp(self):
+        user_id = self.user_id
+
+        # jako skutečná autentizace — uživatel z request session (`get_sql`)
+        def current_user(db: Annotated[Session, Depends(get_sql)]) -> models.User:
+            return db.get(models.User, user_id)
+
+        app.dependency_overrides[auth.get_current_user] = current_user
+        SleepingLLM.checked_out = []
+        self.addCleanup(app.dependency_overrides.clear)
+
+        for target, value in (
+            ("agents.mentor.nodes.generate_answer.create_chat_llm", SleepingLLM),
+            (
+                "agents.mentor.nodes.query_vector_store.get_vector_store",
+                StubVectorStore,
+            ),
+        ):
+            patcher = mock.patch(target, lambda *args, _value=value, **kwargs: _value())
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def test_concurrent_chats_do_not_serialize(self):
+        pool_capacity = settings.postgres.pool_size + settings.postgres.max_overflow
+        self.assertGreater(CONCURRENT_CHATS, pool_capacity)
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+
+            async def chat(i: int) -> httpx.Response:
+                return await client.post(
+                    "/api/v1/agents/learn-blocks-chat",
+                    json={"learn_block_id": self.learn_id, "message": f"otázka {i}"},
+                    headers={"Authorization": "Bearer test"},
+                )
+
+            started = time.perf_counter()
+            responses = await asyncio.gather(
+                *(chat(i) for i in range(CONCURRENT_CHATS))
+            )
+            elapsed = time.perf_counter() - started
+
+        self.assertEqual([r.status_code for r in responses], [200] * CONCURRENT_CHATS)
+        # během čekání na LLM nedrží request žádné spojení
+        self.assertEqual(len(SleepingLLM.checked_out), CONCURRENT_CHATS)
+        self.assertLess(max(SleepingLLM.checked_out), settings.postgres.pool_size)
+        # s drženými spojeními by požadavky čekaly na pool po vlnách
+        # (pool_size + max_overflow najednou), tj. aspoň 4 × LLM_DELAY
+        self.assertLess(elapsed, LLM_DELAY * 3)
+
+        with SessionLocal() as db:
+            logged = db.scalars(
+                select(models.MentorInteractionLog.log_id).where(
+                    models.MentorInteractionLog.learn_id == self.learn_id
+                )
+            ).all()
+        self.assertEqual(len(logged), CONCURRENT_CHATS)
+
+
+if __name__ == "__main__":
+    unittest.main()
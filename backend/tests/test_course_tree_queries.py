@@ -0,0 +1,137 @@
+"""
+Počet SQL dotazů `get_course_tree` nezávisí na počtu modulů (bez N+1).
+
+Test potřebuje běžící PostgreSQL s migrovaným schématem (`POSTGRES__*`),
+bez něj se přeskočí. Spuštění z `backend/`:
+
+    python -m unittest discover tests
+"""
+
+import unittest
+import uuid
+
+from sqlalchemy import delete, select
+from sqlalchemy.exc import OperationalError
+
+from api import models, query_stats
+from api.database import AsyncSessionLocal, SessionLocal, engine
+from api.enums import QuestionType, Status, UserRole
+from api.src.courses.controllers.read import get_course_tree
+
+
+def _create_course(db, owner_id: int, modules: int) -> int:
+    course = models.Course(
+        title=f"Strom {modules}",
+        owner_id=owner_id,
+        status=Status.approved,
+        course_block_id=db.scalars(select(models.CourseBlock.block_id)).first(),
+        course_target_id=db.scalars(select(models.CourseTarget.target_id)).first(),
+        course_subject_id=db.scalars(select(models.CourseSubject.subject_id)).first(),
+    )
+    db.add(course)
+    db.flush()
+    for i in range(modules):
+        module = models.Module(course_id=course.course_id, title=f"Modul {i}")
+        db.add(module)
+        db.flush()
+        closed = models.PracticeQuestion(
+            module_id=module.module_id,
+            question_type=QuestionType.closed,
+            question="Uzavřená?",
+            correct_answer="a",
+        )
+        open_ = models.PracticeQuestion(
+            module_id=module.module_id,
+            question_type=QuestionType.open,
+            question="Otevřená?",
+        )
+        db.add_all(
+            [
+                models.LearnBlock(
+                    module_id=module.module_id, title="Lekce", content="obsah"
+                ),
+                closed,
+                open_,
+            ]
+        )
+        db.flush()
+        db.add_all(
+            [
+                models.PracticeOption(question_id=closed.question_id, text="a"),
+                models.PracticeOption(question_id=closed.question_id, text="b"),
+                models.QuestionKeyword(question_id=open_.question_id, keyword="obsah"),
+            ]
+        )
+    return course.course_id
+
+
+class CourseTreeQueryCountTest(unittest.IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls):
+        try:
+            with engine.connect():
+                pass
+        except OperationalError as e:
+            raise unittest.SkipTest(f"PostgreSQL není dostupný: {e}") from e
+
+        suffix = uuid.uuid4().hex[:8]
+        with SessionLocal() as db:
+            owner = models.User(
+                sub=f"test-owner-{suffix}",
+                email=f"test-owner-{suffix}@example.com",
+                display_name="Test Owner",
+                role=UserRole.lector,
+            )
+            db.add(owner)
+            db.flush()
+            cls.owner_id = owner.user_id
+            cls.small_course_id = _create_course(db, owner.user_id, modules=3)
+            cls.large_course_id = _create_course(db, owner.user_id, modules=30)
+            db.commit()
+
+    @classmethod
+    def tearDownClass(cls):
+        course_ids = (cls.small_course_id, cls.large_course_id)
+        module_ids = select(models.Module.module_id).where(
+            models.Module.course_id.in_(course_ids)
+        )
+        question_ids = select(models.PracticeQuestion.question_id).where(
+            models.PracticeQuestion.module_id.in_(module_ids)
+        )
+        with SessionLocal() as db:
+            for stmt in (
+                delete(models.PracticeOption).where(
+                    models.PracticeOption.question_id.in_(question_ids)
+                ),
+                delete(models.QuestionKeyword).where(
+                    models.QuestionKeyword.question_id.in_(question_ids)
+                ),
+                delete(models.PracticeQuestion).where(
+                    models.PracticeQuestion.module_id.in_(module_ids)
+                ),
+                delete(models.LearnBlock).where(
+                    models.LearnBlock.module_id.in_(module_ids)
+                ),
+                delete(models.Module).where(models.Module.course_id.in_(course_ids)),
+                delete(models.Course).where(models.Course.course_id.in_(course_ids)),
+                delete(models.User).where(models.User.user_id == cls.owner_id),
+            ):
+                db.execute(stmt)
+            db.commit()
+
+    async def _tree_query_count(self, course_id: int, modules: int) -> int:
+        async with AsyncSessionLocal() as db:
+            with query_stats.track() as stats:
+                tree = await get_course_tree(db, course_id)
+        self.assertEqual(len(tree.modules), modules)
+        return stats.count
+
+    async def test_query_count_does_not_grow_with_modules(self):
+        small = await self._tree_query_count(self.small_course_id, modules=3)
+        large = await self._tree_query_count(self.large_course_id, modules=30)
+        self.assertGreater(small, 0)
+        self.assertEqual(small, large)
+
+
+if __name__ == "__main__":
+    unittest.main()